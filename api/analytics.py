@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Indicateurs d'analyse de marché pour l'API BRVM
+Rendements logarithmiques, volatilité glissante, moyennes mobiles (SMA/EMA),
+drawdowns, bêta par rapport au BRVM Composite et matrice de corrélation.
+
+Tous les calculs portent sur une matrice large (dates x symboles) des cours
+de clôture et s'expriment en opérations NumPy/pandas sur colonnes entières,
+sans boucle Python par symbole ni par ligne. Les résultats sont gardés en
+mémoire tant que la version de l'historique ne change pas.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Nombre de séances par an, pour annualiser la volatilité
+TRADING_DAYS = 252
+
+# Indice de référence pour le calcul du bêta
+BENCHMARK_INDEX = 'BRVM Composite'
+
+# Fenêtre par défaut des indicateurs glissants (en séances)
+DEFAULT_WINDOW = 20
+
+
+def log_returns(prices):
+    """Rendements logarithmiques quotidiens de chaque colonne"""
+    return np.log(prices).diff()
+
+
+def rolling_volatility(returns, window, annualize=True):
+    """Écart-type glissant des rendements, annualisé par défaut"""
+    volatility = returns.rolling(window, min_periods=window).std()
+    return volatility * np.sqrt(TRADING_DAYS) if annualize else volatility
+
+
+def sma(prices, window):
+    """Moyenne mobile simple"""
+    return prices.rolling(window, min_periods=window).mean()
+
+
+def ema(prices, span):
+    """Moyenne mobile exponentielle (lissage 2 / (span + 1))"""
+    return prices.ewm(span=span, adjust=False, min_periods=span).mean()
+
+
+def drawdowns(prices):
+    """Baisse relative de chaque cours par rapport à son plus haut historique"""
+    return prices / prices.cummax() - 1.0
+
+
+def beta(returns, benchmark_returns, min_periods=DEFAULT_WINDOW):
+    """
+    Bêta de chaque colonne par rapport aux rendements de référence
+
+    Chaque bêta est calculé sur les séances où le symbole et l'indice ont
+    tous deux un rendement (observations appariées), comme une covariance
+    par paires.
+    """
+    bench = benchmark_returns.reindex(returns.index).to_numpy(dtype=float)[:, None]
+    values = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(values) & ~np.isnan(bench)
+
+    count = valid.sum(axis=0)
+    x = np.where(valid, values, 0.0)
+    m = np.where(valid, bench, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = x.sum(axis=0) / count
+        mean_m = m.sum(axis=0) / count
+        cov = np.where(valid, (x - mean_x) * (m - mean_m), 0.0).sum(axis=0)
+        var = np.where(valid, (m - mean_m) ** 2, 0.0).sum(axis=0)
+        result = cov / var
+
+    result[count < min_periods] = np.nan
+    return pd.Series(result, index=returns.columns)
+
+
+def correlation_matrix(returns, min_periods=DEFAULT_WINDOW):
+    """Matrice de corrélation (observations appariées) entre toutes les colonnes"""
+    return returns.corr(min_periods=min_periods)
+
+
+def _clean(frame):
+    """Remplace NaN/inf par None pour la sérialisation JSON"""
+    frame = frame.replace([np.inf, -np.inf], np.nan)
+    return frame.astype(object).where(frame.notna(), None)
+
+
+class AnalyticsService:
+    """Indicateurs calculés sur l'historique, mis en cache par version des données"""
+
+    def __init__(self, store, max_results=64):
+        self.store = store
+        self.max_results = max_results
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self):
+        """Version des données utilisées (actions et indices)"""
+        return (self.store.index_version('stocks'), self.store.index_version('indices'))
+
+    def _cached(self, name, params, builder):
+        """Retourne un résultat mis en cache, calculé une fois par version des données"""
+        cache_key = (name, params, self.version())
+        with self._lock:
+            if cache_key in self._results:
+                self._results.move_to_end(cache_key)
+                return self._results[cache_key]
+
+        result = builder()
+
+        with self._lock:
+            self._results[cache_key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+    def prices(self):
+        """Matrice large (dates x symboles) des cours de clôture"""
+        def build():
+            frame = self.store.read('stocks', columns=['date', 'symbol', 'last_price'])
+            if frame.empty:
+                return pd.DataFrame(dtype=float)
+            frame['symbol'] = frame['symbol'].astype(str)
+            frame = frame.drop_duplicates(['date', 'symbol'], keep='last')
+            matrix = frame.pivot(index='date', columns='symbol', values='last_price').sort_index()
+            # Un cours nul ou négatif n'a pas de rendement logarithmique
+            matrix = matrix.where(matrix > 0).astype(float)
+            # Séance sans cotation : le cours est inchangé (entre la première
+            # et la dernière cotation du symbole uniquement)
+            return matrix.ffill().where(matrix.bfill().notna())
+
+        return self._cached('prices', (), build)
+
+    def benchmark(self, name=BENCHMARK_INDEX):
+        """Série des valeurs de l'indice de référence"""
+        def build():
+            frame = self.store.read('indices', columns=['date', 'value'], keys=[name])
+            frame = frame.drop_duplicates('date', keep='last').set_index('date').sort_index()
+            return frame['value'].astype(float)
+
+        return self._cached('benchmark', (name,), build)
+
+    def _returns(self, start, end):
+        prices = self.prices().loc[start:end]
+        return prices, log_returns(prices)
+
+    def indicators(self, window=DEFAULT_WINDOW):
+        """Indicateurs glissants de tous les symboles, sur tout l'historique"""
+        def build():
+            prices = self.prices()
+            returns = log_returns(prices)
+            return {
+                'close': prices,
+                'log_return': returns,
+                'volatility': rolling_volatility(returns, window),
+                'sma': sma(prices, window),
+                'ema': ema(prices, window),
+                'drawdown': drawdowns(prices),
+            }
+
+        return self._cached('indicators', (window,), build)
+
+    def symbol_indicators(self, symbol, window=DEFAULT_WINDOW, start=None, end=None):
+        """Série des indicateurs d'un symbole, ou None s'il est inconnu"""
+        indicators = self.indicators(window)
+        if symbol not in indicators['close'].columns:
+            return None
+
+        frame = pd.DataFrame({name: matrix[symbol] for name, matrix in indicators.items()})
+        frame = frame.loc[pd.Timestamp(start) if start else None:pd.Timestamp(end) if end else None]
+        frame = frame.dropna(subset=['close'])
+        result = _clean(frame)
+        result.insert(0, 'date', frame.index.strftime('%Y-%m-%d'))
+        return result.to_dict(orient='records')
+
+    def summary(self, window=DEFAULT_WINDOW, start=None, end=None, benchmark=BENCHMARK_INDEX):
+        """
+        Dernière valeur des indicateurs de chaque symbole et statistiques de
+        la période [start, end] (rendement, volatilité, drawdown maximal, bêta)
+        """
+        start = pd.Timestamp(start) if start else None
+        end = pd.Timestamp(end) if end else None
+
+        def build():
+            prices, returns = self._returns(start, end)
+            if prices.empty:
+                return []
+            indicators = self.indicators(window)
+            last = {name: matrix.loc[start:end].ffill().iloc[-1] for name, matrix in indicators.items()}
+
+            bench = self.benchmark(benchmark).loc[start:end]
+            bench_returns = log_returns(bench.where(bench > 0))
+
+            first_price = prices.bfill().iloc[0]
+            last_price = prices.ffill().iloc[-1]
+            frame = pd.DataFrame({
+                'last_price': last_price,
+                'period_return': last_price / first_price - 1.0,
+                'volatility': returns.std() * np.sqrt(TRADING_DAYS),
+                'rolling_volatility': last['volatility'],
+                'sma': last['sma'],
+                'ema': last['ema'],
+                'drawdown': drawdowns(prices).ffill().iloc[-1],
+                'max_drawdown': drawdowns(prices).min(),
+                'beta': beta(returns, bench_returns, min_periods=min(window, len(returns))),
+                'observations': prices.notna().sum(),
+            })
+            frame.index.name = 'symbol'
+            frame = frame.sort_index()
+            result = _clean(frame)
+            result.insert(0, 'symbol', frame.index)
+            return result.to_dict(orient='records')
+
+        return self._cached('summary', (window, start, end, benchmark), build)
+
+    def correlation(self, start=None, end=None, min_periods=DEFAULT_WINDOW):
+        """Matrice de corrélation des rendements : {'symbols': [...], 'matrix': [[...]]}"""
+        start = pd.Timestamp(start) if start else None
+        end = pd.Timestamp(end) if end else None
+
+        def build():
+            _, returns = self._returns(start, end)
+            matrix = correlation_matrix(returns, min_periods=min_periods)
+            return {
+                'symbols': list(matrix.columns),
+                'matrix': _clean(matrix).values.tolist(),
+            }
+
+        return self._cached('correlation', (start, end, min_periods), build)
@@ -4,15 +4,36 @@
 """
 API BRVM Data Platform
 API REST pour servir les données de la BRVM
+
+Les instantanés (CSV et JSON) sont lus sans pandas ; pandas et pyarrow ne
+sont chargés qu'à la première requête sur l'historique, les indicateurs ou
+l'export, pour un démarrage rapide des workers.
 """
 
 import os
+import sys
+import csv
 import json
+import time
+import base64
 import datetime
-import pandas as pd
-from flask import Flask, jsonify, request, send_from_directory
+import threading
+from flask import Flask, Response, g, jsonify, request, send_from_directory
 from flask_cors import CORS
 from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from snapshot_cache import Snapshot, SnapshotCache, FileSource
+from http_cache import cached_response
+from stream_hub import StreamHub
+from quote_table import QuoteTable
+from raw_store import COMPRESSIONS as RAW_COMPRESSIONS, read_json
+from tick_journal import TickReader, TICK_DATASETS
+from storage import storage_backend, MongoSource, MongoHistoryStore
+from metrics import REGISTRY as METRICS, CONTENT_TYPE as METRICS_CONTENT_TYPE, read_snapshots
 
 # Création de l'application Flask
 app = Flask(__name__)
@@ -20,43 +41,295 @@ CORS(app)  # Autoriser les requêtes cross-origin
 
 # Configuration des chemins
 BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.environ.get("BRVM_DATA_DIR") or BASE_DIR / "data")
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
+HISTORY_DIR = DATA_DIR / "history"
+TICKS_DIR = DATA_DIR / "ticks"
 WEB_DIR = BASE_DIR / "web"
+METRICS_DIR = Path(os.environ.get("BRVM_METRICS_DIR") or DATA_DIR / "metrics")
 
 # Assurer que les répertoires existent
-DATA_DIR.mkdir(exist_ok=True)
+DATA_DIR.mkdir(parents=True, exist_ok=True)
 RAW_DIR.mkdir(exist_ok=True)
 PROCESSED_DIR.mkdir(exist_ok=True)
 
 
+# Fichiers bruts JSON, compressés ou non selon BRVM_RAW_COMPRESSION côté scraper
+RAW_SUFFIXES = tuple(f".json{ext}" for ext in RAW_COMPRESSIONS.values())
+
+
+def _parse_column(values):
+    """
+    Convertit les valeurs texte d'une colonne CSV : booléens, entiers ou
+    réels si toutes les valeurs renseignées s'y prêtent, texte sinon ; les
+    cellules vides deviennent None (une colonne d'entiers incomplète est lue
+    en réels, comme avec pandas)
+    """
+    present = [v for v in values if v != '']
+    if present and all(v in ('True', 'False') for v in present):
+        return [None if v == '' else v == 'True' for v in values]
+    for convert in ((int, float) if len(present) == len(values) else (float,)):
+        try:
+            converted = [convert(v) for v in present]
+        except ValueError:
+            continue
+        iterator = iter(converted)
+        return [None if v == '' else next(iterator) for v in values]
+    return [None if v == '' else v for v in values]
+
+
+def _read_csv(path):
+    """Charge un fichier CSV traité sous forme de liste d'enregistrements"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        rows = list(reader)
+    if not header:
+        return []
+    columns = [_parse_column(list(column)) for column in zip(*rows)] if rows else []
+    return [dict(zip(header, values)) for values in zip(*columns)]
+
+
+# Cache des instantanés : chaque fichier n'est lu et sérialisé qu'une fois par version
+snapshot_cache = SnapshotCache(
+    dumps=lambda obj: app.json.dumps(obj, separators=(",", ":")) + "\n",
+    check_interval=float(os.environ.get("BRVM_CACHE_CHECK_INTERVAL", "1.0"))
+)
+snapshot_cache.register('news', FileSource(RAW_DIR, "news_", RAW_SUFFIXES, read_json))
+
+# Backend de stockage choisi par configuration (BRVM_STORAGE=files|mongo)
+STORAGE = storage_backend()
+
+if STORAGE == 'mongo':
+    for dataset in ('market_status', 'indices', 'stocks', 'bonds'):
+        snapshot_cache.register(dataset, MongoSource(dataset))
+else:
+    snapshot_cache.register('market_status', FileSource(RAW_DIR, "market_status_", RAW_SUFFIXES, read_json))
+    snapshot_cache.register('indices', FileSource(PROCESSED_DIR, "indices_", ".csv", _read_csv))
+    snapshot_cache.register('stocks', FileSource(PROCESSED_DIR, "stocks_", ".csv", _read_csv))
+    snapshot_cache.register('bonds', FileSource(PROCESSED_DIR, "bonds_", ".csv", _read_csv))
+
+
+# Diffusion des changements aux clients connectés à /api/stream
+stream_hub = StreamHub(
+    snapshot_cache,
+    dumps=lambda obj: app.json.dumps(obj, separators=(",", ":")),
+    poll_interval=float(os.environ.get("BRVM_STREAM_POLL_INTERVAL", "2.0")),
+    # Hors gevent, un abonné occupe un thread : plafond par processus (0 : aucun)
+    max_subscribers=int(os.environ.get("BRVM_STREAM_MAX_SUBSCRIBERS", "32")) or None
+)
+
+
+# Métriques des requêtes, exposées avec celles du scraper sur /metrics
+REQUEST_SECONDS = METRICS.histogram(
+    'brvm_http_request_duration_seconds',
+    "Durée de traitement des requêtes (jusqu'au début de la réponse pour les flux)",
+    ('method', 'endpoint'))
+REQUESTS_TOTAL = METRICS.counter(
+    'brvm_http_requests_total', 'Requêtes traitées par endpoint et code de statut',
+    ('method', 'endpoint', 'status'))
+
+# Plusieurs workers (gunicorn) : chacun publie ses métriques dans METRICS_DIR
+METRICS_SHARED = os.environ.get("BRVM_METRICS_SHARED") == "1"
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if METRICS_SHARED:
+        METRICS.share(METRICS_DIR, "api")
+
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.get('request_start')
+    if start is not None:
+        # Modèle de la route plutôt que l'URL, pour borner le nombre de séries
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, endpoint=endpoint)
+        REQUESTS_TOTAL.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    return response
+
+
+def snapshot_response(snapshot):
+    """
+    Construit la réponse HTTP à partir du JSON pré-sérialisé d'un instantané
+    (ETag/Last-Modified, 304 et variante compressée servie depuis la mémoire)
+    """
+    return cached_response(request, snapshot)
+
+
+def quote_table(dataset):
+    """Table compacte des cotations du dernier instantané, construite une fois par version"""
+    snapshot = snapshot_cache.get(dataset)
+    if snapshot is None:
+        return None
+    return snapshot.derived('quote_table', lambda s: QuoteTable.from_records(s.records))
+
+
+def quote_response(dataset, symbol):
+    """Cotation d'un symbole dans le dernier instantané"""
+    try:
+        table = quote_table(dataset)
+        record = table.get(symbol) if table is not None else None
+        if record is None:
+            return jsonify({"error": f"Symbole inconnu: {symbol}"}), 404
+        return jsonify(record)
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors de la récupération de la cotation de {symbol}: {e}")
+        return jsonify({"error": "Erreur lors de la récupération de la cotation"}), 500
+
+
+# Paramètres de requête des listes d'actions et d'obligations
+# (pas de filtre par secteur : les pages collectées ne donnent pas le secteur des titres)
+LIST_PARAMS = ('symbols', 'sort', 'order', 'limit', 'offset', 'cursor', 'fields')
+
+# Position maximale d'une page (offset, ou curseur forgé par le client)
+MAX_LIST_OFFSET = 10 ** 6
+
+
+def _split_arg(name):
+    """Lit un paramètre de liste séparée par des virgules"""
+    value = request.args.get(name)
+    return [v.strip() for v in value.split(',') if v.strip()] if value else None
+
+
+def _encode_cursor(offset, snapshot):
+    """Curseur opaque : position suivante et version de l'instantané paginé"""
+    token = json.dumps({"offset": offset, "version": snapshot.etag}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor, snapshot):
+    try:
+        token = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        offset = int(token['offset'])
+    except (ValueError, KeyError, TypeError, OverflowError):
+        raise ValueError("Paramètre 'cursor' invalide")
+    if not 0 <= offset <= MAX_LIST_OFFSET:
+        raise ValueError(f"Paramètre 'cursor' hors limites: position {offset} (attendu entre 0 et {MAX_LIST_OFFSET})")
+    if token.get('version') != snapshot.etag:
+        raise ValueError("Curseur expiré : les données ont changé, reprendre sans curseur")
+    return offset
+
+
+def list_response(dataset, snapshot):
+    """
+    Liste filtrée, triée, paginée et projetée d'un instantané (symbols,
+    sort, order, limit, offset ou cursor, fields)
+
+    Les tris s'appuient sur les permutations pré-calculées de la table des
+    cotations ; le total et le curseur suivant sont renvoyés en en-têtes
+    (X-Total-Count, X-Next-Cursor, Link) pour garder une réponse en liste.
+    """
+    table = quote_table(dataset)
+
+    fields = _split_arg('fields')
+    if fields:
+        unknown = [f for f in fields if f not in table.columns]
+        if unknown:
+            raise ValueError(f"Champs inconnus: {', '.join(unknown)}")
+
+    sort = request.args.get('sort')
+    if sort and sort not in table.columns:
+        raise ValueError(f"Tri impossible sur le champ: {sort}")
+    order = request.args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Paramètre 'order' invalide: {order} (attendu: asc, desc)")
+
+    positions = table.select(keys=_split_arg('symbols'), sort=sort, descending=(order == 'desc'))
+
+    cursor = request.args.get('cursor')
+    offset = _decode_cursor(cursor, snapshot) if cursor else _parse_int_arg('offset', 0, minimum=0, maximum=MAX_LIST_OFFSET)
+    limit = _parse_int_arg('limit', len(positions) or 1, maximum=10 ** 6)
+    page = positions[offset:offset + limit]
+
+    response = jsonify(table.rows(page, fields))
+    response.headers['X-Total-Count'] = str(len(positions))
+    if offset + limit < len(positions):
+        next_cursor = _encode_cursor(offset + limit, snapshot)
+        args = {k: v for k, v in request.args.items() if k not in ('cursor', 'offset')}
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
+
+
+def ranking_response(column, ascending=False):
+    """Classement des actions selon une colonne (limit, 10 par défaut)"""
+    try:
+        limit = _parse_int_arg('limit', 10, maximum=500)
+        table = quote_table('stocks')
+        if table is None or column not in table.columns:
+            return jsonify([])
+        return jsonify(table.rows(table.top(column, limit, ascending=ascending)))
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors du classement des actions par {column}: {e}")
+        return jsonify({"error": "Erreur lors du classement des actions"}), 500
+
+
+# Ressources disponibles dans /api/snapshot (nom du paramètre include -> jeu de données)
+BUNDLE_RESOURCES = {
+    'status': 'market_status',
+    'market_status': 'market_status',
+    'indices': 'indices',
+    'stocks': 'stocks',
+    'bonds': 'bonds',
+    'news': 'news',
+}
+
+BUNDLE_DEFAULT = ('market_status', 'indices', 'stocks', 'bonds', 'news')
+
+
+@app.route('/api/snapshot', methods=['GET'])
+def get_snapshot():
+    """
+    Récupère en une seule requête plusieurs jeux de données
+    (include=status,indices,stocks,bonds,news ; tous par défaut)
+
+    Le document est assemblé à partir des JSON pré-sérialisés des instantanés,
+    vérifiés en un seul passage, et mis en cache jusqu'au prochain changement.
+    """
+    try:
+        include = _split_arg('include')
+        if include:
+            unknown = [name for name in include if name not in BUNDLE_RESOURCES]
+            if unknown:
+                return jsonify({"error": f"Ressources inconnues: {', '.join(unknown)}"}), 400
+            datasets = tuple(dict.fromkeys(BUNDLE_RESOURCES[name] for name in include))
+        else:
+            datasets = BUNDLE_DEFAULT
+
+        bundle = snapshot_cache.bundle(datasets, defaults={
+            'market_status': {"market_status": "closed", "last_update": None},
+            'indices': [], 'stocks': [], 'bonds': [], 'news': [],
+        })
+        return snapshot_response(bundle)
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors de la récupération de l'instantané groupé: {e}")
+        return jsonify({"error": "Erreur lors de la récupération des données"}), 500
+
+
 @app.route('/api/market-status', methods=['GET'])
 def get_market_status():
     """Récupère le statut actuel du marché"""
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    
     try:
-        # Essayer de charger le fichier du jour
-        status_file = RAW_DIR / f"market_status_{today}.json"
-        
-        if status_file.exists():
-            with open(status_file, 'r', encoding='utf-8') as f:
-                return jsonify(json.load(f))
-        else:
-            # Si le fichier n'existe pas, récupérer le plus récent
-            status_files = list(RAW_DIR.glob("market_status_*.json"))
-            
-            if status_files:
-                latest_file = max(status_files, key=lambda f: f.name)
-                with open(latest_file, 'r', encoding='utf-8') as f:
-                    return jsonify(json.load(f))
-            else:
-                # Aucun fichier trouvé, renvoyer un statut par défaut
-                return jsonify({
-                    "market_status": "closed",
-                    "last_update": datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-                })
+        snapshot = snapshot_cache.get('market_status')
+        if snapshot is not None:
+            return snapshot_response(snapshot)
+
+        # Aucun fichier trouvé, renvoyer un statut par défaut
+        return jsonify({
+            "market_status": "closed",
+            "last_update": datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        })
     
     except Exception as e:
         app.logger.error(f"Erreur lors de la récupération du statut du marché: {e}")
@@ -66,26 +339,13 @@ def get_market_status():
 @app.route('/api/indices', methods=['GET'])
 def get_indices():
     """Récupère les indices boursiers"""
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    
     try:
-        # Essayer de charger le fichier CSV du jour
-        indices_file = PROCESSED_DIR / f"indices_{today}.csv"
-        
-        if indices_file.exists():
-            indices_df = pd.read_csv(indices_file)
-            return jsonify(indices_df.to_dict(orient='records'))
-        else:
-            # Si le fichier n'existe pas, récupérer le plus récent
-            indices_files = list(PROCESSED_DIR.glob("indices_*.csv"))
-            
-            if indices_files:
-                latest_file = max(indices_files, key=lambda f: f.name)
-                indices_df = pd.read_csv(latest_file)
-                return jsonify(indices_df.to_dict(orient='records'))
-            else:
-                # Aucun fichier trouvé, renvoyer une liste vide
-                return jsonify([])
+        snapshot = snapshot_cache.get('indices')
+        if snapshot is not None:
+            return snapshot_response(snapshot)
+
+        # Aucun fichier trouvé, renvoyer une liste vide
+        return jsonify([])
     
     except Exception as e:
         app.logger.error(f"Erreur lors de la récupération des indices: {e}")
@@ -94,91 +354,440 @@ def get_indices():
 
 @app.route('/api/stocks', methods=['GET'])
 def get_stocks():
-    """Récupère les actions cotées"""
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    
+    """Récupère les actions cotées (filtres, tri, pagination et champs optionnels)"""
     try:
-        # Essayer de charger le fichier CSV du jour
-        stocks_file = PROCESSED_DIR / f"stocks_{today}.csv"
-        
-        if stocks_file.exists():
-            stocks_df = pd.read_csv(stocks_file)
-            return jsonify(stocks_df.to_dict(orient='records'))
-        else:
-            # Si le fichier n'existe pas, récupérer le plus récent
-            stocks_files = list(PROCESSED_DIR.glob("stocks_*.csv"))
-            
-            if stocks_files:
-                latest_file = max(stocks_files, key=lambda f: f.name)
-                stocks_df = pd.read_csv(latest_file)
-                return jsonify(stocks_df.to_dict(orient='records'))
-            else:
-                # Aucun fichier trouvé, renvoyer une liste vide
-                return jsonify([])
+        snapshot = snapshot_cache.get('stocks')
+        if snapshot is not None:
+            if any(name in request.args for name in LIST_PARAMS):
+                return list_response('stocks', snapshot)
+            return snapshot_response(snapshot)
+
+        # Aucun fichier trouvé, renvoyer une liste vide
+        return jsonify([])
+    
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     except Exception as e:
         app.logger.error(f"Erreur lors de la récupération des actions: {e}")
         return jsonify({"error": "Erreur lors de la récupération des actions"}), 500
 
 
+@app.route('/api/stocks/top-gainers', methods=['GET'])
+def get_top_gainers():
+    """Plus fortes hausses du jour (limit)"""
+    return ranking_response('change')
+
+
+@app.route('/api/stocks/top-losers', methods=['GET'])
+def get_top_losers():
+    """Plus fortes baisses du jour (limit)"""
+    return ranking_response('change', ascending=True)
+
+
+@app.route('/api/stocks/most-active', methods=['GET'])
+def get_most_active():
+    """Actions les plus échangées du jour, par volume (limit)"""
+    return ranking_response('volume')
+
+
+@app.route('/api/stocks/<symbol>', methods=['GET'])
+def get_stock(symbol):
+    """Récupère la cotation d'une action"""
+    return quote_response('stocks', symbol)
+
+
 @app.route('/api/bonds', methods=['GET'])
 def get_bonds():
-    """Récupère les obligations"""
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    
+    """Récupère les obligations (filtres, tri, pagination et champs optionnels)"""
     try:
-        # Essayer de charger le fichier CSV du jour
-        bonds_file = PROCESSED_DIR / f"bonds_{today}.csv"
-        
-        if bonds_file.exists():
-            bonds_df = pd.read_csv(bonds_file)
-            return jsonify(bonds_df.to_dict(orient='records'))
-        else:
-            # Si le fichier n'existe pas, récupérer le plus récent
-            bonds_files = list(PROCESSED_DIR.glob("bonds_*.csv"))
-            
-            if bonds_files:
-                latest_file = max(bonds_files, key=lambda f: f.name)
-                bonds_df = pd.read_csv(latest_file)
-                return jsonify(bonds_df.to_dict(orient='records'))
-            else:
-                # Aucun fichier trouvé, renvoyer une liste vide
-                return jsonify([])
+        snapshot = snapshot_cache.get('bonds')
+        if snapshot is not None:
+            if any(name in request.args for name in LIST_PARAMS):
+                return list_response('bonds', snapshot)
+            return snapshot_response(snapshot)
+
+        # Aucun fichier trouvé, renvoyer une liste vide
+        return jsonify([])
+    
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     except Exception as e:
         app.logger.error(f"Erreur lors de la récupération des obligations: {e}")
         return jsonify({"error": "Erreur lors de la récupération des obligations"}), 500
 
 
+@app.route('/api/bonds/analytics', methods=['GET'])
+def get_bond_analytics():
+    """
+    Rendement actuariel, durations, convexité et courbe des taux
+    Nelson-Siegel de toutes les obligations (frequency : coupons par an),
+    calculés et sérialisés une fois par instantané
+    """
+    from bond_analytics import analyze, DEFAULT_FREQUENCY
+
+    try:
+        frequency = _parse_int_arg('frequency', DEFAULT_FREQUENCY, maximum=12)
+        snapshot = snapshot_cache.get('bonds')
+        if snapshot is None:
+            return jsonify({"date": None, "frequency": frequency, "bonds": [], "curve": None})
+
+        def build(s):
+            result = analyze(s.records, frequency)
+            body = snapshot_cache.dumps(result).encode('utf-8')
+            return Snapshot('bond_analytics', s.path, result, body, s.version, s.mtime)
+
+        return snapshot_response(snapshot.derived(('bond_analytics', frequency), build))
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors du calcul des indicateurs obligataires: {e}")
+        return jsonify({"error": "Erreur lors du calcul des indicateurs obligataires"}), 500
+
+
+@app.route('/api/bonds/<symbol>', methods=['GET'])
+def get_bond(symbol):
+    """Récupère la cotation d'une obligation"""
+    return quote_response('bonds', symbol)
+
+
 @app.route('/api/news', methods=['GET'])
 def get_news():
     """Récupère les actualités du marché"""
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    
     try:
-        # Essayer de charger le fichier JSON du jour
-        news_file = RAW_DIR / f"news_{today}.json"
-        
-        if news_file.exists():
-            with open(news_file, 'r', encoding='utf-8') as f:
-                return jsonify(json.load(f))
-        else:
-            # Si le fichier n'existe pas, récupérer le plus récent
-            news_files = list(RAW_DIR.glob("news_*.json"))
-            
-            if news_files:
-                latest_file = max(news_files, key=lambda f: f.name)
-                with open(latest_file, 'r', encoding='utf-8') as f:
-                    return jsonify(json.load(f))
-            else:
-                # Aucun fichier trouvé, renvoyer une liste vide
-                return jsonify([])
+        snapshot = snapshot_cache.get('news')
+        if snapshot is not None:
+            return snapshot_response(snapshot)
+
+        # Aucun fichier trouvé, renvoyer une liste vide
+        return jsonify([])
     
     except Exception as e:
         app.logger.error(f"Erreur lors de la récupération des actualités: {e}")
         return jsonify({"error": "Erreur lors de la récupération des actualités"}), 500
 
 
+# Séries historiques lues depuis le stockage Parquet (index clé -> plage de dates)
+# ou depuis MongoDB (index unique clé + date), et indicateurs calculés sur la
+# matrice dates x symboles. Créés à la première requête qui en a besoin :
+# pyarrow et pandas ne sont pas importés au démarrage.
+history_store = None
+history_service = None
+analytics_service = None
+_history_lock = threading.Lock()
+
+
+def get_history_store():
+    """Stockage historique du backend configuré, créé au premier appel"""
+    global history_store
+    with _history_lock:
+        if history_store is None:
+            if STORAGE == 'mongo':
+                history_store = MongoHistoryStore()
+            else:
+                from history_store import HistoryStore
+                history_store = HistoryStore(HISTORY_DIR)
+        return history_store
+
+
+def get_history_service():
+    """Service d'historique OHLCV, créé au premier appel"""
+    global history_service
+    store = get_history_store()
+    with _history_lock:
+        if history_service is None:
+            from history_service import HistoryService
+            history_service = HistoryService(store)
+        return history_service
+
+
+def get_analytics_service():
+    """Service d'indicateurs, créé au premier appel (en cache par version de l'historique)"""
+    global analytics_service
+    store = get_history_store()
+    with _history_lock:
+        if analytics_service is None:
+            from analytics import AnalyticsService
+            analytics_service = AnalyticsService(store)
+        return analytics_service
+
+
+def _parse_date_arg(name):
+    """Lit un paramètre de date (YYYY-MM-DD) de la requête"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Paramètre '{name}' invalide: {value} (format attendu: YYYY-MM-DD)")
+
+
+def _parse_int_arg(name, default, minimum=1, maximum=1000):
+    """Lit un paramètre entier borné de la requête"""
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"Paramètre '{name}' invalide: {value} (entier attendu)")
+    if not minimum <= number <= maximum:
+        raise ValueError(f"Paramètre '{name}' hors limites: {number} (attendu entre {minimum} et {maximum})")
+    return number
+
+
+def history_response(dataset, key):
+    """Construit la réponse OHLCV d'un symbole ou d'un indice"""
+    try:
+        start = _parse_date_arg('start')
+        end = _parse_date_arg('end')
+        interval = request.args.get('interval', 'daily')
+        fields = request.args.get('fields')
+        fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+        service = get_history_service()
+        key_range = service.key_range(dataset, key)
+        if key_range is None:
+            return jsonify({"error": f"Aucun historique pour {key}"}), 404
+
+        first, last, _ = key_range
+        data = service.ohlcv(dataset, key, start=start, end=end,
+                             interval=interval, fields=fields)
+        return jsonify({
+            "key": key,
+            "interval": interval,
+            "start": (start or first).isoformat(),
+            "end": (end or last).isoformat(),
+            "available": {"start": first.isoformat(), "end": last.isoformat()},
+            "data": data
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors de la récupération de l'historique de {key}: {e}")
+        return jsonify({"error": "Erreur lors de la récupération de l'historique"}), 500
+
+
+@app.route('/api/stream', methods=['GET'])
+def stream():
+    """
+    Flux Server-Sent Events des changements : événements « delta » ne contenant
+    que les lignes et champs modifiés depuis la collecte précédente
+    """
+    if not stream_hub.accepting():
+        return jsonify({"error": "Trop de clients connectés au flux, réessayer plus tard"}), 503, {'Retry-After': '60'}
+
+    # Identifiant opaque (époque du processus et numéro), validé par le hub
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+
+    return Response(
+        stream_hub.subscribe(last_event_id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # Désactive la mise en tampon des proxys (Nginx)
+            'X-Accel-Buffering': 'no',
+        }
+    )
+
+
+@app.route('/api/stocks/<symbol>/history', methods=['GET'])
+def get_stock_history(symbol):
+    """Récupère l'historique OHLCV d'une action (start, end, interval, fields)"""
+    return history_response('stocks', symbol)
+
+
+@app.route('/api/indices/<name>/history', methods=['GET'])
+def get_index_history(name):
+    """Récupère l'historique d'un indice (start, end, interval, fields)"""
+    return history_response('indices', name)
+
+
+# Journaux intraday écrits par le scraper, projetés en mémoire à la lecture
+tick_readers = {dataset: TickReader(TICKS_DIR / dataset) for dataset in TICK_DATASETS}
+
+
+def _parse_time_arg(name, date):
+    """Lit un instant de la séance (HH:MM[:SS] GMT ou date et heure ISO 8601) de la requête"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        if 'T' in value:
+            return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return datetime.datetime.combine(date, datetime.time.fromisoformat(value), datetime.timezone.utc)
+    except ValueError:
+        raise ValueError(f"Paramètre '{name}' invalide: {value} (format attendu: HH:MM ou YYYY-MM-DDTHH:MM)")
+
+
+def intraday_response(dataset, symbol):
+    """Construit la réponse des cotations intraday d'un titre (date, start, end, fields)"""
+    reader = tick_readers[dataset]
+    try:
+        date = _parse_date_arg('date')
+        if date is None:
+            dates = reader.dates()
+            if not dates:
+                return jsonify({"error": "Aucun journal intraday"}), 404
+            date = datetime.date.fromisoformat(dates[-1])
+        start = _parse_time_arg('start', date)
+        end = _parse_time_arg('end', date)
+        fields = request.args.get('fields')
+        fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+        if not reader.has_symbol(date.isoformat(), symbol):
+            return jsonify({"error": f"Aucune cotation intraday pour {symbol} le {date.isoformat()}"}), 404
+
+        return jsonify({
+            "symbol": symbol,
+            "date": date.isoformat(),
+            "data": reader.points(date.isoformat(), symbol, start=start, end=end, fields=fields)
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors de la récupération des cotations intraday de {symbol}: {e}")
+        return jsonify({"error": "Erreur lors de la récupération des cotations intraday"}), 500
+
+
+@app.route('/api/stocks/<symbol>/intraday', methods=['GET'])
+def get_stock_intraday(symbol):
+    """Cotations intraday d'une action (date, start, end, fields)"""
+    return intraday_response('stocks', symbol)
+
+
+@app.route('/api/bonds/<symbol>/intraday', methods=['GET'])
+def get_bond_intraday(symbol):
+    """Cotations intraday d'une obligation (date, start, end, fields)"""
+    return intraday_response('bonds', symbol)
+
+
+@app.route('/api/export/<dataset>', methods=['GET'])
+def export_history(dataset):
+    """
+    Exporte l'historique d'un jeu de données en flux (format=ndjson|csv|arrow,
+    start, end, symbols=S1,S2 ou names=... pour les indices, fields)
+    """
+    from history_store import SCHEMAS as HISTORY_SCHEMAS
+    from export import export_stream, EXPORT_FORMATS
+
+    if dataset not in HISTORY_SCHEMAS:
+        return jsonify({"error": f"Jeu de données inconnu: {dataset}"}), 404
+
+    try:
+        fmt = request.args.get('format', 'ndjson')
+        start = _parse_date_arg('start')
+        end = _parse_date_arg('end')
+        keys = request.args.get('symbols') or request.args.get('names')
+        keys = [k.strip() for k in keys.split(',') if k.strip()] if keys else None
+        fields = request.args.get('fields')
+        fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+        body = export_stream(get_history_store(), dataset, fmt, start=start, end=end, keys=keys, columns=fields)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    period = "_".join(d.isoformat() for d in (start, end) if d)
+    filename = f"brvm_{dataset}{'_' + period if period else ''}.{extension}"
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no',
+        }
+    )
+
+
+@app.route('/api/analytics/summary', methods=['GET'])
+def get_analytics_summary():
+    """
+    Indicateurs de toutes les actions (window, start, end, benchmark) :
+    rendement et volatilité de la période, SMA/EMA, drawdowns et bêta
+    """
+    from analytics import DEFAULT_WINDOW, BENCHMARK_INDEX
+
+    try:
+        window = _parse_int_arg('window', DEFAULT_WINDOW, minimum=2)
+        start = _parse_date_arg('start')
+        end = _parse_date_arg('end')
+        benchmark = request.args.get('benchmark', BENCHMARK_INDEX)
+        return jsonify({
+            "window": window,
+            "benchmark": benchmark,
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+            "data": get_analytics_service().summary(window, start, end, benchmark)
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors du calcul des indicateurs: {e}")
+        return jsonify({"error": "Erreur lors du calcul des indicateurs"}), 500
+
+
+@app.route('/api/analytics/correlation', methods=['GET'])
+def get_analytics_correlation():
+    """Matrice de corrélation des rendements de toutes les actions (start, end, min_periods)"""
+    from analytics import DEFAULT_WINDOW
+
+    try:
+        start = _parse_date_arg('start')
+        end = _parse_date_arg('end')
+        min_periods = _parse_int_arg('min_periods', DEFAULT_WINDOW, minimum=2, maximum=100000)
+        result = get_analytics_service().correlation(start, end, min_periods)
+        return jsonify(dict(result, min_periods=min_periods))
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors du calcul des corrélations: {e}")
+        return jsonify({"error": "Erreur lors du calcul des corrélations"}), 500
+
+
+@app.route('/api/analytics/stocks/<symbol>', methods=['GET'])
+def get_stock_analytics(symbol):
+    """Série des indicateurs d'une action (window, start, end)"""
+    from analytics import DEFAULT_WINDOW
+
+    try:
+        window = _parse_int_arg('window', DEFAULT_WINDOW, minimum=2)
+        data = get_analytics_service().symbol_indicators(symbol, window, _parse_date_arg('start'), _parse_date_arg('end'))
+        if data is None:
+            return jsonify({"error": f"Aucun historique pour {symbol}"}), 404
+        return jsonify({"symbol": symbol, "window": window, "data": data})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        app.logger.error(f"Erreur lors du calcul des indicateurs de {symbol}: {e}")
+        return jsonify({"error": "Erreur lors du calcul des indicateurs"}), 500
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Métriques au format texte Prometheus : requêtes de ce processus, des
+    autres workers et dernière collecte du scraper
+    """
+    others = read_snapshots(METRICS_DIR, exclude_pid=os.getpid()) if METRICS_DIR.is_dir() else []
+    return Response(METRICS.render(others), content_type=METRICS_CONTENT_TYPE)
+
+
 @app.route('/', defaults={'path': 'index.html'})
 @app.route('/<path:path>')
 def serve_web(path):
@@ -187,5 +796,5 @@ def serve_web(path):
 
 
 if __name__ == '__main__':
-    # Démarrer le serveur en mode développement
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Démarrer le serveur en mode développement (voir server.py pour la production)
+    app.run(debug=True, host='0.0.0.0', port=int(os.environ.get("BRVM_API_PORT", "5000")))
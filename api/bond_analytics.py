@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Analyse obligataire pour l'API BRVM
+Coupon et échéance de chaque obligation (champ `maturity_date` ou libellé
+du type « 6.5% 2021-2028 »), puis rendement actuariel (taux de rendement à
+l'échéance), duration de Macaulay et modifiée, convexité, et courbe des
+taux Nelson-Siegel ajustée sur l'ensemble des titres.
+
+Les flux de toutes les obligations sont rangés dans une matrice (titres x
+échéances de coupon) : le rendement est obtenu par un Newton sécurisé par
+dichotomie appliqué à toutes les lignes à la fois, et la courbe par
+moindres carrés résolus en lot sur une grille de paramètres de forme, sans
+boucle Python par obligation.
+
+Hypothèses : obligations in fine, coupons de périodicité `frequency` par
+an datés à rebours depuis l'échéance, base ACT/365. Les cours sont cotés
+en FCFA pour un nominal de 10 000 (ou directement en % du nominal).
+"""
+
+import re
+import datetime
+
+import numpy as np
+
+# Nominal des cotations obligataires de la BRVM (FCFA)
+NOMINAL = 10000
+
+# Nombre de coupons par an par défaut
+DEFAULT_FREQUENCY = 1
+FREQUENCIES = (1, 2, 4, 12)
+
+# Maturités (en années) des points de courbe renvoyés
+CURVE_TENORS = (0.5, 1, 2, 3, 5, 7, 10, 15)
+
+# Maturité résiduelle minimale (années) des titres utilisés pour ajuster la courbe :
+# le rendement d'un titre proche de l'échéance est très sensible au moindre écart de cours
+MIN_CURVE_MATURITY = 0.25
+
+# Grille du paramètre de forme λ de Nelson-Siegel (en années)
+NS_LAMBDAS = np.linspace(0.25, 10.0, 40)
+
+_COUPON = re.compile(r"(\d+(?:[.,]\d+)?)\s*%")
+_YEAR_RANGE = re.compile(r"\b(?:19|20)\d{2}\s*[-/]\s*((?:19|20)\d{2})\b")
+_YEAR = re.compile(r"\b((?:19|20)\d{2})\b")
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d")
+
+_SOLVER_ITERATIONS = 100
+_SOLVER_TOLERANCE = 1e-10
+
+
+def _float(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.replace(' ', '').replace(',', '.').replace('%', '')
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None
+
+
+def _date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if not value:
+        return None
+    text = str(value).strip()[:10]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_coupon(record):
+    """Taux de coupon annuel en % (champ `coupon`, sinon libellé « 6.5% ... »), ou None"""
+    coupon = _float(record.get('coupon'))
+    if coupon is not None:
+        return coupon
+    match = _COUPON.search(record.get('name') or '')
+    return float(match.group(1).replace(',', '.')) if match else None
+
+
+def parse_maturity(record):
+    """
+    Échéance d'une obligation : (date, estimée) ; le champ `maturity_date`
+    prime, sinon la dernière année du libellé (« 2021-2028 ») au 31 décembre
+    """
+    maturity = _date(record.get('maturity_date'))
+    if maturity is not None:
+        return maturity, False
+    name = record.get('name') or ''
+    match = _YEAR_RANGE.search(name)
+    years = [match.group(1)] if match else _YEAR.findall(name)
+    if not years:
+        return None, False
+    return datetime.date(int(years[-1]), 12, 31), True
+
+
+def clean_price_percent(price):
+    """Cours pied de coupon en % du nominal (les cotations en FCFA sont ramenées au nominal)"""
+    price = np.asarray(price, dtype=float)
+    return np.where(price > 200, price / NOMINAL * 100, price)
+
+
+def cash_flows(years, coupons, frequency):
+    """
+    Échéancier des flux restants de toutes les obligations
+
+    Retourne (times, flows) de forme (titres x périodes) : dates des flux en
+    années et montants en % du nominal (0 au-delà de la dernière échéance)
+    """
+    periods = np.ceil(years * frequency - 1e-9).astype(int)
+    periods = np.maximum(periods, 1)
+    width = int(periods.max()) if len(periods) else 1
+    k = np.arange(width)[None, :]
+    # Flux k : échéance moins (nombre de périodes restantes - 1 - k) périodes
+    times = years[:, None] - (periods[:, None] - 1 - k) / frequency
+    valid = k < periods[:, None]
+    flows = np.where(valid, coupons[:, None] / frequency, 0.0)
+    flows[np.arange(len(years)), periods - 1] += 100.0
+    return np.where(valid, times, 0.0), flows
+
+
+def accrued_interest(years, coupons, frequency):
+    """Coupon couru (en % du nominal) depuis le dernier détachement"""
+    next_coupon = years - (np.ceil(years * frequency - 1e-9) - 1) / frequency
+    elapsed = 1.0 - next_coupon * frequency
+    return coupons / frequency * np.clip(elapsed, 0.0, 1.0)
+
+
+def _present_value(rates, times, flows, frequency):
+    """Valeur actuelle et sa dérivée par rapport au taux, pour chaque ligne"""
+    base = 1.0 + rates[:, None] / frequency
+    discounted = flows * base ** (-frequency * times)
+    value = discounted.sum(axis=1)
+    derivative = -(times * discounted / base).sum(axis=1)
+    return value, derivative
+
+
+def yield_to_maturity(prices, times, flows, frequency):
+    """
+    Rendement actuariel (taux annuel, composé `frequency` fois par an) de
+    toutes les obligations : Newton sur toutes les lignes à la fois, repli
+    sur la dichotomie quand le pas sort de l'intervalle encadrant la racine
+    """
+    count = len(prices)
+    low = np.full(count, -0.9 * frequency)
+    high = np.full(count, 1.0)
+    rates = np.full(count, 0.05)
+    done = ~np.isfinite(prices)
+
+    for _ in range(_SOLVER_ITERATIONS):
+        value, derivative = _present_value(rates, times, flows, frequency)
+        error = value - prices
+        # La valeur actuelle décroît avec le taux : encadrement de la racine
+        low = np.where(error > 0, rates, low)
+        high = np.where(error < 0, rates, high)
+        done |= np.abs(error) <= _SOLVER_TOLERANCE * np.maximum(prices, 1.0)
+        if done.all():
+            break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = rates - error / derivative
+        inside = np.isfinite(step) & (step > low) & (step < high)
+        rates = np.where(done, rates, np.where(inside, step, (low + high) / 2))
+
+    value, _ = _present_value(rates, times, flows, frequency)
+    converged = np.abs(value - prices) <= 1e-6 * np.maximum(prices, 1.0)
+    return np.where(converged, rates, np.nan)
+
+
+def risk_measures(rates, times, flows, frequency):
+    """Durations de Macaulay et modifiée (années) et convexité (années²)"""
+    base = 1.0 + rates[:, None] / frequency
+    discounted = flows * base ** (-frequency * times)
+    value = discounted.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        macaulay = (times * discounted).sum(axis=1) / value
+        modified = macaulay / base[:, 0]
+        convexity = (discounted * times * (times + 1.0 / frequency)).sum(axis=1) / (value * base[:, 0] ** 2)
+    return macaulay, modified, convexity
+
+
+def _ns_loadings(maturities, lambdas):
+    """Facteurs de Nelson-Siegel (niveau, pente, courbure) : forme (λ x maturités x 3)"""
+    x = maturities[None, :] / lambdas[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(x > 0, (1.0 - np.exp(-x)) / x, 1.0)
+    curvature = slope - np.exp(-x)
+    return np.stack([np.ones_like(x), slope, curvature], axis=-1)
+
+
+def fit_nelson_siegel(maturities, rates, lambdas=NS_LAMBDAS):
+    """
+    Ajuste y(m) = β0 + β1·(1-e^(-m/λ))/(m/λ) + β2·((1-e^(-m/λ))/(m/λ) - e^(-m/λ))
+
+    Les moindres carrés en β sont résolus pour toutes les valeurs de λ de la
+    grille en un seul appel, et la meilleure est retenue ; retourne
+    {'beta0', 'beta1', 'beta2', 'lambda', 'rmse'} ou None (moins de 3 points)
+    """
+    maturities = np.asarray(maturities, dtype=float)
+    rates = np.asarray(rates, dtype=float)
+    if len(maturities) < 3:
+        return None
+
+    design = _ns_loadings(maturities, lambdas)
+    gram = np.einsum('lni,lnj->lij', design, design)
+    moments = np.einsum('lni,n->li', design, rates)
+    # Légère régularisation : la grille contient des λ où les facteurs sont presque colinéaires
+    gram += np.eye(3)[None] * 1e-10
+    betas = np.linalg.solve(gram, moments[..., None])[..., 0]
+    residuals = np.einsum('lni,li->ln', design, betas) - rates[None, :]
+    sse = (residuals ** 2).sum(axis=1)
+    best = int(np.nanargmin(sse))
+    return {
+        'beta0': float(betas[best, 0]),
+        'beta1': float(betas[best, 1]),
+        'beta2': float(betas[best, 2]),
+        'lambda': float(lambdas[best]),
+        'rmse': float(np.sqrt(sse[best] / len(rates))),
+    }
+
+
+def nelson_siegel(params, maturities):
+    """Taux de la courbe ajustée aux maturités données"""
+    maturities = np.asarray(maturities, dtype=float)
+    loadings = _ns_loadings(maturities, np.array([params['lambda']]))[0]
+    return loadings @ np.array([params['beta0'], params['beta1'], params['beta2']])
+
+
+def _round(value, digits):
+    return None if value is None or value != value else round(float(value), digits)
+
+
+def analyze(records, frequency=DEFAULT_FREQUENCY, today=None):
+    """
+    Indicateurs de toutes les obligations d'un instantané :
+    {'date', 'frequency', 'bonds': [...], 'curve': {...} ou None}
+
+    Taux et rendements en %, durées en années ; une obligation sans coupon,
+    échéance ou cours exploitables garde des indicateurs à None.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Périodicité invalide: {frequency} (attendu: {', '.join(map(str, FREQUENCIES))})")
+    records = records or []
+    today = today or datetime.date.today()
+
+    coupons = np.full(len(records), np.nan)
+    prices = np.full(len(records), np.nan)
+    years = np.full(len(records), np.nan)
+    maturities = []
+    settlements = set()
+    for row, record in enumerate(records):
+        coupon = parse_coupon(record)
+        maturity, estimated = parse_maturity(record)
+        price = _float(record.get('last_price'))
+        settlement = _date(record.get('date')) or today
+        maturities.append((maturity, estimated))
+        settlements.add(settlement)
+        if coupon is not None:
+            coupons[row] = coupon
+        if price is not None and price > 0:
+            prices[row] = price
+        if maturity is not None:
+            years[row] = (maturity - settlement).days / 365.0
+
+    clean = clean_price_percent(prices)
+    valid = np.isfinite(coupons) & np.isfinite(clean) & (years > 0)
+    ytm = np.full(len(records), np.nan)
+    accrued = np.full(len(records), np.nan)
+    macaulay = np.full(len(records), np.nan)
+    modified = np.full(len(records), np.nan)
+    convexity = np.full(len(records), np.nan)
+
+    if valid.any():
+        times, flows = cash_flows(years[valid], coupons[valid], frequency)
+        accrued[valid] = accrued_interest(years[valid], coupons[valid], frequency)
+        rates = yield_to_maturity(clean[valid] + accrued[valid], times, flows, frequency)
+        ytm[valid] = rates
+        macaulay[valid], modified[valid], convexity[valid] = risk_measures(rates, times, flows, frequency)
+
+    fitted = np.isfinite(ytm) & (years >= MIN_CURVE_MATURITY)
+    params = fit_nelson_siegel(years[fitted], ytm[fitted] * 100)
+    curve_yield = nelson_siegel(params, np.where(years > 0, years, 0.0)) if params else np.full(len(records), np.nan)
+    curve_yield = np.where(np.isfinite(ytm), curve_yield, np.nan)
+
+    bonds = []
+    for row, record in enumerate(records):
+        maturity, estimated = maturities[row]
+        bonds.append({
+            'symbol': record.get('symbol'),
+            'name': record.get('name'),
+            'coupon': _round(coupons[row], 4),
+            'maturity_date': maturity.isoformat() if maturity else None,
+            'maturity_estimated': estimated,
+            'years_to_maturity': _round(years[row], 4),
+            'clean_price': _round(clean[row], 4),
+            'accrued_interest': _round(accrued[row], 4),
+            'dirty_price': _round(clean[row] + accrued[row], 4),
+            'ytm': _round(ytm[row] * 100, 4),
+            'quoted_yield': _float(record.get('yield')),
+            'macaulay_duration': _round(macaulay[row], 4),
+            'modified_duration': _round(modified[row], 4),
+            'convexity': _round(convexity[row], 4),
+            'curve_yield': _round(curve_yield[row], 4),
+            'spread_bp': _round((ytm[row] * 100 - curve_yield[row]) * 100, 1),
+        })
+
+    curve = None
+    if params:
+        curve = dict(params, model='nelson-siegel', points=[
+            {'maturity': tenor, 'yield': _round(value, 4)}
+            for tenor, value in zip(CURVE_TENORS, nelson_siegel(params, CURVE_TENORS))
+        ])
+    date = max(settlements).isoformat() if settlements else None
+    return {'date': date, 'frequency': frequency, 'bonds': bonds, 'curve': curve}
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Export en flux de l'historique BRVM (NDJSON, CSV, Arrow IPC)
+Les lignes sont lues par lots Arrow depuis le stockage historique et
+encodées lot après lot : la mémoire du serveur reste bornée par la taille
+d'un lot quelle que soit l'étendue de l'export, et les premiers octets
+(en-tête CSV, schéma Arrow) partent avant la lecture des données.
+"""
+
+import io
+import json
+import datetime
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Nombre de lignes par lot lu et encodé
+EXPORT_BATCH_SIZE = 10000
+
+# Format -> (type MIME, extension du fichier téléchargé)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def _decode_dictionaries(batch):
+    """Remplace les colonnes dictionnaire par leurs valeurs (CSV)"""
+    columns = [
+        column.dictionary_decode() if pa.types.is_dictionary(column.type) else column
+        for column in batch.columns
+    ]
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def _plain_schema(schema):
+    return pa.schema([
+        pa.field(field.name, field.type.value_type) if pa.types.is_dictionary(field.type) else field
+        for field in schema
+    ])
+
+
+def _drain(buffer):
+    """Retourne et vide le contenu d'un tampon d'écriture"""
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _ndjson(batches, schema):
+    for batch in batches:
+        lines = [json.dumps(row, default=_json_default, separators=(",", ":"), allow_nan=False)
+                 for row in batch.to_pylist()]
+        yield ("\n".join(lines) + "\n").encode('utf-8')
+
+
+def _csv(batches, schema):
+    buffer = io.BytesIO()
+    writer = pa_csv.CSVWriter(buffer, _plain_schema(schema))
+    # En-tête envoyé immédiatement
+    yield _drain(buffer)
+    for batch in batches:
+        writer.write_batch(_decode_dictionaries(batch))
+        yield _drain(buffer)
+    writer.close()
+    tail = _drain(buffer)
+    if tail:
+        yield tail
+
+
+def _arrow(batches, schema):
+    buffer = io.BytesIO()
+    # Format « stream » : chaque lot peut porter son propre dictionnaire
+    writer = pa.ipc.new_stream(buffer, schema)
+    yield _drain(buffer)
+    for batch in batches:
+        writer.write_batch(batch)
+        yield _drain(buffer)
+    writer.close()
+    yield _drain(buffer)
+
+
+_ENCODERS = {
+    'ndjson': _ndjson,
+    'csv': _csv,
+    'arrow': _arrow,
+}
+
+
+def export_stream(store, dataset, fmt, start=None, end=None, keys=None, columns=None,
+                  batch_size=EXPORT_BATCH_SIZE):
+    """
+    Générateur d'octets encodant une plage de l'historique dans le format demandé
+
+    Les paramètres sont validés avant le premier octet (ValueError), pour
+    pouvoir répondre 400 plutôt que d'interrompre un flux déjà commencé.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format invalide: {fmt} (attendu: {', '.join(EXPORT_FORMATS)})")
+    if columns:
+        available = store.schema(dataset).names
+        unknown = [c for c in columns if c not in available]
+        if unknown:
+            raise ValueError(f"Colonnes inconnues pour {dataset}: {', '.join(unknown)}")
+    schema = store.schema(dataset, columns)
+    batches = store.iter_batches(dataset, start=start, end=end, columns=columns, keys=keys,
+                                 batch_size=batch_size)
+    return _ENCODERS[fmt](batches, schema)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Séries historiques pour l'API BRVM
+Lecture d'une clé (symbole ou indice) depuis l'historique Parquet grâce à
+l'index clé -> plage de dates, puis ré-échantillonnage OHLCV vectorisé.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Colonnes sources nécessaires au calcul OHLCV et agrégations par période
+SERIES_SPECS = {
+    'stocks': {
+        'columns': ['date', 'last_price', 'high', 'low', 'volume'],
+        'close': 'last_price',
+        'high': 'high',
+        'low': 'low',
+        'volume': 'volume',
+    },
+    'indices': {
+        'columns': ['date', 'value'],
+        'close': 'value',
+        'high': None,
+        'low': None,
+        'volume': None,
+    },
+}
+
+
+def _month_end_rule(version):
+    """Alias pandas de fin de mois : 'ME' depuis pandas 2.2 (où 'M' est déprécié), 'M' avant"""
+    major, minor = (int(part) for part in re.findall(r"\d+", version)[:2])
+    return 'ME' if (major, minor) >= (2, 2) else 'M'
+
+
+# Fréquences pandas : semaines de cotation closes le vendredi, mois calendaires
+INTERVALS = {
+    'daily': None,
+    'weekly': 'W-FRI',
+    'monthly': _month_end_rule(pd.__version__),
+}
+
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class HistoryService:
+    """Accès aux séries historiques par clé, avec un cache LRU par version d'index"""
+
+    def __init__(self, store, max_series=256):
+        self.store = store
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key_range(self, dataset, key):
+        """Plage de dates disponible pour une clé, ou None si elle est inconnue"""
+        return self.store.key_range(dataset, key)
+
+    def series(self, dataset, key):
+        """
+        Retourne la série quotidienne complète d'une clé (indexée par date)
+
+        Seuls les mois référencés par l'index pour cette clé sont lus ; la
+        série est gardée en mémoire tant que l'index du jeu de données ne change pas.
+        """
+        cache_key = (dataset, key, self.store.index_version(dataset))
+        with self._lock:
+            frame = self._series.get(cache_key)
+            if frame is not None:
+                self._series.move_to_end(cache_key)
+                return frame
+
+        spec = SERIES_SPECS[dataset]
+        frame = self.store.read(dataset, columns=spec['columns'], keys=[key])
+        frame = frame.drop_duplicates('date', keep='last').set_index('date').sort_index()
+
+        with self._lock:
+            self._series[cache_key] = frame
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        return frame
+
+    def ohlcv(self, dataset, key, start=None, end=None, interval='daily', fields=None):
+        """
+        Calcule les barres OHLCV d'une clé sur [start, end]
+
+        Les données sources étant quotidiennes (cours de clôture, plus haut,
+        plus bas, volume), l'ouverture d'une période est le premier cours de
+        clôture de cette période.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Intervalle invalide: {interval} (attendu: {', '.join(INTERVALS)})")
+        fields = fields or OHLCV_FIELDS
+        unknown = [f for f in fields if f not in OHLCV_FIELDS]
+        if unknown:
+            raise ValueError(f"Champs inconnus: {', '.join(unknown)}")
+
+        spec = SERIES_SPECS[dataset]
+        frame = self.series(dataset, key)
+        frame = frame.loc[pd.Timestamp(start) if start else None:pd.Timestamp(end) if end else None]
+
+        close = frame[spec['close']]
+        high = frame[spec['high']].fillna(close) if spec['high'] else close
+        low = frame[spec['low']].fillna(close) if spec['low'] else close
+        daily = pd.DataFrame({
+            'open': close,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': frame[spec['volume']] if spec['volume'] else pd.Series(float('nan'), index=frame.index),
+        })
+
+        rule = INTERVALS[interval]
+        if rule is not None and not daily.empty:
+            resampled = daily.resample(rule)
+            daily = pd.DataFrame({
+                'open': resampled['open'].first(),
+                'high': resampled['high'].max(),
+                'low': resampled['low'].min(),
+                'close': resampled['close'].last(),
+                'volume': resampled['volume'].sum(min_count=1),
+            }).dropna(subset=['close'])
+
+        result = daily[fields].astype(object).where(daily[fields].notna(), None)
+        result.insert(0, 'date', daily.index.strftime('%Y-%m-%d'))
+        return result.to_dict(orient='records')
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Réponses HTTP conditionnelles et pré-compressées pour l'API BRVM
+Les corps JSON des instantanés sont servis avec un ETag fort et un en-tête
+Last-Modified ; les variantes gzip/brotli sont construites une seule fois par
+version de données puis conservées en mémoire.
+"""
+
+import gzip
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # Brotli est optionnel : gzip reste disponible
+    brotli = None
+
+# En dessous de cette taille, la compression coûte plus qu'elle ne rapporte
+MIN_COMPRESS_SIZE = 512
+
+ENCODERS = {
+    'gzip': lambda body: gzip.compress(body, compresslevel=9, mtime=0),
+}
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=11)
+
+# Ordre de préférence lorsque le client accepte plusieurs encodages
+PREFERRED_ENCODINGS = ('br', 'gzip')
+
+
+def _parse_accept_encoding(header):
+    """Retourne l'ensemble des encodages acceptés (q > 0) par le client"""
+    accepted = set()
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(token)
+    return accepted
+
+
+def negotiate_encoding(request, body):
+    """Choisit l'encodage de contenu à utiliser pour la réponse (None = identité)"""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return None
+    accepted = _parse_accept_encoding(request.headers.get('Accept-Encoding'))
+    for encoding in PREFERRED_ENCODINGS:
+        if encoding in ENCODERS and (encoding in accepted or '*' in accepted):
+            return encoding
+    return None
+
+
+def _etag_matches(header, tag):
+    """Vérifie si l'en-tête If-None-Match désigne la même version de contenu"""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        # Toutes les variantes encodées d'une même version partagent le préfixe
+        if candidate.strip('"').split('-', 1)[0] == tag:
+            return True
+    return False
+
+
+def _not_modified_since(header, mtime):
+    """Vérifie l'en-tête If-Modified-Since par rapport à la date du contenu"""
+    if not header or mtime is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    return int(mtime) <= since.timestamp()
+
+
+def cached_response(request, payload, mimetype='application/json'):
+    """
+    Construit la réponse HTTP pour un contenu versionné (instantané, agrégat...)
+
+    `payload` doit exposer `body` (bytes), `etag`, `mtime` et `derived()`.
+    Renvoie 304 si le client possède déjà cette version, sinon le corps dans
+    l'encodage négocié, compressé une seule fois par version.
+    """
+    encoding = negotiate_encoding(request, payload.body)
+    tag = payload.etag
+    etag = f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+    }
+    if payload.mtime is not None:
+        last_modified = datetime.datetime.fromtimestamp(int(payload.mtime), tz=datetime.timezone.utc)
+        headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, tag)
+    else:
+        not_modified = _not_modified_since(request.headers.get('If-Modified-Since'), payload.mtime)
+
+    if not_modified:
+        return Response(status=304, headers=headers)
+
+    body = payload.body
+    if encoding:
+        body = payload.derived(('encoding', encoding), lambda p: ENCODERS[encoding](p.body))
+        headers['Content-Encoding'] = encoding
+
+    return Response(body, mimetype=mimetype, headers=headers)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Table compacte des cotations du dernier instantané
+Les colonnes texte (symbole, nom, ISIN...) sont stockées sous forme de codes
+entiers vers des chaînes internées, les prix et volumes dans des tableaux
+NumPy contigus, avec un index symbole -> ligne. La table est construite une
+fois par instantané et permet des recherches en O(1) ainsi que des filtres
+et tris vectorisés (plus fortes hausses, titres les plus échangés...).
+"""
+
+import sys
+import numbers
+
+import numpy as np
+
+
+def _column_kind(values):
+    """
+    Type d'une colonne d'enregistrements : 'bool', 'int' (sans valeur
+    manquante), 'float' (nombres, None devenant NaN) ou 'text'
+    """
+    present = [v for v in values if v is not None]
+    complete = len(present) == len(values)
+    booleans = [isinstance(v, (bool, np.bool_)) for v in present]
+    if not present or (any(booleans) and not (all(booleans) and complete)):
+        return 'text'
+    if all(booleans):
+        return 'bool'
+    if not all(isinstance(v, numbers.Real) for v in present):
+        return 'text'
+    if complete and all(isinstance(v, numbers.Integral) for v in present):
+        return 'int'
+    return 'float'
+
+
+class QuoteTable:
+    """Table en colonnes des cotations d'un instantané (actions ou obligations)"""
+
+    def __init__(self, columns, categories=None, key='symbol'):
+        # columns : {nom: tableau NumPy} ; pour les colonnes texte, le tableau
+        # contient des codes (-1 pour une valeur manquante) vers `categories[nom]`
+        self.columns = columns
+        self.categories = categories or {}
+        self.names = list(columns)
+        self.key = key
+        self._size = len(next(iter(columns.values()))) if columns else 0
+        keys = self._decoded(key) if key in columns else []
+        self.index = {value: row for row, value in enumerate(keys)}
+        # Ordres de tri calculés à la demande, une fois par colonne et par sens
+        self._orders = {}
+
+    @classmethod
+    def from_records(cls, records, key='symbol'):
+        """Construit la table à partir de la liste d'enregistrements d'un instantané"""
+        records = records or []
+        # Colonnes dans l'ordre d'apparition des champs, champ absent = valeur manquante
+        names = list(dict.fromkeys(name for record in records for name in record))
+        columns = {}
+        categories = {}
+        for name in names:
+            values = [record.get(name) for record in records]
+            kind = _column_kind(values)
+            if kind == 'bool':
+                columns[name] = np.array(values, dtype=bool)
+            elif kind == 'int':
+                columns[name] = np.array(values, dtype=np.int64)
+            elif kind == 'float':
+                columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                texts = [None if v is None or v != v else str(v) for v in values]
+                # Catégories triées : l'ordre des codes est l'ordre alphabétique
+                labels = sorted({t for t in texts if t is not None})
+                codes = {label: code for code, label in enumerate(labels)}
+                columns[name] = np.array([-1 if t is None else codes[t] for t in texts], dtype=np.int32)
+                categories[name] = [sys.intern(label) for label in labels]
+        return cls(columns, categories, key=key)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def is_numeric(self, name):
+        """Indique si une colonne est numérique (triable et filtrable par valeur)"""
+        return name in self.columns and name not in self.categories
+
+    def _decoded(self, name):
+        column = self.columns[name]
+        if name in self.categories:
+            categories = self.categories[name]
+            return [categories[code] if code >= 0 else None for code in column.tolist()]
+        return column.tolist()
+
+    def values(self, name):
+        """Valeurs d'une colonne : tableau NumPy (codes pour une colonne texte)"""
+        return self.columns[name]
+
+    def code(self, name, value):
+        """Code d'une valeur dans une colonne texte, ou None si elle est absente"""
+        try:
+            return self.categories[name].index(value)
+        except ValueError:
+            return None
+
+    def row(self, position, fields=None):
+        """Enregistrement d'une ligne, NaN convertis en None"""
+        record = {}
+        for name in fields or self.names:
+            value = self.columns[name][position].item()
+            if name in self.categories:
+                record[name] = self.categories[name][value] if value >= 0 else None
+            else:
+                record[name] = None if value != value else value
+        return record
+
+    def get(self, key, fields=None):
+        """Enregistrement d'un symbole (recherche O(1)), ou None s'il est inconnu"""
+        position = self.index.get(key)
+        return None if position is None else self.row(position, fields)
+
+    def rows(self, positions, fields=None):
+        """Enregistrements des lignes demandées, dans l'ordre donné"""
+        return [self.row(int(position), fields) for position in positions]
+
+    def order(self, name, descending=False):
+        """
+        Permutation des lignes triées selon une colonne (valeurs manquantes en
+        dernier, ordre d'origine en cas d'égalité), calculée une seule fois
+        """
+        cache_key = (name, descending)
+        order = self._orders.get(cache_key)
+        if order is None:
+            column = self.columns[name]
+            keys = column.astype(np.float64)
+            if name in self.categories:
+                # Catégories triées : l'ordre des codes est l'ordre alphabétique
+                keys[column < 0] = np.nan
+            missing = np.isnan(keys)
+            keys = np.where(missing, 0.0, -keys if descending else keys)
+            order = np.lexsort((np.arange(self._size), keys, missing))
+            self._orders[cache_key] = order
+        return order
+
+    def select(self, keys=None, equals=None, sort=None, descending=False):
+        """
+        Positions des lignes retenues, dans l'ordre de tri demandé
+
+        `keys` restreint aux symboles donnés, `equals` ({colonne: valeurs})
+        aux lignes dont la colonne texte prend l'une des valeurs.
+        """
+        mask = None
+        if keys is not None:
+            mask = np.zeros(self._size, dtype=bool)
+            mask[[self.index[k] for k in keys if k in self.index]] = True
+        for name, wanted in (equals or {}).items():
+            codes = [code for code in (self.code(name, value) for value in wanted) if code is not None]
+            condition = np.isin(self.columns[name], codes)
+            mask = condition if mask is None else mask & condition
+
+        order = self.order(sort, descending) if sort else np.arange(self._size)
+        return order if mask is None else order[mask[order]]
+
+    def top(self, name, limit=10, ascending=False, mask=None):
+        """
+        Positions des `limit` lignes ayant les plus grandes (ou plus petites)
+        valeurs d'une colonne numérique ; les valeurs manquantes sont ignorées
+        """
+        values = self.columns[name].astype(np.float64, copy=False)
+        valid = ~np.isnan(values)
+        if mask is not None:
+            valid &= mask
+        positions = np.flatnonzero(valid)
+        keys = values[positions] if ascending else -values[positions]
+        if limit < len(positions):
+            # Sélection partielle puis tri des seules lignes retenues
+            selected = np.argpartition(keys, limit)[:limit]
+            positions, keys = positions[selected], keys[selected]
+        # Tri par valeur puis par ordre d'origine en cas d'égalité
+        return positions[np.lexsort((positions, keys))]
+
+    def nbytes(self):
+        """Taille mémoire approximative des colonnes (hors index)"""
+        total = sum(column.nbytes for column in self.columns.values())
+        for categories in self.categories.values():
+            total += sum(sys.getsizeof(c) for c in categories)
+        return total
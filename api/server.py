@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Serveur de production de l'API BRVM
+Exécute l'application Flask sous un serveur WSGI multi-processus (gunicorn)
+ou, à défaut (Windows, gunicorn absent), multi-threads (waitress).
+
+Les instantanés de données sont chargés avant le fork des workers : les
+pages mémoire correspondantes sont partagées en copie sur écriture, et les
+premières requêtes de chaque worker sont servies à chaud. L'arrêt sur
+SIGTERM/SIGINT est gracieux : les requêtes en cours sont terminées.
+
+Avec les workers gevent, le monkey-patching est laissé au worker gevent de
+gunicorn (comme avec `gunicorn -k gevent`), qui l'applique dans chaque
+worker juste après le fork : l'application n'est alors pas préchargée dans
+l'arbitre, pour être importée dans le worker une fois celui-ci patché.
+
+Utilisation:
+
+    python api/server.py --port 5000 --workers 4 --threads 2
+"""
+
+import os
+import signal
+import logging
+import argparse
+import importlib.util
+
+logger = logging.getLogger("brvm_server")
+
+# Délai laissé aux requêtes en cours lors d'un arrêt (secondes)
+GRACEFUL_TIMEOUT = 30
+
+
+def default_workers():
+    """Nombre de workers par défaut : (2 x CPU) + 1, recommandation de gunicorn"""
+    return (os.cpu_count() or 1) * 2 + 1
+
+
+def default_worker_class(threads):
+    """
+    Type de worker gunicorn par défaut : gevent s'il est installé (les flux
+    /api/stream n'occupent alors pas de thread), sinon gthread ou sync
+    """
+    if importlib.util.find_spec("gevent") is not None:
+        return 'gevent'
+    return 'gthread' if threads > 1 else 'sync'
+
+
+def available_servers():
+    """Serveurs WSGI installés, par ordre de préférence"""
+    servers = []
+    if os.name != 'nt':
+        try:
+            import gunicorn  # noqa: F401
+            servers.append('gunicorn')
+        except ImportError:
+            pass
+    try:
+        import waitress  # noqa: F401
+        servers.append('waitress')
+    except ImportError:
+        pass
+    return servers
+
+
+def load_app(preload=True):
+    """Importe l'application et charge ses instantanés en mémoire"""
+    from app import app, snapshot_cache
+    if preload:
+        try:
+            snapshot_cache.preload()
+            logger.info(f"Instantanés préchargés: {', '.join(snapshot_cache.datasets())}")
+        except Exception as e:
+            # Les données seront chargées à la première requête
+            logger.warning(f"Préchargement des instantanés impossible: {e}")
+    return app
+
+
+def serve_gunicorn(host, port, workers, threads, worker_class=None):
+    """Démarre l'API sous gunicorn (pré-fork, application chargée dans l'arbitre)"""
+    from gunicorn.app.base import BaseApplication
+
+    worker_class = worker_class or default_worker_class(threads)
+    if worker_class != 'gevent':
+        # Chaque abonné à /api/stream occupe un thread : la moitié au plus leur est laissée
+        os.environ.setdefault("BRVM_STREAM_MAX_SUBSCRIBERS", str(max(1, threads // 2)))
+    if workers > 1:
+        # Chaque worker publie ses métriques pour que /metrics les agrège toutes
+        os.environ.setdefault("BRVM_METRICS_SHARED", "1")
+    # gevent : le worker patche la bibliothèque standard après le fork ; une
+    # application préchargée dans l'arbitre garderait des verrous natifs
+    preload = worker_class != 'gevent'
+
+    class BRVMApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    options = {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'threads': threads,
+        'worker_class': worker_class,
+        # Connexions simultanées par worker gevent (flux /api/stream inactifs)
+        'worker_connections': 10000,
+        # Application (et instantanés) chargée une seule fois avant le fork
+        'preload_app': preload,
+        'graceful_timeout': GRACEFUL_TIMEOUT,
+        'timeout': 60,
+        'keepalive': 5,
+        'accesslog': None,
+        'errorlog': '-',
+    }
+    logger.info(f"Démarrage de gunicorn sur {host}:{port} ({workers} workers {worker_class} x {threads} threads)")
+    BRVMApplication(options).run()
+
+
+def serve_waitress(host, port, threads):
+    """Démarre l'API sous waitress (un processus, plusieurs threads)"""
+    from waitress import create_server
+
+    server = create_server(load_app(), host=host, port=port, threads=threads)
+
+    def shutdown(signum, frame):
+        # waitress termine les requêtes en cours sur SystemExit/KeyboardInterrupt
+        logger.info("Arrêt du serveur API (fin des requêtes en cours)...")
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+
+    logger.info(f"Démarrage de waitress sur {host}:{port} ({threads} threads)")
+    server.run()
+
+
+def serve(host='0.0.0.0', port=5000, workers=None, threads=2, server=None, worker_class=None):
+    """Démarre l'API avec le serveur WSGI demandé ou le premier disponible"""
+    servers = available_servers()
+    if not servers:
+        raise RuntimeError("Aucun serveur WSGI installé (pip install gunicorn ou pip install waitress)")
+
+    server = server or servers[0]
+    if server not in servers:
+        raise RuntimeError(f"Serveur WSGI indisponible: {server} (disponibles: {', '.join(servers)})")
+
+    workers = workers or default_workers()
+    if server == 'gunicorn':
+        serve_gunicorn(host, port, workers, threads, worker_class)
+    else:
+        # waitress n'a qu'un processus : les workers deviennent des threads
+        serve_waitress(host, port, max(threads, workers * threads))
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='BRVM Data Platform - Serveur API de production')
+    parser.add_argument('--host', default='0.0.0.0', help='Adresse d\'écoute (par défaut: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=5000, help='Port d\'écoute (par défaut: 5000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Nombre de processus workers (par défaut: 2 x CPU + 1)')
+    parser.add_argument('--threads', type=int, default=2,
+                        help='Nombre de threads par worker (par défaut: 2)')
+    parser.add_argument('--server', choices=('gunicorn', 'waitress'), default=None,
+                        help='Serveur WSGI (par défaut: gunicorn si disponible, sinon waitress)')
+    parser.add_argument('--worker-class', choices=('sync', 'gthread', 'gevent'), default=None,
+                        help='Type de worker gunicorn (par défaut: gevent s\'il est installé, sinon gthread ou sync)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    args = parse_arguments()
+    serve(args.host, args.port, args.workers, args.threads, args.server, args.worker_class)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache mémoire des instantanés de données pour l'API BRVM
+Chaque jeu de données (actions, obligations, indices...) est chargé une seule
+fois par version de la source, puis servi depuis la mémoire avec son JSON
+pré-sérialisé. Pour les fichiers, la version est contrôlée par l'inode/mtime
+du fichier et du répertoire qui le contient ; d'autres sources (MongoDB)
+fournissent leur propre numéro de version.
+"""
+
+import os
+import json
+import time
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+
+
+def content_etag(body):
+    """Calcule l'identifiant (sans guillemets) d'un contenu à partir de son empreinte"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _stat_key(path):
+    """Retourne l'empreinte (inode, mtime, taille) d'un chemin, ou None s'il n'existe pas"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class Snapshot:
+    """Instantané immuable d'un jeu de données chargé en mémoire"""
+
+    __slots__ = ('dataset', 'path', 'records', 'body', 'version', 'mtime',
+                 'etag', '_derived', '_lock')
+
+    def __init__(self, dataset, path, records, body, version, mtime):
+        self.dataset = dataset
+        self.path = path
+        self.records = records
+        self.body = body
+        self.version = version
+        self.mtime = mtime
+        # Empreinte du contenu : deux fichiers identiques partagent le même ETag
+        self.etag = content_etag(body)
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key, builder):
+        """
+        Retourne une valeur dérivée de l'instantané, calculée une seule fois
+        par version de données (vues triées, copies compressées, etc.)
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = builder(self)
+            return self._derived[key]
+
+
+class FileSource:
+    """
+    Jeu de données stocké dans des fichiers quotidiens « <préfixe>YYYY-MM-DD<suffixe> »
+    (`suffix` peut être un tuple : fichiers bruts compressés ou non)
+
+    Un nouveau fichier (nouvelle journée) modifie le mtime du répertoire, ce
+    qui déclenche une nouvelle résolution du fichier le plus récent ; une
+    réécriture du fichier courant est détectée via son propre inode/mtime.
+    """
+
+    def __init__(self, directory, prefix, suffix, loader):
+        self.directory = directory
+        self.prefix = prefix
+        self.suffixes = (suffix,) if isinstance(suffix, str) else tuple(suffix)
+        self.loader = loader
+        self._dir_key = None
+        self._path = None
+
+    def resolve(self, today):
+        """Retourne le fichier du jour s'il existe, sinon le plus récent"""
+        for suffix in self.suffixes:
+            today_file = self.directory / f"{self.prefix}{today}{suffix}"
+            if today_file.exists():
+                return today_file
+
+        files = [f for suffix in self.suffixes for f in self.directory.glob(f"{self.prefix}*{suffix}")]
+        if files:
+            return max(files, key=lambda f: f.name)
+        return None
+
+    def reset(self):
+        """Oublie le fichier résolu : le répertoire sera de nouveau parcouru"""
+        self._dir_key = None
+
+    def version(self):
+        """Version courante des données, ou None si aucun fichier n'existe"""
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        dir_key = (today, _stat_key(self.directory))
+        if dir_key != self._dir_key:
+            self._path = self.resolve(today)
+            self._dir_key = dir_key
+
+        if self._path is None:
+            return None
+
+        file_key = _stat_key(self._path)
+        if file_key is None:
+            # Fichier supprimé entre-temps : nouvelle résolution au prochain passage
+            self._dir_key = None
+            return None
+        return f"{self._path.name}:{file_key[0]}:{file_key[1]}:{file_key[2]}"
+
+    def load(self):
+        """Charge le fichier courant ; retourne (enregistrements, chemin, date de modification)"""
+        path = self._path
+        return self.loader(path), path, os.stat(path).st_mtime
+
+
+class _Entry:
+    """État du cache pour un jeu de données"""
+
+    __slots__ = ('snapshot', 'version', 'next_check')
+
+    def __init__(self):
+        self.snapshot = None
+        self.version = None
+        self.next_check = 0.0
+
+
+class SnapshotCache:
+    """
+    Cache des derniers instantanés par jeu de données
+
+    Les requêtes « chaudes » se limitent à une lecture de dictionnaire : la
+    source n'est re-vérifiée qu'au plus une fois toutes les `check_interval`
+    secondes, et l'instantané n'est rechargé que si sa version a changé.
+    """
+
+    def __init__(self, dumps=None, check_interval=1.0, max_bundles=32):
+        self.dumps = dumps or json.dumps
+        self.check_interval = check_interval
+        self.max_bundles = max_bundles
+        self._sources = {}
+        self._entries = {}
+        self._bundles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, dataset, source):
+        """
+        Déclare un jeu de données et sa source : tout objet exposant
+        `version()` (valeur comparable, None si aucune donnée) et `load()`
+        """
+        self._sources[dataset] = source
+        self._entries[dataset] = _Entry()
+
+    def datasets(self):
+        """Liste des jeux de données déclarés"""
+        return list(self._sources)
+
+    def invalidate(self, dataset=None):
+        """Force la re-vérification d'un jeu de données (ou de tous) à la prochaine requête"""
+        targets = [dataset] if dataset else list(self._entries)
+        for name in targets:
+            entry = self._entries.get(name)
+            if entry is not None:
+                entry.next_check = 0.0
+                reset = getattr(self._sources[name], 'reset', None)
+                if reset is not None:
+                    reset()
+
+    def clear(self):
+        """Oublie tous les instantanés chargés : la prochaine requête relit les sources"""
+        with self._lock:
+            for dataset in self._entries:
+                self._entries[dataset] = _Entry()
+                reset = getattr(self._sources[dataset], 'reset', None)
+                if reset is not None:
+                    reset()
+            self._bundles.clear()
+
+    def get(self, dataset):
+        """Retourne l'instantané courant d'un jeu de données, ou None si aucune donnée n'existe"""
+        entry = self._entries[dataset]
+        if time.monotonic() < entry.next_check:
+            return entry.snapshot
+
+        with self._lock:
+            if time.monotonic() < entry.next_check:
+                return entry.snapshot
+            self._refresh(dataset, entry)
+            entry.next_check = time.monotonic() + self.check_interval
+            return entry.snapshot
+
+    def preload(self):
+        """Charge tous les jeux de données déclarés (utile avant un fork des workers)"""
+        for dataset in self._sources:
+            self.get(dataset)
+
+    def get_many(self, datasets):
+        """
+        Retourne les instantanés de plusieurs jeux de données, vérifiés en un
+        seul passage sous le verrou du cache (aucun rechargement entre deux)
+        """
+        with self._lock:
+            now = time.monotonic()
+            for dataset in datasets:
+                entry = self._entries[dataset]
+                if now >= entry.next_check:
+                    self._refresh(dataset, entry)
+                    entry.next_check = time.monotonic() + self.check_interval
+            return [self._entries[dataset].snapshot for dataset in datasets]
+
+    def bundle(self, datasets, defaults=None):
+        """
+        Regroupe plusieurs jeux de données dans un seul document JSON
+        {"version": ..., "<jeu>": ...}, assemblé à partir des corps déjà
+        sérialisés et mis en cache tant qu'aucun des instantanés ne change
+
+        `defaults` fournit la valeur d'un jeu de données sans instantané.
+        """
+        defaults = defaults or {}
+        snapshots = self.get_many(datasets)
+        key = tuple((dataset, snapshot.etag if snapshot else None)
+                    for dataset, snapshot in zip(datasets, snapshots))
+
+        with self._lock:
+            cached = self._bundles.get(key)
+            if cached is not None:
+                self._bundles.move_to_end(key)
+                return cached
+
+        version = content_etag("|".join(f"{d}:{e}" for d, e in key).encode('utf-8'))
+        parts = [b'"version":' + self.dumps(version).encode('utf-8').rstrip()]
+        for dataset, snapshot in zip(datasets, snapshots):
+            body = snapshot.body if snapshot is not None else self.dumps(defaults.get(dataset)).encode('utf-8')
+            parts.append(self.dumps(dataset).encode('utf-8').rstrip() + b':' + body.rstrip())
+        body = b'{' + b','.join(parts) + b'}\n'
+
+        mtimes = [snapshot.mtime for snapshot in snapshots if snapshot is not None and snapshot.mtime]
+        bundle = Snapshot('+'.join(datasets), None, None, body, version, max(mtimes) if mtimes else None)
+
+        with self._lock:
+            self._bundles[key] = bundle
+            while len(self._bundles) > self.max_bundles:
+                self._bundles.popitem(last=False)
+        return bundle
+
+    def _refresh(self, dataset, entry):
+        """Vérifie la version de la source et recharge l'instantané si nécessaire"""
+        source = self._sources[dataset]
+        version = source.version()
+
+        if version is None:
+            entry.snapshot = None
+            entry.version = None
+            return
+
+        if version == entry.version and entry.snapshot is not None:
+            return
+
+        records, path, mtime = source.load()
+        body = self.dumps(records).encode('utf-8')
+        entry.snapshot = Snapshot(dataset, path, records, body, str(version), mtime)
+        entry.version = version
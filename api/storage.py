@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Backends de stockage de l'API BRVM
+Par défaut l'API lit les fichiers locaux (data/raw, data/processed et
+l'historique Parquet). Avec BRVM_STORAGE=mongo, elle lit la base MongoDB
+alimentée par le scraper, ce qui permet de faire tourner plusieurs nœuds
+d'API sur un même stockage. pymongo, pandas et pyarrow ne sont importés
+qu'à la première utilisation : le backend fichiers n'en dépend pas.
+
+Variables de configuration:
+    BRVM_STORAGE          files (défaut) ou mongo
+    BRVM_MONGO_URI        URI de connexion (défaut: mongodb://localhost:27017/)
+    BRVM_MONGO_DB         base de données (défaut: brvm_data)
+    BRVM_MONGO_POOL_SIZE  taille maximale du pool de connexions (défaut: 20)
+"""
+
+import os
+import datetime
+import threading
+
+STORAGE_BACKENDS = ('files', 'mongo')
+
+# Clé de chaque collection (identique à celle du scraper)
+MONGO_KEYS = {
+    'market_status': None,
+    'indices': 'name',
+    'stocks': 'symbol',
+    'bonds': 'symbol',
+}
+
+# Champs internes jamais renvoyés par l'API
+_HIDDEN_FIELDS = {'_id': 0, 'updated_at': 0}
+
+# Sens de tri MongoDB (valeurs de ASCENDING et DESCENDING)
+ASCENDING = 1
+DESCENDING = -1
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def _timestamp(moment):
+    """Horodatage POSIX d'une date MongoDB (naïve en UTC), ou None"""
+    if not isinstance(moment, datetime.datetime):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.timestamp()
+
+
+def storage_backend():
+    """Backend de stockage configuré (BRVM_STORAGE)"""
+    backend = os.environ.get("BRVM_STORAGE", "files").lower()
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend de stockage inconnu: {backend} (attendu: {', '.join(STORAGE_BACKENDS)})")
+    return backend
+
+
+def get_mongo_client():
+    """
+    Retourne l'unique MongoClient (et son pool de connexions) du processus
+
+    Le client est recréé après un fork : un MongoClient ne doit pas être
+    partagé entre processus.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            import pymongo
+            _client = pymongo.MongoClient(
+                os.environ.get("BRVM_MONGO_URI", "mongodb://localhost:27017/"),
+                maxPoolSize=int(os.environ.get("BRVM_MONGO_POOL_SIZE", "20")),
+                connect=False
+            )
+            _client_pid = os.getpid()
+        return _client
+
+
+def get_mongo_db():
+    """Base de données MongoDB configurée"""
+    return get_mongo_client()[os.environ.get("BRVM_MONGO_DB", "brvm_data")]
+
+
+class MongoSource:
+    """
+    Source d'instantanés lue dans MongoDB : documents de la date la plus récente
+
+    La version provient du document `meta` de la collection, incrémenté par
+    le scraper à chaque écriture : une seule lecture par _id suffit à savoir
+    si l'instantané doit être rechargé. La date de modification
+    (Last-Modified) est son `updated_at`, mis à jour en même temps : elle ne
+    change pas d'un rechargement à l'autre tant que les données sont identiques.
+    """
+
+    def __init__(self, collection_name, db_getter=get_mongo_db):
+        self.collection_name = collection_name
+        self.key = MONGO_KEYS[collection_name]
+        self._db_getter = db_getter
+
+    @property
+    def collection(self):
+        return self._db_getter()[self.collection_name]
+
+    def version(self):
+        """Version des données, ou None si la collection est vide"""
+        meta = self._db_getter().meta.find_one({'_id': self.collection_name}, {'version': 1})
+        if meta is not None:
+            return meta.get('version')
+        # Base alimentée avant l'introduction des versions : date la plus récente
+        latest = self.collection.find_one({}, {'date': 1, '_id': 0}, sort=[('date', DESCENDING)])
+        return latest and latest.get('date')
+
+    def modified_at(self, date):
+        """
+        Date de dernière écriture (horodatage POSIX) : `updated_at` du document
+        meta, sinon le plus récent des documents de la date (base antérieure aux
+        documents meta), ou None
+        """
+        meta = self._db_getter().meta.find_one({'_id': self.collection_name}, {'updated_at': 1})
+        if meta is not None and meta.get('updated_at') is not None:
+            return _timestamp(meta['updated_at'])
+        newest = self.collection.find_one({'date': date}, {'updated_at': 1, '_id': 0},
+                                          sort=[('updated_at', DESCENDING)])
+        return _timestamp(newest and newest.get('updated_at'))
+
+    def load(self):
+        """Charge les documents de la date la plus récente (projection sans champs internes)"""
+        latest = self.collection.find_one({}, {'date': 1, '_id': 0}, sort=[('date', DESCENDING)])
+        if latest is None:
+            return ([] if self.key else {}), None, None
+
+        if self.key is None:
+            # Statut du marché : un seul document par date
+            record = self.collection.find_one({'date': latest['date']}, _HIDDEN_FIELDS)
+            return record, None, self.modified_at(latest['date'])
+
+        cursor = self.collection.find({'date': latest['date']}, _HIDDEN_FIELDS).sort(self.key, ASCENDING)
+        return list(cursor), None, self.modified_at(latest['date'])
+
+
+class MongoHistoryStore:
+    """
+    Lecture de l'historique dans MongoDB, avec la même interface que
+    HistoryStore pour le service d'historique
+
+    Les requêtes s'appuient sur l'index unique (clé, date) créé par le
+    scraper et ne projettent que les colonnes demandées.
+    """
+
+    def __init__(self, db_getter=get_mongo_db, batch_size=5000):
+        self._db_getter = db_getter
+        self.batch_size = batch_size
+
+    def _collection(self, dataset):
+        if MONGO_KEYS.get(dataset) is None:
+            raise ValueError(f"Jeu de données inconnu: {dataset}")
+        return self._db_getter()[dataset]
+
+    def index_version(self, dataset):
+        """Version des données d'un jeu (document meta écrit par le scraper)"""
+        meta = self._db_getter().meta.find_one({'_id': dataset}, {'version': 1})
+        return meta and meta.get('version')
+
+    def key_range(self, dataset, key):
+        """Retourne (première date, dernière date, None) d'une clé, ou None si elle est inconnue"""
+        collection = self._collection(dataset)
+        key_field = MONGO_KEYS[dataset]
+        query = {key_field: key}
+        first = collection.find_one(query, {'date': 1, '_id': 0}, sort=[('date', ASCENDING)])
+        if first is None:
+            return None
+        last = collection.find_one(query, {'date': 1, '_id': 0}, sort=[('date', DESCENDING)])
+        return (datetime.date.fromisoformat(first['date']),
+                datetime.date.fromisoformat(last['date']),
+                None)
+
+    def iter_documents(self, dataset, start=None, end=None, columns=None, keys=None):
+        """Itère sur les documents d'une plage, sans matérialiser le résultat"""
+        key_field = MONGO_KEYS[dataset]
+        query = {}
+        if keys:
+            query[key_field] = {'$in': list(keys)}
+        date_range = {}
+        if start:
+            date_range['$gte'] = str(start)
+        if end:
+            date_range['$lte'] = str(end)
+        if date_range:
+            query['date'] = date_range
+
+        projection = {'_id': 0}
+        if columns:
+            projection.update({column: 1 for column in columns})
+        else:
+            projection['updated_at'] = 0
+
+        cursor = self._collection(dataset).find(query, projection, batch_size=self.batch_size)
+        return cursor.sort([(key_field, ASCENDING), ('date', ASCENDING)])
+
+    def schema(self, dataset, columns=None):
+        """Schéma Arrow d'un jeu de données (identique à celui de l'historique Parquet)"""
+        import pyarrow as pa
+        from history_store import SCHEMAS
+
+        schema = SCHEMAS[dataset]
+        return schema if columns is None else pa.schema([schema.field(c) for c in columns])
+
+    def iter_batches(self, dataset, start=None, end=None, columns=None, keys=None, batch_size=None):
+        """Itère sur une plage de l'historique par lots Arrow, au fil du curseur"""
+        import pyarrow as pa
+
+        schema = self.schema(dataset, columns)
+        batch_size = batch_size or self.batch_size
+        cursor = self.iter_documents(dataset, start=start, end=end, columns=schema.names, keys=keys)
+
+        chunk = []
+        for document in cursor:
+            if 'date' in document:
+                document['date'] = datetime.date.fromisoformat(document['date'])
+            chunk.append(document)
+            if len(chunk) >= batch_size:
+                yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+                chunk = []
+        if chunk:
+            yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+    def read(self, dataset, start=None, end=None, columns=None, keys=None):
+        """Lit une plage de l'historique sous forme de DataFrame (dates converties)"""
+        import pandas as pd
+
+        cursor = self.iter_documents(dataset, start=start, end=end, columns=columns, keys=keys)
+        frame = pd.DataFrame.from_records(cursor, columns=columns)
+        if 'date' in frame.columns:
+            frame['date'] = pd.to_datetime(frame['date'])
+        return frame
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Diffusion en direct des changements de cotations (Server-Sent Events)
+Un thread de surveillance compare chaque nouvel instantané au précédent et
+publie uniquement les lignes modifiées (actions, indices, obligations) et
+les champs modifiés du statut du marché. Chaque delta est sérialisé une
+seule fois en trame SSE, puis lu par tous les abonnés depuis un tampon
+circulaire commun : pas de file ni de copie par client.
+
+Les abonnés attendent sur une condition partagée. Sous un worker gevent
+(`--worker-class gevent`), chaque connexion inactive ne coûte qu'une
+greenlet, ce qui permet de tenir des milliers de connexions ouvertes. Sous
+des workers à threads, chaque abonné occupe un thread : leur nombre par
+processus est alors plafonné (`max_subscribers`).
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import datetime
+import threading
+from collections import deque
+
+logger = logging.getLogger("brvm_stream")
+
+# Clé des lignes de chaque jeu de données diffusé (None : document unique)
+STREAM_KEYS = {
+    'market_status': None,
+    'indices': 'name',
+    'stocks': 'symbol',
+    'bonds': 'symbol',
+}
+
+# Intervalle entre deux commentaires de maintien de connexion (secondes)
+HEARTBEAT_INTERVAL = 15.0
+
+
+def cooperative():
+    """Vrai sous un worker gevent (threading patché) : un abonné n'occupe pas de thread"""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+def _record_delta(previous, current, key):
+    """Lignes ajoutées ou modifiées et clés supprimées entre deux listes d'enregistrements"""
+    before = {record.get(key): record for record in previous or []}
+    after = {record.get(key): record for record in current or []}
+    changed = [record for k, record in after.items() if before.get(k) != record]
+    removed = [k for k in before if k not in after]
+    return changed, removed
+
+
+def _fields_delta(previous, current):
+    """Champs ajoutés ou modifiés d'un document unique"""
+    previous = previous or {}
+    return {field: value for field, value in (current or {}).items() if previous.get(field) != value}
+
+
+def compute_delta(dataset, previous, current):
+    """Delta JSON-sérialisable d'un jeu de données, ou None s'il n'a pas changé"""
+    key = STREAM_KEYS[dataset]
+    if key is None:
+        fields = _fields_delta(previous, current)
+        return fields or None
+
+    changed, removed = _record_delta(previous, current, key)
+    if not changed and not removed:
+        return None
+    delta = {'changed': changed}
+    if removed:
+        delta['removed'] = removed
+    return delta
+
+
+class StreamHub:
+    """
+    Hub de diffusion : un producteur (le thread de surveillance), N abonnés
+
+    Les trames publiées sont numérotées et conservées dans un tampon borné ;
+    un client qui se reconnecte avec `Last-Event-ID` reçoit les trames
+    manquées, ou un événement `reset` s'il a trop de retard (il doit alors
+    recharger les instantanés complets).
+
+    Les identifiants sont de la forme `<époque>:<numéro>`, l'époque
+    (pid et instant de démarrage) étant propre au processus : un client
+    reconnecté à un autre worker, ou après un redémarrage, présente une
+    époque différente et reçoit `reset` au lieu de reprendre sur une
+    numérotation qui n'est pas la sienne.
+    """
+
+    def __init__(self, snapshot_cache, datasets=None, dumps=None, poll_interval=2.0, buffer_size=256,
+                 max_subscribers=None):
+        self.snapshot_cache = snapshot_cache
+        self.datasets = [d for d in (datasets or STREAM_KEYS) if d in snapshot_cache.datasets()]
+        self.dumps = dumps or (lambda obj: json.dumps(obj, separators=(",", ":")))
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        """
+        Démarre le thread de surveillance dans le processus courant
+
+        Les primitives de synchronisation sont créées ici, après le fork des
+        workers et l'éventuel monkey-patching gevent, et non à l'import.
+        """
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._condition = threading.Condition()
+            self._events = deque(maxlen=self.buffer_size)
+            self._seq = 0
+            self._epoch = f"{os.getpid()}-{int(time.time() * 1000):x}"
+            self._last = {}
+            self._subscribers = 0
+            self._started_pid = os.getpid()
+            watcher = threading.Thread(target=self._watch, name="brvm-stream-watcher", daemon=True)
+            watcher.start()
+
+    def _watch(self):
+        """Boucle de surveillance des instantanés"""
+        # État initial : les clients le chargent via les endpoints classiques
+        for dataset in self.datasets:
+            self._last[dataset] = self.snapshot_cache.get(dataset)
+
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Erreur lors de la surveillance des instantanés: {e}")
+
+    def poll(self):
+        """Compare les instantanés courants aux précédents et publie le delta éventuel"""
+        changes = {}
+        for dataset in self.datasets:
+            snapshot = self.snapshot_cache.get(dataset)
+            previous = self._last.get(dataset)
+            if snapshot is previous or snapshot is None:
+                continue
+            delta = compute_delta(dataset, previous.records if previous else None, snapshot.records)
+            self._last[dataset] = snapshot
+            if delta is not None:
+                changes[dataset] = delta
+
+        if changes:
+            self.publish('delta', changes)
+
+    def publish(self, event, data):
+        """Sérialise une trame une seule fois et réveille tous les abonnés"""
+        self._start()
+        with self._condition:
+            self._seq += 1
+            payload = dict(data, time=datetime.datetime.now().isoformat(timespec='seconds'))
+            frame = f"id: {self._event_id(self._seq)}\nevent: {event}\ndata: {self.dumps(payload)}\n\n".encode('utf-8')
+            self._events.append((self._seq, frame))
+            self._condition.notify_all()
+
+    def _event_id(self, seq):
+        """Identifiant SSE d'une trame : époque du processus et numéro"""
+        return f"{self._epoch}:{seq}"
+
+    def _resume_cursor(self, last_event_id):
+        """
+        Numéro à partir duquel reprendre pour un `Last-Event-ID`, ou None s'il
+        n'appartient pas à ce processus (autre époque, numéro inconnu, format
+        invalide)
+        """
+        epoch, _, seq = str(last_event_id).rpartition(':')
+        if epoch != self._epoch:
+            return None
+        try:
+            seq = int(seq)
+        except ValueError:
+            return None
+        return seq if 0 <= seq <= self._seq else None
+
+    def subscriber_count(self):
+        """Nombre de clients connectés dans ce processus"""
+        return self._subscribers if self._started_pid == os.getpid() else 0
+
+    def accepting(self):
+        """
+        Vrai si un nouvel abonné peut être servi : toujours sous gevent, sinon
+        tant que les abonnés de ce processus n'atteignent pas `max_subscribers`
+        (chacun occupe un thread du worker)
+        """
+        if self.max_subscribers is None or cooperative():
+            return True
+        return self.subscriber_count() < self.max_subscribers
+
+    def _frames_after(self, cursor):
+        """Trames postérieures à `cursor` (None si le tampon ne remonte plus aussi loin)"""
+        if not self._events or self._events[-1][0] <= cursor:
+            return []
+        if self._events[0][0] > cursor + 1:
+            return None
+        return [frame for seq, frame in self._events if seq > cursor]
+
+    def subscribe(self, last_event_id=None):
+        """
+        Générateur de trames SSE pour un client
+
+        Sans `last_event_id`, seuls les changements postérieurs à la connexion
+        sont envoyés ; un identifiant d'une autre époque donne un `reset`.
+        Un commentaire est émis toutes les HEARTBEAT_INTERVAL
+        secondes pour détecter les connexions fermées.
+        """
+        self._start()
+        with self._condition:
+            # Identifiant d'un autre processus (autre worker, redémarrage) : rechargement complet
+            resumed = self._resume_cursor(last_event_id) if last_event_id else None
+            stale = bool(last_event_id) and resumed is None
+            cursor = self._seq if resumed is None else resumed
+            self._subscribers += 1
+
+        try:
+            # Délai de reconnexion automatique du navigateur (ms)
+            yield b"retry: 5000\n\n"
+            if stale:
+                yield f"id: {self._event_id(cursor)}\nevent: reset\ndata: {{}}\n\n".encode('utf-8')
+            while True:
+                with self._condition:
+                    frames = self._frames_after(cursor)
+                    if frames == []:
+                        self._condition.wait(HEARTBEAT_INTERVAL)
+                        frames = self._frames_after(cursor)
+                    head = self._seq
+
+                if frames is None:
+                    # Trop de retard : le client doit recharger les données complètes
+                    yield f"id: {self._event_id(head)}\nevent: reset\ndata: {{}}\n\n".encode('utf-8')
+                elif frames:
+                    yield b"".join(frames)
+                else:
+                    yield b": keepalive\n\n"
+                cursor = head
+        finally:
+            with self._condition:
+                self._subscribers -= 1
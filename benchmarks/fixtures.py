@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Données synthétiques pour les benchmarks de la BRVM Data Platform
+Pages HTML au format des tableaux lus par le scraper (nombre de lignes
+configurable) et répertoires de données pluriannuels (fichiers quotidiens
+bruts et traités), générés de façon déterministe à partir d'une graine.
+"""
+
+import csv
+import json
+import random
+import datetime
+from pathlib import Path
+
+INDEX_NAMES = ['BRVM Composite', 'BRVM 30', 'BRVM Prestige', 'BRVM Principal']
+
+_PAGE = """<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>BRVM - {title}</title></head>
+<body>
+<header class="site-header"><nav><ul>{nav}</ul></nav></header>
+<div class="market-info">
+  <span class="market-status badge">Marché {status}</span>
+  <span class="market-date">{date}</span>
+</div>
+<main>
+{tables}
+</main>
+<footer>{footer}</footer>
+</body>
+</html>
+"""
+
+
+def _number(value, decimals=2):
+    """Format français : espace des milliers, virgule décimale"""
+    text = f"{value:,.{decimals}f}"
+    return text.replace(',', ' ').replace('.', ',')
+
+
+def _table(css_class, headers, rows):
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    body = "\n".join(
+        "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows
+    )
+    return (f'<table class="table {css_class}">\n<thead><tr>{head}</tr></thead>\n'
+            f'<tbody>\n{body}\n</tbody>\n</table>')
+
+
+def _noise(rng, blocks=20):
+    """Contenu annexe (menus, liens) que l'analyseur doit ignorer"""
+    nav = "".join(f'<li><a href="/fr/page-{i}" class="nav-link">Rubrique {i}</a></li>' for i in range(blocks))
+    footer = "".join(f'<p class="footer-note">Mention {i} {rng.random():.6f}</p>' for i in range(blocks))
+    return nav, footer
+
+
+def stock_rows(rows, seed=0):
+    """Lignes du tableau des actions (textes des cellules)"""
+    rng = random.Random(seed)
+    result = []
+    for i in range(rows):
+        price = rng.uniform(500, 50000)
+        result.append([
+            f"SYM{i:04d}", f"Société cotée {i}", f"CI{i:010d}",
+            _number(price), _number(rng.uniform(-7.5, 7.5)),
+            _number(price * 1.03), _number(price * 0.97), _number(rng.randint(0, 200000), 0),
+        ])
+    return result
+
+
+def bond_rows(rows, seed=0):
+    """Lignes du tableau des obligations"""
+    rng = random.Random(seed + 1)
+    result = []
+    for i in range(rows):
+        result.append([
+            f"OBL{i:04d}.O{i % 9 + 1}", f"Emprunt obligataire {i} 6,5% 2021-2031", f"SN{i:010d}",
+            _number(rng.uniform(9000, 10100)), _number(rng.uniform(-1, 1)),
+            _number(rng.uniform(5, 8)), f"{2026 + i % 10}-06-15",
+        ])
+    return result
+
+
+def index_rows(rows, seed=0):
+    """Lignes du tableau des indices"""
+    rng = random.Random(seed + 2)
+    names = INDEX_NAMES + [f"BRVM Secteur {i}" for i in range(max(0, rows - len(INDEX_NAMES)))]
+    return [[name, _number(rng.uniform(80, 300)), _number(rng.uniform(-3, 3)) + "%"]
+            for name in names[:rows]]
+
+
+def make_page(stocks=0, bonds=0, indices=0, seed=0, status="ouvert", date="16/10/2026 15:30"):
+    """Page HTML contenant les tableaux demandés, le statut du marché et du contenu annexe"""
+    rng = random.Random(seed)
+    tables = []
+    if indices:
+        tables.append(_table('indices-table', ['Indice', 'Valeur', 'Variation'], index_rows(indices, seed)))
+    if stocks:
+        tables.append(_table('stocks-table', ['Symbole', 'Nom', 'ISIN', 'Cours', 'Var.', 'Haut', 'Bas', 'Volume'],
+                             stock_rows(stocks, seed)))
+    if bonds:
+        tables.append(_table('bonds-table', ['Symbole', 'Nom', 'ISIN', 'Cours', 'Var.', 'Rendement', 'Échéance'],
+                             bond_rows(bonds, seed)))
+    nav, footer = _noise(rng)
+    return _PAGE.format(title="Cotations", nav=nav, status=status, date=date,
+                        tables="\n".join(tables), footer=footer)
+
+
+def trading_days(end, count):
+    """Les `count` derniers jours ouvrés (lundi-vendredi) jusqu'à `end` inclus"""
+    days = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= datetime.timedelta(days=1)
+    return sorted(days)
+
+
+def _write_csv(path, fieldnames, records):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def make_data_dir(root, days=520, stocks=46, bonds=40, end=None, seed=0):
+    """
+    Crée un répertoire de données pluriannuel au format du scraper
+
+    Pour chaque jour ouvré : raw/{market_status,stocks,bonds,indices}_DATE.json
+    et processed/{stocks,bonds,indices}_DATE.csv, avec des cours suivant une
+    marche aléatoire. Retourne la liste des dates générées.
+    """
+    root = Path(root)
+    raw_dir = root / "raw"
+    processed_dir = root / "processed"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    processed_dir.mkdir(parents=True, exist_ok=True)
+
+    rng = random.Random(seed)
+    end = end or datetime.date(2026, 10, 16)
+    dates = trading_days(end, days)
+
+    prices = [rng.uniform(500, 50000) for _ in range(stocks)]
+    bond_prices = [rng.uniform(9500, 10050) for _ in range(bonds)]
+    index_values = {name: rng.uniform(100, 250) for name in INDEX_NAMES}
+
+    stock_fields = ['symbol', 'name', 'isin', 'last_price', 'change', 'high', 'low', 'volume', 'date']
+    bond_fields = ['symbol', 'name', 'isin', 'last_price', 'change', 'yield', 'maturity_date', 'date']
+
+    for day in dates:
+        date = day.isoformat()
+
+        stock_records = []
+        for i in range(stocks):
+            change = rng.gauss(0, 1.5)
+            prices[i] = max(5.0, prices[i] * (1 + change / 100))
+            stock_records.append({
+                'symbol': f"SYM{i:04d}", 'name': f"Société cotée {i}", 'isin': f"CI{i:010d}",
+                'last_price': round(prices[i], 2), 'change': round(change, 2),
+                'high': round(prices[i] * 1.02, 2), 'low': round(prices[i] * 0.98, 2),
+                'volume': rng.randint(0, 200000), 'date': date,
+            })
+
+        bond_records = []
+        for i in range(bonds):
+            change = rng.gauss(0, 0.2)
+            bond_prices[i] = bond_prices[i] * (1 + change / 100)
+            bond_records.append({
+                'symbol': f"OBL{i:04d}.O{i % 9 + 1}", 'name': f"Emprunt obligataire {i}",
+                'isin': f"SN{i:010d}", 'last_price': round(bond_prices[i], 2),
+                'change': round(change, 2), 'yield': round(rng.uniform(5, 8), 2),
+                'maturity_date': f"{2027 + i % 10}-06-15", 'date': date,
+            })
+
+        indices = {}
+        for name in INDEX_NAMES:
+            change = rng.gauss(0, 0.8)
+            index_values[name] *= 1 + change / 100
+            indices[name] = {'value': round(index_values[name], 2), 'change_percent': round(change, 2)}
+        index_records = [{'name': n, 'value': v['value'], 'change_percent': v['change_percent'], 'date': date}
+                         for n, v in indices.items()]
+
+        status = {'market_status': 'closed', 'last_update': f"{day:%d/%m/%Y} 15:30", 'date': date}
+
+        for name, data in (('market_status', status), ('stocks', stock_records),
+                           ('bonds', bond_records), ('indices', indices)):
+            with open(raw_dir / f"{name}_{date}.json", 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+        _write_csv(processed_dir / f"stocks_{date}.csv", stock_fields, stock_records)
+        _write_csv(processed_dir / f"bonds_{date}.csv", bond_fields, bond_records)
+        _write_csv(processed_dir / f"indices_{date}.csv", ['name', 'value', 'change_percent', 'date'], index_records)
+
+    return dates
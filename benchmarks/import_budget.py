@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Contrôle du temps d'import des points d'entrée de la BRVM Data Platform
+Importe chaque module dans un interpréteur neuf avec `python -X importtime`
+et échoue (code de sortie 1) si le temps d'import cumulé dépasse son budget
+ou si une dépendance lourde (pandas, pymongo...) est chargée au démarrage:
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --scale 2 --repeat 5
+
+Les budgets sont en millisecondes, pour une machine de développement
+ordinaire ; --scale les multiplie sur une machine plus lente (CI).
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Module -> (budget en ms, modules qui ne doivent pas être importés)
+BUDGETS = {
+    'run': (150, ('pandas', 'pymongo', 'pyarrow', 'requests')),
+    'scraper': (250, ('pandas', 'pymongo', 'pyarrow', 'lxml')),
+    'app': (350, ('pandas', 'pymongo', 'pyarrow')),
+}
+
+# Ligne de -X importtime : "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Contrôle du temps d'import des points d'entrée")
+    parser.add_argument('modules', nargs='*', default=list(BUDGETS),
+                        help=f"Modules contrôlés (par défaut: {', '.join(BUDGETS)})")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Facteur appliqué aux budgets (par défaut: 1)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Mesures par module, la meilleure est retenue (par défaut: 3)')
+    parser.add_argument('--top', type=int, default=5,
+                        help='Nombre de dépendances les plus coûteuses affichées (par défaut: 5)')
+    parser.add_argument('--json', action='store_true', help='Résultats en JSON')
+    return parser.parse_args()
+
+
+def import_profile(module):
+    """
+    Importe `module` dans un interpréteur neuf ; retourne (temps cumulé en ms,
+    {paquet de premier niveau: temps cumulé de son import le plus coûteux en ms})
+    """
+    paths = [str(BASE_DIR / "scripts"), str(BASE_DIR / "api"), os.environ.get("PYTHONPATH")]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in paths if p))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible:\n{result.stderr[-2000:]}")
+
+    total = None
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, name = int(match.group(2)) / 1000, match.group(3)
+        if name == module:
+            total = cumulative
+        top = name.split('.')[0]
+        packages[top] = max(packages.get(top, 0), cumulative)
+    return total, packages
+
+
+def check(module, scale=1.0, repeat=3):
+    """Meilleure mesure d'un module et écarts à son budget"""
+    budget, forbidden = BUDGETS.get(module, (None, ()))
+    best = None
+    for _ in range(max(1, repeat)):
+        total, packages = import_profile(module)
+        if best is None or total < best[0]:
+            best = (total, packages)
+    total, packages = best
+
+    loaded = sorted(name for name in forbidden if name in packages)
+    limit = budget * scale if budget else None
+    failures = []
+    if limit is not None and total > limit:
+        failures.append(f"{total:.0f} ms > budget {limit:.0f} ms")
+    if loaded:
+        failures.append(f"dépendances chargées au démarrage: {', '.join(loaded)}")
+    return {'module': module, 'import_ms': round(total, 1), 'budget_ms': limit,
+            'loaded_forbidden': loaded, 'failures': failures}
+
+
+def _heaviest(module, top):
+    """Dépendances importées par le module, triées par temps cumulé"""
+    _, packages = import_profile(module)
+    for name in (module, 'site', 'encodings'):
+        packages.pop(name, None)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    args = parse_arguments()
+    results = [check(module, args.scale, args.repeat) for module in args.modules]
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        for result in results:
+            status = "ÉCHEC" if result['failures'] else "ok"
+            budget = f"{result['budget_ms']:.0f} ms" if result['budget_ms'] else "aucun"
+            print(f"{result['module']:<12} {result['import_ms']:>8.1f} ms  (budget: {budget})  {status}")
+            for failure in result['failures']:
+                print(f"    - {failure}")
+            if result['failures'] and args.top:
+                heaviest = ", ".join(f"{name} {ms:.0f} ms" for name, ms in _heaviest(result['module'], args.top))
+                print(f"    dépendances les plus lentes: {heaviest}")
+
+    return 1 if any(result['failures'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks de la BRVM Data Platform
+Mesure, sur des données synthétiques :
+
+- le débit d'analyse des pages (actions, obligations, indices) pour chaque
+  moteur HTML disponible ;
+- le temps d'écriture de save_to_file et create_csv_files ;
+- la latence des endpoints de l'API (client de test Flask), à froid (caches
+  vidés) et à chaud, en percentiles ;
+- la mémoire maximale allouée par chaque étape (tracemalloc).
+
+Les résultats sont écrits en JSON pour comparer deux exécutions:
+
+    python benchmarks/run_benchmarks.py --output avant.json
+    python benchmarks/run_benchmarks.py --output apres.json --compare avant.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import resource
+import datetime
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASE_DIR = BENCH_DIR.parent
+
+sys.path.insert(0, str(BENCH_DIR))
+
+import fixtures
+
+# Endpoints mesurés : nom -> URL (les symboles correspondent aux fixtures)
+API_ENDPOINTS = {
+    'stocks': '/api/stocks',
+    'stocks_query': '/api/stocks?sort=change&order=desc&limit=10&fields=symbol,last_price,change',
+    'stock': '/api/stocks/SYM0001',
+    'snapshot': '/api/snapshot',
+    'stock_history': '/api/stocks/SYM0001/history?interval=weekly',
+    'index_history': '/api/indices/BRVM%20Composite/history',
+    'analytics_summary': '/api/analytics/summary',
+    'export_csv': '/api/export/stocks?format=csv',
+}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='BRVM Data Platform - Benchmarks')
+    parser.add_argument('--rows', type=int, default=2000,
+                        help='Nombre de lignes des tableaux HTML synthétiques (par défaut: 2000)')
+    parser.add_argument('--days', type=int, default=520,
+                        help='Nombre de jours ouvrés du répertoire de données synthétique (par défaut: 520)')
+    parser.add_argument('--stocks', type=int, default=46,
+                        help="Nombre d'actions par jour dans les données synthétiques (par défaut: 46)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Répétitions des mesures d\'analyse et d\'écriture (par défaut: 5)')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Requêtes à chaud par endpoint (par défaut: 200)')
+    parser.add_argument('--cold-requests', type=int, default=10,
+                        help='Requêtes à froid par endpoint (par défaut: 10)')
+    parser.add_argument('--only', choices=('parse', 'write', 'api'), action='append',
+                        help='Limiter aux groupes de benchmarks indiqués (option répétable)')
+    parser.add_argument('--workdir', type=Path, default=None,
+                        help='Répertoire de travail conservé (par défaut: répertoire temporaire supprimé)')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Fichier JSON des résultats (par défaut: sortie standard)')
+    parser.add_argument('--compare', type=Path, default=None,
+                        help='Résultats précédents à comparer (JSON produit par ce script)')
+    return parser.parse_args()
+
+
+def percentiles(samples):
+    """Statistiques d'une liste de durées (en millisecondes)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 4)
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 4),
+        'p50_ms': pick(0.50),
+        'p95_ms': pick(0.95),
+        'p99_ms': pick(0.99),
+        'max_ms': round(ordered[-1] * 1000, 4),
+    }
+
+
+def peak_memory(function):
+    """Pic de mémoire allouée (Mo) pendant un appel de `function`"""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024 / 1024, 3)
+
+
+def measure(function, repeat=1):
+    """
+    Exécute `function` `repeat` fois ; retourne (durées, pic mémoire en Mo,
+    dernier résultat). Le pic est mesuré sur un appel supplémentaire, hors
+    chronométrage : tracemalloc ralentit fortement les allocations.
+    """
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return durations, peak_memory(function), result
+
+
+def bench_parse(args):
+    """Débit d'analyse des tableaux pour chaque moteur HTML"""
+    import html_parser
+    from scraper import BRVMScraper
+
+    scraper = BRVMScraper(use_db=False, concurrent=False, use_cache=False)
+    pages = {
+        'stocks': (fixtures.make_page(stocks=args.rows), scraper.parse_stocks),
+        'bonds': (fixtures.make_page(bonds=args.rows), scraper.parse_bonds),
+        'indices': (fixtures.make_page(indices=min(args.rows, 200)), scraper.parse_indices),
+        'market_status': (fixtures.make_page(stocks=args.rows), scraper.parse_market_status),
+    }
+
+    results = {}
+    previous = os.environ.get("BRVM_HTML_PARSER")
+    try:
+        for backend in html_parser.BACKENDS:
+            os.environ["BRVM_HTML_PARSER"] = backend
+            for name, (html, parse) in pages.items():
+                durations, peak, parsed = measure(lambda: parse(html), args.repeat)
+                rows = len(parsed) if isinstance(parsed, (list, dict)) else 0
+                best = min(durations)
+                results[f"{backend}.{name}"] = {
+                    'rows': rows,
+                    'page_bytes': len(html.encode('utf-8')),
+                    'best_ms': round(best * 1000, 3),
+                    'rows_per_s': round(rows / best) if best and name != 'market_status' else None,
+                    'peak_mb': peak,
+                }
+    finally:
+        if previous is None:
+            os.environ.pop("BRVM_HTML_PARSER", None)
+        else:
+            os.environ["BRVM_HTML_PARSER"] = previous
+        scraper.session.close()
+    return results
+
+
+def bench_write(args):
+    """Temps d'écriture des fichiers quotidiens (JSON bruts et CSV traités)"""
+    from scraper import BRVMScraper
+
+    scraper = BRVMScraper(use_db=False, concurrent=False, use_cache=False)
+    scraper.set_date('2026-10-16')
+    html = fixtures.make_page(stocks=args.rows, bonds=args.rows, indices=4)
+    stocks = scraper.parse_stocks(html)
+    bonds = scraper.parse_bonds(html)
+    indices = scraper.parse_indices(html)
+
+    results = {}
+    for name, function in (
+        ('save_to_file.stocks', lambda: scraper.save_to_file(stocks, 'stocks')),
+        ('save_to_file.bonds', lambda: scraper.save_to_file(bonds, 'bonds')),
+        ('create_csv_files', lambda: scraper.create_csv_files(stocks, bonds, indices)),
+    ):
+        durations, peak, _ = measure(function, args.repeat)
+        results[name] = dict(percentiles(durations), rows=len(stocks), peak_mb=peak)
+    scraper.session.close()
+    return results
+
+
+def bench_api(args, data_dir):
+    """Latence des endpoints à froid et à chaud (client de test Flask)"""
+    import migrate_history
+
+    start = time.perf_counter()
+    migrate_history.migrate(data_dir)
+    migration_s = time.perf_counter() - start
+
+    sys.path.insert(0, str(BASE_DIR / "api"))
+    import app as api
+
+    client = api.app.test_client()
+
+    def reset_caches():
+        # Les services (et leurs caches) sont recréés à la requête suivante
+        api.snapshot_cache.clear()
+        api.history_service = None
+        api.analytics_service = None
+
+    results = {'migration_s': round(migration_s, 3), 'endpoints': {}}
+    for name, url in API_ENDPOINTS.items():
+        cold = []
+        for _ in range(args.cold_requests):
+            reset_caches()
+            t0 = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            cold.append(time.perf_counter() - t0)
+        reset_caches()
+        cold_peak = peak_memory(lambda: client.get(url).get_data())
+
+        warm = []
+        for _ in range(args.requests):
+            t0 = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            warm.append(time.perf_counter() - t0)
+
+        results['endpoints'][name] = {
+            'url': url,
+            'status': response.status_code,
+            'bytes': len(response.get_data()),
+            'cold': percentiles(cold),
+            'warm': percentiles(warm),
+            'cold_peak_mb': cold_peak,
+        }
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(results, prefix=''):
+    """Aplatit les résultats en {chemin: valeur} pour la comparaison"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(current, previous):
+    """Affiche l'évolution des durées et débits entre deux exécutions"""
+    before = _flatten(previous.get('results', {}))
+    after = _flatten(current['results'])
+    tracked = ('best_ms', 'p50_ms', 'p95_ms', 'rows_per_s', 'peak_mb', 'migration_s')
+    print(f"{'mesure':<60} {'avant':>12} {'après':>12} {'écart':>8}")
+    for path in sorted(after):
+        if not path.endswith(tracked) or path not in before or not before[path]:
+            continue
+        change = (after[path] - before[path]) / before[path] * 100
+        print(f"{path:<60} {before[path]:>12} {after[path]:>12} {change:>+7.1f}%")
+
+
+def main():
+    args = parse_arguments()
+    groups = args.only or ['parse', 'write', 'api']
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="brvm-bench-"))
+    data_dir = workdir / "data"
+    if data_dir.exists():
+        shutil.rmtree(data_dir)
+
+    # Les modules lisent BRVM_DATA_DIR à l'import : à définir avant de les charger
+    os.environ["BRVM_DATA_DIR"] = str(data_dir)
+    os.environ.setdefault("BRVM_CACHE_CHECK_INTERVAL", "0")
+    sys.path.insert(0, str(BASE_DIR / "scripts"))
+    logging.disable(logging.WARNING)
+
+    start = time.perf_counter()
+    fixtures.make_data_dir(data_dir, days=args.days, stocks=args.stocks)
+    fixtures_s = time.perf_counter() - start
+    daily_files = sum(1 for _ in data_dir.glob("*/*"))
+
+    results = {}
+    try:
+        if 'parse' in groups:
+            results['parse'] = bench_parse(args)
+        if 'write' in groups:
+            results['write'] = bench_write(args)
+        if 'api' in groups:
+            results['api'] = bench_api(args, data_dir)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'parameters': {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+            'fixtures_s': round(fixtures_s, 3),
+            'daily_files': daily_files,
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        'results': results,
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding='utf-8')
+    else:
+        print(output)
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text(encoding='utf-8')))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Serveur HTTP local imitant les pages de cotations du site de la BRVM
+Sert, pour la date demandée en paramètre de requête, soit une page
+sauvegardée (`--pages DIR` : DIR/<YYYY-MM-DD>/<dataset>.html), soit une page
+synthétique générée par fixtures.py. Permet d'exercer la collecte et la
+reconstitution de l'historique sans dépendre du site réel:
+
+    python benchmarks/site_stub.py --port 8800 &
+    python scripts/backfill.py --start 2024-01-01 --end 2024-03-31 --base-url http://localhost:8800
+
+`--error-rate` fait échouer une partie des requêtes (erreur 503) pour
+vérifier les tentatives et la reprise.
+"""
+
+import random
+import zlib
+import argparse
+import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+import fixtures
+
+# Chemins des pages du site -> jeu de données (voir scraper.PAGES)
+PATHS = {
+    '/fr/marche/status': 'market_status',
+    '/fr/indices/historique': 'indices',
+    '/fr/cours-actions/liste': 'stocks',
+    '/fr/cours-obligations/liste': 'bonds',
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y")
+
+
+def _parse_date(text):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def synthetic_page(dataset, date, rows):
+    """Page synthétique d'un jeu de données, déterministe pour une date donnée"""
+    seed = zlib.crc32(f"{dataset}:{date}".encode())
+    stamp = f"{date:%d/%m/%Y} 15:30"
+    if dataset == 'stocks':
+        return fixtures.make_page(stocks=rows, seed=seed, status="fermé", date=stamp)
+    if dataset == 'bonds':
+        return fixtures.make_page(bonds=rows, seed=seed, status="fermé", date=stamp)
+    if dataset == 'indices':
+        return fixtures.make_page(indices=len(fixtures.INDEX_NAMES), seed=seed, status="fermé", date=stamp)
+    return fixtures.make_page(seed=seed, status="fermé", date=stamp)
+
+
+def make_handler(pages_dir=None, rows=46, error_rate=0.0, date_param="date"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            dataset = PATHS.get(url.path)
+            if dataset is None:
+                return self._send(404, "Page inconnue")
+            if error_rate and random.random() < error_rate:
+                return self._send(503, "Service indisponible")
+
+            values = parse_qs(url.query).get(date_param)
+            date = _parse_date(values[0]) if values else datetime.date.today()
+            if date is None:
+                return self._send(400, "Date invalide")
+
+            if pages_dir is not None:
+                path = Path(pages_dir) / date.isoformat() / f"{dataset}.html"
+                if not path.exists():
+                    return self._send(404, "Page non sauvegardée")
+                return self._send(200, path.read_text(encoding='utf-8'))
+            return self._send(200, synthetic_page(dataset, date, rows))
+
+        def _send(self, status, body):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Serveur local imitant les pages de cotations de la BRVM')
+    parser.add_argument('--host', default='127.0.0.1', help="Adresse d'écoute (par défaut: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8800, help="Port d'écoute (par défaut: 8800)")
+    parser.add_argument('--pages', type=Path, default=None,
+                        help='Répertoire des pages sauvegardées (<date>/<dataset>.html) ; '
+                             'pages synthétiques sinon')
+    parser.add_argument('--rows', type=int, default=46,
+                        help='Lignes des tableaux synthétiques (par défaut: 46)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Proportion de requêtes en échec 503 (par défaut: 0)')
+    parser.add_argument('--date-param', default='date',
+                        help='Paramètre de requête portant la date (par défaut: date)')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    server = ThreadingHTTPServer((args.host, args.port),
+                                 make_handler(args.pages, args.rows, args.error_rate, args.date_param))
+    print(f"Site local sur http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
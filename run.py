@@ -9,21 +9,13 @@ Permet de collecter les données et démarrer le serveur
 import os
 import sys
 import time
+import datetime
 import argparse
+import threading
 import subprocess
 import logging
-import schedule
 from pathlib import Path
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("run.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger("brvm_run")
 
 # Chemins des scripts
@@ -32,6 +24,19 @@ SCRIPTS_DIR = BASE_DIR / "scripts"
 API_DIR = BASE_DIR / "api"
 SCRAPER_SCRIPT = SCRIPTS_DIR / "scraper.py"
 API_SCRIPT = API_DIR / "app.py"
+SERVER_SCRIPT = API_DIR / "server.py"
+
+# La collecte s'exécute dans ce processus : les modules du scraper doivent être importables
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import market_calendar
+
+# Scraper réutilisé d'une collecte à l'autre (imports et session HTTP gardés chauds)
+_scraper = None
+
+# Empêche deux collectes de se chevaucher
+_collect_lock = threading.Lock()
+
 
 def parse_arguments():
     """Parse les arguments de ligne de commande"""
@@ -47,48 +52,92 @@ def parse_arguments():
                         help='Planifier la collecte automatique des données à intervalle régulier')
     
     parser.add_argument('--interval', type=int, default=60,
-                        help='Intervalle en minutes entre chaque collecte (par défaut: 60)')
+                        help='Intervalle en minutes entre chaque collecte pendant la séance (par défaut: 60)')
+    
+    parser.add_argument('--idle-interval', type=int, default=240,
+                        help='Attente maximale en minutes entre deux collectes hors séance (par défaut: 240)')
+    
+    parser.add_argument('--ignore-market-hours', action='store_true',
+                        help='Collecter toutes les --interval minutes sans tenir compte des horaires de la BRVM')
     
     parser.add_argument('--port', type=int, default=5000,
                         help='Port pour le serveur API (par défaut: 5000)')
     
+    parser.add_argument('--serve-mode', choices=('development', 'production'), default='development',
+                        help='Serveur Flask de développement ou serveur WSGI multi-workers (par défaut: development)')
+    
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Nombre de workers en mode production (par défaut: 2 x CPU + 1)')
+    
+    parser.add_argument('--threads', type=int, default=2,
+                        help='Nombre de threads par worker en mode production (par défaut: 2)')
+    
+    parser.add_argument('--worker-class', choices=('sync', 'gthread', 'gevent'), default=None,
+                        help='Type de worker en mode production (par défaut: gevent s\'il est installé, sinon gthread ou sync)')
+    
     return parser.parse_args()
 
 
+def get_scraper():
+    """Retourne le scraper partagé, créé au premier appel"""
+    global _scraper
+    if _scraper is None:
+        from scraper import BRVMScraper
+        _scraper = BRVMScraper(use_db=False)
+    return _scraper
+
+
 def collect_data():
-    """Exécute le script de collecte des données"""
+    """Exécute la collecte des données dans le processus courant"""
+    if not _collect_lock.acquire(blocking=False):
+        logger.warning("Une collecte est déjà en cours, nouvelle collecte ignorée")
+        return False
+    
     logger.info("Démarrage de la collecte des données BRVM...")
     
     try:
-        # Exécuter le script de collecte
-        result = subprocess.run([sys.executable, str(SCRAPER_SCRIPT)], 
-                               capture_output=True, text=True, check=True)
+        scraper = get_scraper()
+        scraper.set_date()
+        scraper.run()
         
         logger.info("Collecte des données terminée avec succès")
-        logger.debug(result.stdout)
         return True
     
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         logger.error(f"Erreur lors de la collecte des données: {e}")
-        logger.error(f"Sortie d'erreur: {e.stderr}")
         return False
+    
+    finally:
+        _collect_lock.release()
 
 
-def start_server(port=5000):
-    """Démarre le serveur API"""
-    logger.info(f"Démarrage du serveur API sur le port {port}...")
+def start_server(port=5000, mode='development', workers=None, threads=2, worker_class=None):
+    """
+    Démarre le serveur API
+
+    En mode « development », serveur Flask intégré (un processus, debug) ;
+    en mode « production », serveur WSGI multi-workers (api/server.py).
+    """
+    logger.info(f"Démarrage du serveur API sur le port {port} (mode {mode})...")
     
     try:
         # Définir la variable d'environnement pour le port
         env = os.environ.copy()
         env["FLASK_APP"] = str(API_SCRIPT)
-        env["FLASK_ENV"] = "development"
+        env["BRVM_API_PORT"] = str(port)
+        
+        if mode == 'production':
+            command = [sys.executable, str(SERVER_SCRIPT), "--port", str(port), "--threads", str(threads)]
+            if workers:
+                command += ["--workers", str(workers)]
+            if worker_class:
+                command += ["--worker-class", worker_class]
+        else:
+            env["FLASK_ENV"] = "development"
+            command = [sys.executable, str(API_SCRIPT)]
         
-        # Démarrer le serveur Flask
-        server_process = subprocess.Popen(
-            [sys.executable, str(API_SCRIPT)],
-            env=env
-        )
+        # Démarrer le serveur
+        server_process = subprocess.Popen(command, env=env)
         
         logger.info(f"Serveur API démarré avec PID {server_process.pid}")
         logger.info(f"Interface accessible à l'adresse: http://localhost:{port}")
@@ -100,25 +149,67 @@ def start_server(port=5000):
         return None
 
 
-def schedule_collection(interval):
-    """Planifie la collecte de données à intervalle régulier"""
-    logger.info(f"Planification de la collecte des données toutes les {interval} minutes")
-    
-    # Première collecte immédiate
-    collect_data()
+def stop_server(server_process, timeout=35):
+    """Arrête le serveur API en laissant les requêtes en cours se terminer (SIGTERM)"""
+    logger.info("Arrêt du serveur API...")
+    server_process.terminate()
+    try:
+        server_process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logger.warning("Le serveur API ne s'est pas arrêté à temps, arrêt forcé")
+        server_process.kill()
+        server_process.wait()
+
+
+def schedule_collection(interval, idle_interval=240, ignore_market_hours=False):
+    """
+    Planifie la collecte de données selon le calendrier de la BRVM
+
+    Pendant la séance, une collecte toutes les `interval` minutes ; une
+    dernière collecte après la clôture ; ensuite, attente de la prochaine
+    séance (au plus `idle_interval` minutes). Les collectes s'enchaînent dans
+    la même boucle et ne peuvent donc pas se chevaucher.
+    """
+    active = datetime.timedelta(minutes=interval)
+    idle = datetime.timedelta(minutes=idle_interval)
     
-    # Planifier les collectes suivantes
-    schedule.every(interval).minutes.do(collect_data)
+    if ignore_market_hours:
+        logger.info(f"Planification de la collecte des données toutes les {interval} minutes")
+    else:
+        logger.info(f"Planification de la collecte des données toutes les {interval} minutes pendant la séance "
+                    f"(au plus toutes les {idle_interval} minutes hors séance)")
     
-    # Boucle principale pour exécuter les tâches planifiées
     while True:
-        schedule.run_pending()
-        time.sleep(1)
+        started = market_calendar.now()
+        collect_data()
+        
+        if ignore_market_hours:
+            next_run = started + active
+        else:
+            next_run = market_calendar.next_run_time(market_calendar.now(), active, idle)
+        logger.info(f"Prochaine collecte prévue à {next_run:%Y-%m-%d %H:%M} GMT")
+        
+        # Attente par petites tranches pour rester réactif à l'interruption
+        while market_calendar.now() < next_run:
+            time.sleep(min(30, max(0.1, (next_run - market_calendar.now()).total_seconds())))
+
+
+def configure_logging():
+    """Configuration du logging (fichier run.log et console), au lancement seulement"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("run.log"),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
 
 
 def main():
     """Fonction principale"""
     args = parse_arguments()
+    configure_logging()
     
     # Mode de fonctionnement en fonction des arguments
     if args.collect_only:
@@ -127,44 +218,38 @@ def main():
     
     elif args.serve_only:
         # Démarrer uniquement le serveur
-        server_process = start_server(args.port)
+        server_process = start_server(args.port, args.serve_mode, args.workers, args.threads, args.worker_class)
         
         # Attendre que le processus du serveur se termine
         if server_process:
             try:
                 server_process.wait()
             except KeyboardInterrupt:
-                logger.info("Arrêt du serveur API...")
-                server_process.terminate()
-                server_process.wait()
+                stop_server(server_process)
     
     elif args.schedule:
         # Démarrer le serveur
-        server_process = start_server(args.port)
+        server_process = start_server(args.port, args.serve_mode, args.workers, args.threads, args.worker_class)
         
         # Planifier la collecte de données
         try:
-            schedule_collection(args.interval)
+            schedule_collection(args.interval, args.idle_interval, args.ignore_market_hours)
         except KeyboardInterrupt:
             logger.info("Arrêt du programme...")
             if server_process:
-                logger.info("Arrêt du serveur API...")
-                server_process.terminate()
-                server_process.wait()
+                stop_server(server_process)
     
     else:
         # Mode par défaut: collecte puis serveur
         if collect_data():
-            server_process = start_server(args.port)
+            server_process = start_server(args.port, args.serve_mode, args.workers, args.threads, args.worker_class)
             
             # Attendre que le processus du serveur se termine
             if server_process:
                 try:
                     server_process.wait()
                 except KeyboardInterrupt:
-                    logger.info("Arrêt du serveur API...")
-                    server_process.terminate()
-                    server_process.wait()
+                    stop_server(server_process)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reconstitution de l'historique BRVM sur une plage de dates
+Les jours de séance de la plage sont découpés en tranches de dates
+consécutives, téléchargées et analysées en parallèle par un pool de
+workers, sous une limite commune de requêtes par seconde. Les journées
+obtenues sont écrites directement dans l'historique Parquet par le seul
+thread principal, et consignées dans un fichier de reprise : une exécution
+interrompue reprend là où elle s'était arrêtée.
+
+Utilisation:
+
+    python scripts/backfill.py --start 2019-01-01 --end 2024-12-31 --workers 4 --rate 2
+
+Les pages d'une date passée sont demandées avec le paramètre de requête
+`--date-param` (format `--date-format`) ; `--base-url` permet d'interroger
+un miroir ou un serveur local servant des pages sauvegardées.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from history_store import HistoryStore
+from market_calendar import is_trading_day
+from scraper import BRVMScraper, BASE_URL, DATA_DIR, PAGES
+
+logger = logging.getLogger("brvm_backfill")
+
+# Jeux de données historisés (le statut du marché n'a pas d'historique)
+BACKFILL_DATASETS = ('indices', 'stocks', 'bonds')
+
+# Paramètres par défaut
+DEFAULT_WORKERS = 4
+DEFAULT_CHUNK_DAYS = 20
+DEFAULT_RATE = 2.0
+DEFAULT_DATE_PARAM = "date"
+DEFAULT_DATE_FORMAT = "%Y-%m-%d"
+CHECKPOINT_FILE = DATA_DIR / "backfill_checkpoint.json"
+
+
+class RateLimiter:
+    """Limite commune du nombre de requêtes par seconde, partagée entre threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Bloque jusqu'au prochain créneau disponible"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Checkpoint:
+    """
+    Fichier de reprise : dates terminées (avec ou sans données) et dates en
+    échec, réécrit de façon atomique après chaque tranche
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = set()
+        self.empty = set()
+        self.failed = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.done = set(state.get('done', []))
+            self.empty = set(state.get('empty', []))
+            self.failed = dict(state.get('failed', {}))
+
+    def completed(self, date):
+        """Indique si une date a déjà été traitée (les échecs sont retentés)"""
+        return date in self.done or date in self.empty
+
+    def mark(self, date, status, error=None):
+        self.failed.pop(date, None)
+        if status == 'done':
+            self.done.add(date)
+        elif status == 'empty':
+            self.empty.add(date)
+        else:
+            self.failed[date] = error or status
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'updated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'done': sorted(self.done),
+            'empty': sorted(self.empty),
+            'failed': dict(sorted(self.failed.items())),
+        }
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def backfill_dates(start, end, include_all_days=False):
+    """Dates (ISO) de la plage à reconstituer : jours de séance uniquement par défaut"""
+    dates = []
+    day = start
+    while day <= end:
+        if include_all_days or is_trading_day(day):
+            dates.append(day.isoformat())
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def chunked(items, size):
+    """Découpe une liste en tranches consécutives de `size` éléments"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class Backfill:
+    """Moteur de reconstitution : workers de téléchargement, écriture unique dans l'historique"""
+
+    def __init__(self, store, checkpoint, datasets=BACKFILL_DATASETS, workers=DEFAULT_WORKERS,
+                 chunk_days=DEFAULT_CHUNK_DAYS, rate=DEFAULT_RATE, base_url=BASE_URL,
+                 date_param=DEFAULT_DATE_PARAM, date_format=DEFAULT_DATE_FORMAT):
+        self.store = store
+        self.checkpoint = checkpoint
+        self.datasets = list(datasets)
+        self.workers = max(1, workers)
+        self.chunk_days = max(1, chunk_days)
+        self.limiter = RateLimiter(rate)
+        self.base_url = base_url.rstrip('/')
+        self.date_param = date_param
+        self.date_format = date_format
+        self._local = threading.local()
+        self._stop = threading.Event()
+
+    def page_url(self, dataset, date):
+        """URL de la page d'un jeu de données à une date donnée"""
+        path = urlsplit(PAGES[dataset]).path
+        day = datetime.date.fromisoformat(date).strftime(self.date_format)
+        return f"{self.base_url}{path}?{urlencode({self.date_param: day})}"
+
+    def _scraper(self):
+        """Scraper propre à chaque worker (session HTTP et date de collecte)"""
+        scraper = getattr(self._local, 'scraper', None)
+        if scraper is None:
+            scraper = BRVMScraper(use_db=False, concurrent=False, use_cache=False)
+            self._local.scraper = scraper
+        return scraper
+
+    def fetch_date(self, date):
+        """Télécharge et analyse les pages d'une date ; retourne {dataset: enregistrements}"""
+        scraper = self._scraper()
+        scraper.today = date
+        parsers = {
+            'indices': scraper.parse_indices,
+            'stocks': scraper.parse_stocks,
+            'bonds': scraper.parse_bonds,
+        }
+        data = {}
+        for dataset in self.datasets:
+            self.limiter.wait()
+            html = scraper.get_page(self.page_url(dataset, date))
+            if html is None:
+                raise RuntimeError(f"page {dataset} indisponible")
+            parsed = parsers[dataset](html)
+            # None : erreur d'analyse, date en échec (retentée) ; une page sans ligne reste « sans données »
+            if parsed is None:
+                raise RuntimeError(f"page {dataset} illisible (erreur d'analyse)")
+            data[dataset] = scraper._indices_to_records(parsed) if dataset == 'indices' else parsed
+        return data
+
+    def fetch_chunk(self, dates):
+        """Traite une tranche de dates ; retourne [(date, données ou None, erreur ou None)]"""
+        results = []
+        for date in dates:
+            if self._stop.is_set():
+                # Interruption : les dates restantes seront traitées à la reprise
+                break
+            try:
+                results.append((date, self.fetch_date(date), None))
+            except Exception as e:
+                results.append((date, None, str(e)))
+        return results
+
+    def write_chunk(self, results, touched):
+        """Écrit les journées d'une tranche dans l'historique et met à jour la reprise"""
+        counts = {'done': 0, 'empty': 0, 'failed': 0}
+        for date, data, error in sorted(results, key=lambda r: r[0]):
+            if error is not None:
+                logger.error(f"Échec pour le {date}: {error}")
+                self.checkpoint.mark(date, 'failed', error)
+                counts['failed'] += 1
+                continue
+            if not any(data.values()):
+                # Pas de séance publiée ce jour-là (jour férié non répertorié...)
+                self.checkpoint.mark(date, 'empty')
+                counts['empty'] += 1
+                continue
+            for dataset, records in data.items():
+                if records:
+                    self.store.append(dataset, records, date)
+                    touched.setdefault(dataset, set()).add(date[:7])
+            self.checkpoint.mark(date, 'done')
+            counts['done'] += 1
+        self.checkpoint.save()
+        return counts
+
+    def run(self, dates, compact=True):
+        """Reconstitue les dates non encore traitées ; retourne le bilan"""
+        pending = [date for date in dates if not self.checkpoint.completed(date)]
+        chunks = chunked(pending, self.chunk_days)
+        totals = {'done': 0, 'empty': 0, 'failed': 0, 'skipped': len(dates) - len(pending)}
+        touched = {}
+        logger.info(f"Reconstitution de {len(pending)} dates ({totals['skipped']} déjà traitées) "
+                    f"en {len(chunks)} tranches, {self.workers} workers")
+
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="brvm_backfill")
+        try:
+            futures = [executor.submit(self.fetch_chunk, chunk) for chunk in chunks]
+            for number, future in enumerate(as_completed(futures), 1):
+                counts = self.write_chunk(future.result(), touched)
+                for status, count in counts.items():
+                    totals[status] += count
+                logger.info(f"Tranche {number}/{len(chunks)} terminée: {counts['done']} dates écrites, "
+                            f"{counts['empty']} sans données, {counts['failed']} en échec")
+        except KeyboardInterrupt:
+            logger.warning("Interruption : les tranches terminées sont consignées, relancez pour reprendre")
+            self._stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+        if compact and touched:
+            # Tous les mois ayant des fichiers quotidiens, y compris ceux d'une exécution interrompue
+            for dataset in self.datasets:
+                self.store.compact(dataset)
+
+        totals['seconds'] = round(time.perf_counter() - start, 3)
+        logger.info(f"Reconstitution terminée: {totals}")
+        return totals
+
+
+def parse_arguments():
+    """Parse les arguments de ligne de commande"""
+    parser = argparse.ArgumentParser(description="Reconstitution de l'historique BRVM sur une plage de dates")
+    parser.add_argument('--start', type=datetime.date.fromisoformat, required=True,
+                        help='Première date (YYYY-MM-DD)')
+    parser.add_argument('--end', type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="Dernière date incluse (YYYY-MM-DD, par défaut: aujourd'hui)")
+    parser.add_argument('--datasets', default=",".join(BACKFILL_DATASETS),
+                        help=f"Jeux de données (par défaut: {','.join(BACKFILL_DATASETS)})")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Nombre de workers de téléchargement (par défaut: {DEFAULT_WORKERS})')
+    parser.add_argument('--chunk-days', type=int, default=DEFAULT_CHUNK_DAYS,
+                        help=f'Dates par tranche (par défaut: {DEFAULT_CHUNK_DAYS})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'Requêtes par seconde, tous workers confondus, 0 sans limite (par défaut: {DEFAULT_RATE})')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help=f'URL du site interrogé (par défaut: {BASE_URL})')
+    parser.add_argument('--date-param', default=DEFAULT_DATE_PARAM,
+                        help=f'Paramètre de requête portant la date (par défaut: {DEFAULT_DATE_PARAM})')
+    parser.add_argument('--date-format', default=DEFAULT_DATE_FORMAT,
+                        help='Format strftime de la date dans la requête (par défaut: %%Y-%%m-%%d)')
+    parser.add_argument('--checkpoint', type=Path, default=CHECKPOINT_FILE,
+                        help=f'Fichier de reprise (par défaut: {CHECKPOINT_FILE})')
+    parser.add_argument('--history-dir', type=Path, default=None,
+                        help="Répertoire de l'historique (par défaut: data/history)")
+    parser.add_argument('--all-days', action='store_true',
+                        help='Interroger aussi les week-ends et jours fériés')
+    parser.add_argument('--no-compact', action='store_true',
+                        help='Ne pas compacter les mois écrits')
+    return parser.parse_args()
+
+
+def main():
+    """Fonction principale"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    # Une ligne par page téléchargée serait illisible sur plusieurs années
+    logging.getLogger("brvm_scraper").setLevel(logging.WARNING)
+    logging.getLogger("brvm_history").setLevel(logging.WARNING)
+
+    args = parse_arguments()
+    datasets = [d.strip() for d in args.datasets.split(',') if d.strip()]
+    unknown = [d for d in datasets if d not in BACKFILL_DATASETS]
+    if unknown:
+        sys.exit(f"Jeux de données inconnus: {', '.join(unknown)} (attendu: {', '.join(BACKFILL_DATASETS)})")
+    if args.start > args.end:
+        sys.exit("La date de début doit précéder la date de fin")
+
+    store = HistoryStore(args.history_dir or DATA_DIR / "history")
+    engine = Backfill(store, Checkpoint(args.checkpoint), datasets, workers=args.workers,
+                      chunk_days=args.chunk_days, rate=args.rate, base_url=args.base_url,
+                      date_param=args.date_param, date_format=args.date_format)
+    try:
+        totals = engine.run(backfill_dates(args.start, args.end, args.all_days), compact=not args.no_compact)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    if totals['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
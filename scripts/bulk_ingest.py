@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ingestion en masse d'archives de pages BRVM sauvegardées et de fichiers bruts
+Parcourt un répertoire de pages HTML (DIR/<date>/<dataset>.html ou
+<dataset>_<date>.html) et de fichiers JSON bruts (<dataset>_<date>.json,
+compressés ou non), les analyse dans un pool de processus par tranches de
+fichiers, et écrit pour chaque journée le CSV traité
+(processed/<dataset>_<date>.csv). Avec --history, les journées obtenues
+sont aussi ajoutées par lots à l'historique Parquet par le seul processus
+principal, puis les mois écrits sont compactés.
+
+L'analyse et l'écriture des CSV s'exécutent dans les workers : le débit
+croît avec le nombre de cœurs. Les workers appellent directement les
+fonctions d'analyse du module scraper, sans construire de scraper (ni
+créer les répertoires de data/). Un fichier illisible, ou une page HTML
+dont aucune ligne n'est extraite, est consigné en échec sans interrompre
+les autres. Une page sans tableau d'un jour sans séance (week-end, jour
+férié du calendrier) ou marquée « marché fermé » est seulement ignorée,
+et listée à part dans le bilan.
+
+Utilisation:
+
+    python scripts/bulk_ingest.py archives/ --workers 8 --history
+"""
+
+import os
+import re
+import sys
+import time
+import json
+import logging
+import datetime
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from html_parser import extract_table_rows, extract_texts
+from market_calendar import is_trading_day
+from raw_store import read_json
+from scraper import DATA_DIR, write_csv, index_values, indices_to_records, stock_records, bond_records
+
+logger = logging.getLogger("brvm_bulk_ingest")
+
+# Jeux de données ingérés (ceux des CSV traités et de l'historique)
+INGEST_DATASETS = ('indices', 'stocks', 'bonds')
+
+DEFAULT_CHUNK_SIZE = 32
+DEFAULT_HISTORY_BATCH = 200
+
+_DATE = r"(\d{4}-\d{2}-\d{2})"
+_DATASET = r"(" + "|".join(INGEST_DATASETS) + r")"
+PAGE_PATTERN = re.compile(rf"^{_DATASET}(?:_{_DATE})?\.html?$")
+RAW_PATTERN = re.compile(rf"^{_DATASET}_{_DATE}\.json(?:\.gz|\.zst)?$")
+DATE_DIR_PATTERN = re.compile(rf"^{_DATE}$")
+
+# Tableau lu dans les pages de chaque jeu de données
+TABLE_CLASSES = {'indices': 'indices-table', 'stocks': 'stocks-table', 'bonds': 'bonds-table'}
+
+
+class NoSession(Exception):
+    """Page sans cotations d'une journée sans séance : fichier ignoré, pas en échec"""
+
+
+def discover(source):
+    """
+    Fichiers à ingérer : {(dataset, date): (chemin, type)} ; pour une même
+    journée, la page HTML est préférée au JSON brut (nouvelle analyse)
+    """
+    files = {}
+    for path in sorted(Path(source).rglob("*")):
+        if not path.is_file():
+            continue
+        match = PAGE_PATTERN.match(path.name)
+        if match:
+            dataset, date = match.groups()
+            if date is None:
+                parent = DATE_DIR_PATTERN.match(path.parent.name)
+                if parent is None:
+                    continue
+                date = parent.group(1)
+            files[(dataset, date)] = (path, 'html')
+            continue
+        match = RAW_PATTERN.match(path.name)
+        if match and files.get(match.groups(), (None, None))[1] != 'html':
+            files[match.groups()] = (path, 'json')
+    return files
+
+
+def chunked(items, size):
+    """Découpe une liste en tranches consécutives de `size` éléments"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# État propre à chaque processus worker
+_worker = {}
+
+
+def _init_worker(output_dir, keep_records):
+    _worker['output_dir'] = Path(output_dir)
+    _worker['keep_records'] = keep_records
+
+
+def _empty_page(dataset, date, html):
+    """
+    Page HTML dont aucune ligne n'a été extraite : NoSession si le tableau
+    est absent un jour sans séance (calendrier, ou marqueur « marché fermé »
+    lu comme le scraper), ValueError sinon (tableau présent mais inexploitable)
+    """
+    if extract_table_rows(html, TABLE_CLASSES[dataset]):
+        return ValueError(f"tableau {dataset} présent mais aucune ligne exploitable")
+    if not is_trading_day(datetime.date.fromisoformat(date)):
+        return NoSession("jour sans séance")
+    status = extract_texts(html, ('market-status',))['market-status']
+    if status is not None and 'ouvert' not in status.lower():
+        return NoSession(f"marché fermé, aucune ligne {dataset}")
+    return ValueError(f"aucune ligne {dataset} dans la page")
+
+
+def _records(dataset, date, path, kind):
+    """
+    Enregistrements datés d'un fichier (page analysée ou JSON brut) ; les
+    erreurs d'analyse sont propagées, et une page HTML sans aucune ligne est
+    une erreur, sauf un jour sans séance (NoSession)
+    """
+    if kind == 'html':
+        html = path.read_text(encoding='utf-8', errors='replace')
+        if dataset == 'indices':
+            records = indices_to_records(index_values(html), date)
+        else:
+            records = (stock_records if dataset == 'stocks' else bond_records)(html, date)
+        if not records:
+            raise _empty_page(dataset, date, html)
+        return records
+
+    data = read_json(path)
+    if dataset == 'indices' and isinstance(data, dict):
+        return indices_to_records(data, date)
+    if not isinstance(data, list):
+        raise ValueError(f"contenu inattendu ({type(data).__name__})")
+    return [dict(record, date=record.get('date') or date) for record in data]
+
+
+def ingest_chunk(items):
+    """
+    Analyse une tranche de fichiers et écrit leurs CSV traités (dans un
+    worker) ; retourne [(dataset, date, chemin, lignes, enregistrements ou
+    None, statut 'ok', 'skipped' ou 'failed', message)]
+    """
+    output_dir = _worker['output_dir']
+    results = []
+    for dataset, date, path, kind in items:
+        try:
+            records = _records(dataset, date, Path(path), kind)
+            if records:
+                write_csv(output_dir / f"{dataset}_{date}.csv", records)
+            kept = records if _worker['keep_records'] else None
+            results.append((dataset, date, str(path), len(records), kept, 'ok', None))
+        except NoSession as e:
+            results.append((dataset, date, str(path), 0, None, 'skipped', str(e)))
+        except Exception as e:
+            results.append((dataset, date, str(path), 0, None, 'failed', f"{type(e).__name__}: {e}"))
+    return results
+
+
+class BulkIngest:
+    """Répartition des fichiers entre workers, écriture unique dans l'historique"""
+
+    def __init__(self, output_dir, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 store=None, history_batch=DEFAULT_HISTORY_BATCH):
+        self.output_dir = Path(output_dir)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.store = store
+        self.history_batch = max(1, history_batch)
+        self._pending = []
+        self._touched = {}
+
+    def _flush_history(self):
+        """Ajoute les journées en attente à l'historique (processus principal uniquement)"""
+        for dataset, date, records in sorted(self._pending, key=lambda item: (item[1], item[0])):
+            self.store.append(dataset, records, date)
+            self._touched.setdefault(dataset, set()).add(date[:7])
+        self._pending = []
+
+    def _collect(self, results, totals, failures, skipped):
+        for dataset, date, path, rows, records, status, message in results:
+            if status == 'failed':
+                logger.error(f"Échec pour {path}: {message}")
+                failures[path] = message
+                totals['failed'] += 1
+                continue
+            if status == 'skipped':
+                logger.debug(f"Ignoré {path}: {message}")
+                skipped[path] = message
+                totals['skipped'] += 1
+                continue
+            totals['files'] += 1
+            totals['rows'] += rows
+            if self.store is not None and records:
+                self._pending.append((dataset, date, records))
+        if self.store is not None and len(self._pending) >= self.history_batch:
+            self._flush_history()
+
+    def run(self, files, compact=True):
+        """
+        Ingère les fichiers {(dataset, date): (chemin, type)} ; retourne
+        (bilan, {chemin: erreur} des échecs, {chemin: motif} des fichiers ignorés)
+        """
+        items = [(dataset, date, str(path), kind) for (dataset, date), (path, kind) in sorted(files.items())]
+        chunks = chunked(items, self.chunk_size)
+        totals = {'files': 0, 'rows': 0, 'skipped': 0, 'failed': 0}
+        failures = {}
+        skipped = {}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Ingestion de {len(items)} fichiers en {len(chunks)} tranches, {self.workers} processus")
+
+        start = time.perf_counter()
+        done = 0
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(str(self.output_dir), self.store is not None)) as executor:
+            futures = {executor.submit(ingest_chunk, chunk): chunk for chunk in chunks}
+            try:
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        results = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        # Tranche perdue (résultat non transmissible...) : ses fichiers sont en échec
+                        results = [(d, day, p, 0, None, 'failed', f"{type(e).__name__}: {e}")
+                                   for d, day, p, _ in chunk]
+                    self._collect(results, totals, failures, skipped)
+
+                    done += len(chunk)
+                    elapsed = time.perf_counter() - start
+                    rate = done / elapsed if elapsed else 0
+                    remaining = (len(items) - done) / rate if rate else 0
+                    logger.info(f"{done}/{len(items)} fichiers ({rate:.0f} fichiers/s, "
+                                f"reste ~{remaining:.0f}s, {totals['failed']} en échec)")
+            except KeyboardInterrupt:
+                logger.warning("Interruption : les CSV déjà écrits sont conservés")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        if self.store is not None:
+            self._flush_history()
+            if compact:
+                for dataset, months in self._touched.items():
+                    self.store.compact(dataset, sorted(months))
+
+        totals['seconds'] = round(time.perf_counter() - start, 3)
+        totals['files_per_s'] = round(totals['files'] / totals['seconds'], 1) if totals['seconds'] else None
+        logger.info(f"Ingestion terminée: {totals}")
+        return totals, failures, skipped
+
+
+def parse_arguments():
+    """Parse les arguments de ligne de commande"""
+    parser = argparse.ArgumentParser(description='Ingestion en masse de pages BRVM sauvegardées et de fichiers bruts')
+    parser.add_argument('source', type=Path,
+                        help='Répertoire des pages HTML et/ou fichiers JSON bruts (parcouru récursivement)')
+    parser.add_argument('--output', type=Path, default=DATA_DIR / "processed",
+                        help='Répertoire des CSV traités (par défaut: data/processed)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Nombre de processus (par défaut: nombre de cœurs)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Fichiers par tranche confiée à un processus (par défaut: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--datasets', default=",".join(INGEST_DATASETS),
+                        help=f"Jeux de données (par défaut: {','.join(INGEST_DATASETS)})")
+    parser.add_argument('--history', action='store_true',
+                        help="Ajouter aussi les journées à l'historique Parquet")
+    parser.add_argument('--history-dir', type=Path, default=None,
+                        help="Répertoire de l'historique (par défaut: data/history)")
+    parser.add_argument('--history-batch', type=int, default=DEFAULT_HISTORY_BATCH,
+                        help=f"Journées accumulées avant chaque écriture dans l'historique (par défaut: {DEFAULT_HISTORY_BATCH})")
+    parser.add_argument('--no-compact', action='store_true',
+                        help="Ne pas compacter les mois écrits dans l'historique")
+    parser.add_argument('--report', type=Path, default=None,
+                        help='Fichier JSON du bilan et des fichiers en échec')
+    return parser.parse_args()
+
+
+def main():
+    """Fonction principale"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    logging.getLogger("brvm_scraper").setLevel(logging.WARNING)
+    logging.getLogger("brvm_history").setLevel(logging.WARNING)
+
+    args = parse_arguments()
+    datasets = [d.strip() for d in args.datasets.split(',') if d.strip()]
+    unknown = [d for d in datasets if d not in INGEST_DATASETS]
+    if unknown:
+        sys.exit(f"Jeux de données inconnus: {', '.join(unknown)} (attendu: {', '.join(INGEST_DATASETS)})")
+    if not args.source.is_dir():
+        sys.exit(f"Répertoire introuvable: {args.source}")
+
+    files = {key: value for key, value in discover(args.source).items() if key[0] in datasets}
+    if not files:
+        logger.warning(f"Aucun fichier à ingérer dans {args.source}")
+        return
+
+    store = None
+    if args.history:
+        from history_store import HistoryStore
+        store = HistoryStore(args.history_dir or DATA_DIR / "history")
+
+    engine = BulkIngest(args.output, workers=args.workers, chunk_size=args.chunk_size,
+                        store=store, history_batch=args.history_batch)
+    try:
+        totals, failures, skipped = engine.run(files, compact=not args.no_compact)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'totals': totals, 'failed': failures, 'skipped': skipped}, f, ensure_ascii=False, indent=2)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
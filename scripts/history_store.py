@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stockage historique colonnaire (Parquet) des données de la BRVM
+Les cotations sont partitionnées par jeu de données et par mois :
+
+    data/history/<dataset>/month=YYYY-MM/day-YYYY-MM-DD.parquet   (ajouts quotidiens)
+    data/history/<dataset>/month=YYYY-MM/part-0.parquet           (après compaction)
+    data/history/<dataset>/_index.json                            (clé -> plage de dates)
+
+Les colonnes sont typées (prix en float64, volumes en int64, symboles
+dictionnaire/catégoriels) afin que les lectures sur plusieurs années ne
+chargent que les partitions et les colonnes utiles.
+"""
+
+import os
+import json
+import logging
+import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger("brvm_history")
+
+HISTORY_DIR = Path(__file__).resolve().parent.parent / "data" / "history"
+
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Schéma typé de chaque jeu de données ; la clé identifie une ligne pour une date donnée
+SCHEMAS = {
+    'stocks': pa.schema([
+        ('date', pa.date32()),
+        ('symbol', _CATEGORY),
+        ('name', _CATEGORY),
+        ('isin', _CATEGORY),
+        ('last_price', pa.float64()),
+        ('change', pa.float64()),
+        ('high', pa.float64()),
+        ('low', pa.float64()),
+        ('volume', pa.int64()),
+    ]),
+    'bonds': pa.schema([
+        ('date', pa.date32()),
+        ('symbol', _CATEGORY),
+        ('name', _CATEGORY),
+        ('isin', _CATEGORY),
+        ('last_price', pa.float64()),
+        ('change', pa.float64()),
+        ('yield', pa.float64()),
+        ('maturity_date', _CATEGORY),
+    ]),
+    'indices': pa.schema([
+        ('date', pa.date32()),
+        ('name', _CATEGORY),
+        ('value', pa.float64()),
+        ('change_percent', pa.float64()),
+    ]),
+}
+
+KEY_COLUMNS = {
+    'stocks': 'symbol',
+    'bonds': 'symbol',
+    'indices': 'name',
+}
+
+COMPACTED_FILE = "part-0.parquet"
+INDEX_FILE = "_index.json"
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def _to_date(value):
+    """Convertit une chaîne YYYY-MM-DD (ou une date) en datetime.date"""
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _month_of(date):
+    """Retourne le mois (YYYY-MM) d'une date"""
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+def _coerce(value, arrow_type):
+    """Normalise une valeur brute (chaîne, NaN...) vers le type Python de la colonne"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if pa.types.is_floating(arrow_type):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if pa.types.is_integer(arrow_type):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+    return str(value)
+
+
+class HistoryStore:
+    """Stockage historique partitionné par jeu de données et par mois"""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else HISTORY_DIR
+        self._index_cache = {}
+
+    def dataset_dir(self, dataset):
+        """Répertoire racine d'un jeu de données"""
+        if dataset not in SCHEMAS:
+            raise ValueError(f"Jeu de données inconnu: {dataset}")
+        return self.root / dataset
+
+    def months(self, dataset):
+        """Liste triée des mois disponibles pour un jeu de données"""
+        base = self.dataset_dir(dataset)
+        if not base.exists():
+            return []
+        return sorted(p.name[len("month="):] for p in base.glob("month=*") if p.is_dir())
+
+    def _month_dir(self, dataset, month):
+        return self.dataset_dir(dataset) / f"month={month}"
+
+    def _month_files(self, dataset, month):
+        """Fichiers Parquet d'un mois : fichier compacté d'abord, puis fichiers quotidiens"""
+        month_dir = self._month_dir(dataset, month)
+        files = []
+        compacted = month_dir / COMPACTED_FILE
+        if compacted.exists():
+            files.append(compacted)
+        files.extend(sorted(month_dir.glob("day-*.parquet")))
+        return files
+
+    def to_table(self, dataset, records, date=None):
+        """Convertit des enregistrements (dictionnaires) en table Arrow typée"""
+        schema = SCHEMAS[dataset]
+        default_date = _to_date(date)
+        columns = {field.name: [] for field in schema}
+
+        for record in records:
+            for field in schema:
+                if field.name == 'date':
+                    columns['date'].append(_to_date(record.get('date')) or default_date)
+                else:
+                    value_type = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+                    columns[field.name].append(_coerce(record.get(field.name), value_type))
+
+        arrays = []
+        for field in schema:
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(columns[field.name], type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(columns[field.name], type=field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def append(self, dataset, records, date):
+        """
+        Ajoute (ou remplace) les données d'une journée
+
+        Chaque journée est écrite dans son propre fichier de partition, de façon
+        atomique ; réécrire une journée déjà présente la remplace, et les
+        entrées de l'index pour ce mois sont alors recalculées (une clé absente
+        de la nouvelle version n'y est plus rattachée).
+        """
+        date = _to_date(date)
+        table = self.to_table(dataset, records, date)
+        if table.num_rows == 0:
+            return 0
+
+        month = _month_of(date)
+        month_dir = self._month_dir(dataset, month)
+        month_dir.mkdir(parents=True, exist_ok=True)
+
+        day_file = month_dir / f"day-{date.isoformat()}.parquet"
+        # La journée a peut-être déjà été écrite, ou fusionnée dans le fichier compacté
+        replaced = day_file.exists()
+        replaced |= self._drop_dates_from_compacted(dataset, month, {date})
+
+        self._write_table(table, day_file)
+        if replaced:
+            self._reindex_month(dataset, month)
+        else:
+            self._update_index(dataset, table, date)
+        logger.info(f"{table.num_rows} lignes ajoutées à l'historique {dataset} ({date})")
+        return table.num_rows
+
+    def _write_table(self, table, path):
+        """Écrit une table Parquet via un fichier temporaire puis un remplacement atomique"""
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, compression='zstd')
+        os.replace(tmp_path, path)
+
+    def _index_path(self, dataset):
+        return self.dataset_dir(dataset) / INDEX_FILE
+
+    def index_version(self, dataset):
+        """Version de l'index d'un jeu de données (change à chaque ajout), ou None"""
+        try:
+            st = os.stat(self._index_path(dataset))
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def index(self, dataset):
+        """
+        Retourne l'index {clé: {'first', 'last', 'months'}} d'un jeu de données
+
+        L'index est relu uniquement lorsque le fichier a changé sur disque.
+        """
+        version = self.index_version(dataset)
+        if version is None:
+            return {}
+        cached = self._index_cache.get(dataset)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        with open(self._index_path(dataset), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self._index_cache[dataset] = (version, index)
+        return index
+
+    def key_range(self, dataset, key):
+        """Retourne (première date, dernière date, mois) d'une clé, ou None si elle est inconnue"""
+        entry = self.index(dataset).get(key)
+        if entry is None:
+            return None
+        return _to_date(entry['first']), _to_date(entry['last']), entry['months']
+
+    def _write_index(self, dataset, index):
+        path = self._index_path(dataset)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _update_index(self, dataset, table, date):
+        """Étend la plage de dates et la liste des mois des clés présentes dans la journée"""
+        index = dict(self.index(dataset))
+        day = date.isoformat()
+        month = _month_of(date)
+        keys = table.column(KEY_COLUMNS[dataset]).cast(pa.string()).unique().to_pylist()
+
+        for key in keys:
+            if key is None:
+                continue
+            entry = index.get(key)
+            if entry is None:
+                index[key] = {'first': day, 'last': day, 'months': [month]}
+                continue
+            entry = dict(entry)
+            entry['first'] = min(entry['first'], day)
+            entry['last'] = max(entry['last'], day)
+            if month not in entry['months']:
+                entry['months'] = sorted(entry['months'] + [month])
+            index[key] = entry
+
+        self._write_index(dataset, index)
+
+    def _month_ranges(self, dataset, month, tables=None):
+        """Plage de dates {clé: (première, dernière)} des clés d'un mois"""
+        key_column = KEY_COLUMNS[dataset]
+        if tables is None:
+            tables = [pq.read_table(path, columns=[key_column, 'date'])
+                      for path in self._month_files(dataset, month)]
+        ranges = {}
+        for table in tables:
+            grouped = table.select([key_column, 'date']).group_by(key_column).aggregate(
+                [('date', 'min'), ('date', 'max')])
+            for key, first, last in zip(grouped.column(key_column).cast(pa.string()).to_pylist(),
+                                        grouped.column('date_min').to_pylist(),
+                                        grouped.column('date_max').to_pylist()):
+                if key is None:
+                    continue
+                first, last = first.isoformat(), last.isoformat()
+                if key in ranges:
+                    first, last = min(first, ranges[key][0]), max(last, ranges[key][1])
+                ranges[key] = (first, last)
+        return ranges
+
+    def _reindex_month(self, dataset, month, tables=None):
+        """
+        Recalcule les entrées de l'index pour un mois réécrit : les clés qui
+        n'y figurent plus perdent ce mois (et disparaissent sans autre mois),
+        les bornes touchant ce mois sont relues dans les partitions
+        """
+        index = dict(self.index(dataset))
+        ranges = {month: self._month_ranges(dataset, month, tables)}
+
+        def bound(key, other_month, position):
+            if other_month not in ranges:
+                ranges[other_month] = self._month_ranges(dataset, other_month)
+            return ranges[other_month][key][position]
+
+        for key in set(index) | set(ranges[month]):
+            entry = index.get(key) or {'first': None, 'last': None, 'months': []}
+            months = [m for m in entry['months'] if m != month]
+            if key in ranges[month]:
+                months = sorted(months + [month])
+            if not months:
+                index.pop(key, None)
+                continue
+            # Bornes inchangées si elles tombent dans un mois non réécrit resté en tête (ou en queue)
+            first = entry['first'] if entry['months'][:1] == months[:1] != [month] else bound(key, months[0], 0)
+            last = entry['last'] if entry['months'][-1:] == months[-1:] != [month] else bound(key, months[-1], 1)
+            index[key] = {'first': first, 'last': last, 'months': months}
+
+        self._write_index(dataset, index)
+
+    def rebuild_index(self, dataset=None):
+        """Reconstruit l'index clé -> plage de dates à partir des partitions existantes"""
+        datasets = [dataset] if dataset else list(SCHEMAS)
+        for name in datasets:
+            key_column = KEY_COLUMNS[name]
+            index = {}
+            for month in self.months(name):
+                for path in self._month_files(name, month):
+                    table = pq.read_table(path, columns=[key_column, 'date'])
+                    grouped = table.group_by(key_column).aggregate([('date', 'min'), ('date', 'max')])
+                    for key, first, last in zip(grouped.column(key_column).cast(pa.string()).to_pylist(),
+                                                grouped.column('date_min').to_pylist(),
+                                                grouped.column('date_max').to_pylist()):
+                        if key is None:
+                            continue
+                        entry = index.setdefault(key, {'first': first.isoformat(),
+                                                       'last': last.isoformat(),
+                                                       'months': []})
+                        entry['first'] = min(entry['first'], first.isoformat())
+                        entry['last'] = max(entry['last'], last.isoformat())
+                        if month not in entry['months']:
+                            entry['months'].append(month)
+            for entry in index.values():
+                entry['months'].sort()
+            if self.dataset_dir(name).exists():
+                self._write_index(name, index)
+            logger.info(f"Index de l'historique {name} reconstruit: {len(index)} clés")
+
+    def _drop_dates_from_compacted(self, dataset, month, dates):
+        """
+        Retire des dates du fichier compacté d'un mois (réécriture d'une
+        journée) ; retourne True si des lignes ont été retirées
+        """
+        compacted = self._month_dir(dataset, month) / COMPACTED_FILE
+        if not compacted.exists():
+            return False
+
+        present = pq.read_table(compacted, columns=['date']).column('date')
+        mask = pc.is_in(present, value_set=pa.array(sorted(dates), type=pa.date32()))
+        if not pc.any(mask).as_py():
+            return False
+
+        table = pq.read_table(compacted)
+        table = table.filter(pc.invert(mask))
+        self._write_table(table, compacted)
+        return True
+
+    def compact(self, dataset=None, months=None):
+        """
+        Fusionne les fichiers quotidiens de chaque mois en un seul fichier trié
+        par (clé, date), ce qui réduit le nombre de fichiers à ouvrir et rend les
+        statistiques par groupe de lignes exploitables pour filtrer un symbole ;
+        les entrées de l'index des mois compactés sont recalculées
+        """
+        datasets = [dataset] if dataset else list(SCHEMAS)
+        compacted_months = 0
+
+        for name in datasets:
+            key = KEY_COLUMNS[name]
+            for month in (months or self.months(name)):
+                month_dir = self._month_dir(name, month)
+                day_files = sorted(month_dir.glob("day-*.parquet"))
+                if not day_files:
+                    continue
+
+                files = self._month_files(name, month)
+                table = pa.concat_tables([pq.read_table(f, schema=SCHEMAS[name]) for f in files])
+                table = table.unify_dictionaries().combine_chunks()
+                sort_keys = [(key, 'ascending'), ('date', 'ascending')]
+                indices = pc.sort_indices(table.cast(self._sortable_schema(name)), sort_keys=sort_keys)
+                table = table.take(indices)
+
+                self._write_table(table, month_dir / COMPACTED_FILE)
+                for day_file in day_files:
+                    day_file.unlink()
+                self._reindex_month(name, month, [table])
+
+                compacted_months += 1
+                logger.info(f"Historique {name} compacté pour {month}: {table.num_rows} lignes")
+
+        return compacted_months
+
+    def _sortable_schema(self, dataset):
+        """Schéma sans dictionnaire, utilisé pour trier les lignes par valeur de clé"""
+        return pa.schema([
+            pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+            for f in SCHEMAS[dataset]
+        ])
+
+    def _query(self, dataset, start=None, end=None, columns=None, keys=None):
+        """
+        Prépare la lecture d'une plage : retourne (dataset Arrow ou None,
+        filtre, schéma projeté)
+
+        Seules les partitions mensuelles couvrant [start, end] sont ouvertes
+        (et, si des clés sont demandées, seulement les mois où l'index les
+        référence) ; les filtres sur la date et la clé sont poussés jusqu'aux
+        groupes de lignes Parquet et seules les colonnes demandées sont décodées.
+        """
+        start = _to_date(start)
+        end = _to_date(end)
+        schema = SCHEMAS[dataset]
+
+        months = self.months(dataset)
+        if keys:
+            index = self.index(dataset)
+            if index:
+                wanted = set()
+                for key in keys:
+                    wanted.update(index.get(key, {}).get('months', []))
+                months = [m for m in months if m in wanted]
+
+        files = []
+        for month in months:
+            if start and month < _month_of(start):
+                continue
+            if end and month > _month_of(end):
+                continue
+            files.extend(self._month_files(dataset, month))
+
+        if columns is not None:
+            unknown = [c for c in columns if c not in schema.names]
+            if unknown:
+                raise ValueError(f"Colonnes inconnues pour {dataset}: {unknown}")
+        projected = schema if columns is None else pa.schema([schema.field(c) for c in columns])
+
+        if not files:
+            return None, None, projected
+
+        expression = None
+        if start:
+            expression = ds.field('date') >= pa.scalar(start, type=pa.date32())
+        if end:
+            condition = ds.field('date') <= pa.scalar(end, type=pa.date32())
+            expression = condition if expression is None else expression & condition
+        if keys:
+            condition = ds.field(KEY_COLUMNS[dataset]).isin(list(keys))
+            expression = condition if expression is None else expression & condition
+
+        dataset_obj = ds.dataset([str(f) for f in files], schema=schema, format='parquet')
+        return dataset_obj, expression, projected
+
+    def scan(self, dataset, start=None, end=None, columns=None, keys=None):
+        """Lit une plage de l'historique sous forme de table Arrow"""
+        dataset_obj, expression, projected = self._query(dataset, start, end, columns, keys)
+        if dataset_obj is None:
+            return projected.empty_table()
+        return dataset_obj.to_table(columns=columns, filter=expression)
+
+    def iter_batches(self, dataset, start=None, end=None, columns=None, keys=None, batch_size=ROW_GROUP_SIZE):
+        """
+        Itère sur une plage de l'historique par lots Arrow (mois après mois),
+        sans jamais matérialiser la plage complète en mémoire
+        """
+        dataset_obj, expression, projected = self._query(dataset, start, end, columns, keys)
+        if dataset_obj is None:
+            return
+        scanner = dataset_obj.scanner(columns=projected.names, filter=expression,
+                                      batch_size=batch_size, batch_readahead=2, fragment_readahead=1)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch
+
+    def schema(self, dataset, columns=None):
+        """Schéma Arrow d'un jeu de données, éventuellement restreint à certaines colonnes"""
+        schema = SCHEMAS[dataset]
+        return schema if columns is None else pa.schema([schema.field(c) for c in columns])
+
+    def read(self, dataset, start=None, end=None, columns=None, keys=None):
+        """Lit une plage de l'historique sous forme de DataFrame pandas (clés catégorielles)"""
+        table = self.scan(dataset, start=start, end=end, columns=columns, keys=keys)
+        return table.to_pandas(date_as_object=False)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Moteurs d'extraction HTML pour le scraper BRVM
+Le scraper n'a besoin que du texte des cellules d'un tableau (ou d'un
+élément identifié par sa classe) : lxml est utilisé lorsqu'il est installé,
+sinon BeautifulSoup limité aux seuls éléments ciblés (SoupStrainer).
+
+Utilisation en ligne de commande pour vérifier que les moteurs donnent un
+résultat identique sur des pages sauvegardées:
+
+    python scripts/html_parser.py page_actions.html page_indices.html
+"""
+
+import os
+import re
+import sys
+import importlib.util
+
+# lxml est optionnel (BeautifulSoup reste disponible) ; sa présence est vérifiée
+# sans l'importer : il n'est chargé qu'à la première page analysée par ce moteur
+HAS_LXML = importlib.util.find_spec("lxml") is not None
+
+_lxml_parser = None
+
+# Tableaux et éléments lus par le scraper
+TABLE_CLASSES = ('indices-table', 'stocks-table', 'bonds-table')
+TEXT_CLASSES = ('market-status', 'market-date')
+
+
+def _lxml_root(html):
+    global _lxml_parser
+    import lxml.html
+
+    if _lxml_parser is None:
+        _lxml_parser = lxml.html.HTMLParser(encoding='utf-8')
+    # Encodage explicite : lxml refuse les chaînes portant une déclaration d'encodage
+    return lxml.html.fromstring(html.encode('utf-8'), parser=_lxml_parser)
+
+
+def _class_xpath(css_class):
+    """Prédicat XPath équivalent au sélecteur CSS « .css_class »"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')"
+
+
+def _lxml_table_rows(html, table_class):
+    root = _lxml_root(html)
+    tables = root.xpath(f"//table[{_class_xpath(table_class)}]")
+    if not tables:
+        return []
+    return [
+        [cell.text_content().strip() for cell in row.iterfind('.//td')]
+        for row in tables[0].xpath(".//tbody//tr")
+    ]
+
+
+def _lxml_texts(html, classes):
+    root = _lxml_root(html)
+    texts = {}
+    for css_class in classes:
+        elements = root.xpath(f"//*[{_class_xpath(css_class)}]")
+        texts[css_class] = elements[0].text_content().strip() if elements else None
+    return texts
+
+
+def _class_pattern(classes):
+    # Le filtre s'applique à l'attribut class brut, qui peut contenir plusieurs classes
+    alternatives = '|'.join(re.escape(c) for c in classes)
+    return re.compile(rf'(^|\s)({alternatives})(\s|$)')
+
+
+def _bs4_table_rows(html, table_class):
+    # Importé à la demande : inutile lorsque lxml est disponible
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    # Seul le tableau ciblé est construit en mémoire
+    strainer = SoupStrainer('table', class_=_class_pattern([table_class]))
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    table = soup.select_one(f'table.{table_class}')
+    if table is None:
+        return []
+    return [
+        [cell.get_text().strip() for cell in row.select('td')]
+        for row in table.select('tbody tr')
+    ]
+
+
+def _bs4_texts(html, classes):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    strainer = SoupStrainer(class_=_class_pattern(classes))
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    texts = {}
+    for css_class in classes:
+        element = soup.select_one(f'.{css_class}')
+        texts[css_class] = element.get_text().strip() if element else None
+    return texts
+
+
+BACKENDS = {
+    'bs4': (_bs4_table_rows, _bs4_texts),
+}
+if HAS_LXML:
+    BACKENDS['lxml'] = (_lxml_table_rows, _lxml_texts)
+
+
+def default_backend():
+    """Moteur par défaut : BRVM_HTML_PARSER s'il est défini, sinon lxml si disponible"""
+    backend = os.environ.get("BRVM_HTML_PARSER")
+    if backend:
+        if backend not in BACKENDS:
+            raise ValueError(f"Moteur HTML indisponible: {backend} (disponibles: {', '.join(BACKENDS)})")
+        return backend
+    return 'lxml' if 'lxml' in BACKENDS else 'bs4'
+
+
+def extract_table_rows(html, table_class, backend=None):
+    """
+    Retourne le texte des cellules <td> de chaque ligne du <tbody> du premier
+    tableau portant la classe `table_class` (liste de listes de chaînes)
+    """
+    return BACKENDS[backend or default_backend()][0](html, table_class)
+
+
+def extract_texts(html, classes, backend=None):
+    """Retourne {classe: texte du premier élément portant cette classe, ou None}"""
+    return BACKENDS[backend or default_backend()][1](html, classes)
+
+
+def compare_backends(html):
+    """Compare les résultats de tous les moteurs disponibles ; retourne la liste des écarts"""
+    differences = []
+    reference = 'bs4'
+    for backend in BACKENDS:
+        if backend == reference:
+            continue
+        for table_class in TABLE_CLASSES:
+            expected = extract_table_rows(html, table_class, reference)
+            actual = extract_table_rows(html, table_class, backend)
+            if expected != actual:
+                differences.append(f"{backend}: tableau '{table_class}' différent de {reference}")
+        if extract_texts(html, TEXT_CLASSES, reference) != extract_texts(html, TEXT_CLASSES, backend):
+            differences.append(f"{backend}: textes {TEXT_CLASSES} différents de {reference}")
+    return differences
+
+
+if __name__ == "__main__":
+    if len(BACKENDS) < 2:
+        print("lxml n'est pas installé : un seul moteur disponible (bs4)")
+    status = 0
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            differences = compare_backends(f.read())
+        for difference in differences:
+            print(f"{path}: {difference}")
+        if differences:
+            status = 1
+        else:
+            print(f"{path}: résultats identiques ({', '.join(BACKENDS)})")
+    sys.exit(status)
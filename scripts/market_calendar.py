@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Calendrier de cotation de la BRVM
+Jours ouvrés, jours fériés et horaires de séance (heure d'Abidjan, GMT),
+utilisés pour planifier les collectes : fréquentes pendant la séance,
+espacées après la clôture, les week-ends et les jours fériés.
+"""
+
+import os
+import datetime
+
+# La BRVM (Abidjan) est à l'heure GMT, sans heure d'été
+BRVM_TZ = datetime.timezone.utc
+
+# Horaires de séance (pré-ouverture incluse)
+SESSION_OPEN = datetime.time(9, 0)
+SESSION_CLOSE = datetime.time(15, 30)
+
+# Délai après la clôture pour une dernière collecte des cours de clôture
+POST_CLOSE_DELAY = datetime.timedelta(minutes=15)
+
+# Jours fériés à date fixe (mois, jour)
+FIXED_HOLIDAYS = {
+    (1, 1),    # Jour de l'an
+    (5, 1),    # Fête du travail
+    (8, 7),    # Fête de l'indépendance (Côte d'Ivoire)
+    (8, 15),   # Assomption
+    (11, 1),   # Toussaint
+    (12, 25),  # Noël
+}
+
+
+def _easter(year):
+    """Date du dimanche de Pâques (algorithme de Meeus/Jones/Butcher)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _extra_holidays():
+    """
+    Jours fériés supplémentaires (fêtes musulmanes, jours décrétés...) fournis
+    via BRVM_HOLIDAYS sous forme de dates YYYY-MM-DD séparées par des virgules
+    """
+    holidays = set()
+    for value in os.environ.get("BRVM_HOLIDAYS", "").split(','):
+        value = value.strip()
+        if value:
+            holidays.add(datetime.date.fromisoformat(value))
+    return holidays
+
+
+def is_holiday(date):
+    """Indique si la date est un jour férié de la BRVM"""
+    if (date.month, date.day) in FIXED_HOLIDAYS:
+        return True
+    easter = _easter(date.year)
+    movable = {
+        easter + datetime.timedelta(days=1),   # Lundi de Pâques
+        easter + datetime.timedelta(days=39),  # Ascension
+        easter + datetime.timedelta(days=50),  # Lundi de Pentecôte
+    }
+    return date in movable or date in _extra_holidays()
+
+
+def is_trading_day(date):
+    """Indique si la BRVM tient une séance ce jour-là"""
+    return date.weekday() < 5 and not is_holiday(date)
+
+
+def now():
+    """Heure courante dans le fuseau de la BRVM"""
+    return datetime.datetime.now(BRVM_TZ)
+
+
+def session_bounds(date):
+    """Retourne (ouverture, clôture) de la séance d'une date"""
+    return (datetime.datetime.combine(date, SESSION_OPEN, tzinfo=BRVM_TZ),
+            datetime.datetime.combine(date, SESSION_CLOSE, tzinfo=BRVM_TZ))
+
+
+def is_session_open(moment=None):
+    """Indique si la séance est en cours"""
+    moment = moment or now()
+    if not is_trading_day(moment.date()):
+        return False
+    open_at, close_at = session_bounds(moment.date())
+    return open_at <= moment < close_at
+
+
+def next_session_open(moment=None):
+    """Ouverture de la prochaine séance strictement postérieure à `moment`"""
+    moment = moment or now()
+    date = moment.date()
+    while True:
+        if is_trading_day(date):
+            open_at, _ = session_bounds(date)
+            if open_at > moment:
+                return open_at
+        date += datetime.timedelta(days=1)
+
+
+def next_run_time(moment, active_interval, idle_interval):
+    """
+    Heure de la prochaine collecte
+
+    Pendant la séance, toutes les `active_interval` ; une dernière collecte
+    peu après la clôture ; ensuite, rien avant la prochaine ouverture, avec au
+    plus `idle_interval` d'attente pour rester robuste aux séances imprévues.
+    """
+    date = moment.date()
+    if is_trading_day(date):
+        open_at, close_at = session_bounds(date)
+        post_close = close_at + POST_CLOSE_DELAY
+        if open_at <= moment < close_at:
+            return min(moment + active_interval, post_close)
+        if close_at <= moment < post_close:
+            return post_close
+
+    return min(next_session_open(moment), moment + idle_interval)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Métriques de la BRVM Data Platform (format texte Prometheus)
+Compteurs, jauges et histogrammes en mémoire, sans dépendance, partagés par
+le scraper (durée de chaque étape d'une collecte) et par l'API (latence de
+chaque endpoint). Une mesure coûte un verrou et une recherche de seau : on
+peut les laisser actives en production.
+
+Chaque processus a son propre registre. Pour exposer sur un seul endpoint
+les métriques de plusieurs processus (workers gunicorn, scraper), chacun
+écrit périodiquement un instantané JSON de son registre dans un répertoire
+commun, et l'endpoint fusionne ces instantanés avec le sien.
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger("brvm_metrics")
+
+# Seaux par défaut des histogrammes de durée (secondes)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Type MIME du format d'exposition texte de Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Timer:
+    """Chronomètre d'une mesure d'histogramme (gestionnaire de contexte)"""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.elapsed = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._start
+        self.histogram.observe(self.elapsed, **self.labels)
+        return False
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def snapshot(self):
+        """Description JSON-sérialisable de la métrique et de ses valeurs"""
+        with self._lock:
+            samples = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {'type': self.kind, 'help': self.documentation,
+                'labels': list(self.labelnames), 'samples': samples}
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(_Metric):
+    """Compteur croissant"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Valeur instantanée"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution de valeurs par seaux cumulés (durées en secondes)"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Effectifs par seau (non cumulés, dernier seau : +Inf), somme, nombre
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][position] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """Gestionnaire de contexte mesurant la durée du bloc"""
+        return Timer(self, labels)
+
+    def _copy(self, value):
+        return {'counts': list(value[0]), 'sum': value[1], 'count': value[2]}
+
+    def snapshot(self):
+        result = super().snapshot()
+        result['buckets'] = list(self.buckets)
+        return result
+
+
+class MetricsRegistry:
+    """Ensemble des métriques d'un processus"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._shared_pid = None
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def snapshot(self):
+        """Instantané JSON-sérialisable de toutes les métriques"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def render(self, others=()):
+        """Texte Prometheus du registre, fusionné avec d'autres instantanés"""
+        return render_snapshot(merge_snapshots([self.snapshot(), *others]))
+
+    def share(self, directory, name, interval=5.0):
+        """
+        Écrit l'instantané du registre dans `directory` toutes les `interval`
+        secondes (thread démarré une fois par processus, après un fork)
+        """
+        pid = os.getpid()
+        if self._shared_pid == pid:
+            return
+        with self._lock:
+            if self._shared_pid == pid:
+                return
+            self._shared_pid = pid
+
+        path = Path(directory) / f"{name}-{pid}.metrics.json"
+
+        def flush():
+            while True:
+                time.sleep(interval)
+                try:
+                    write_snapshot(path, self.snapshot(), pid=pid)
+                except OSError as e:
+                    logger.warning(f"Écriture des métriques impossible ({path}): {e}")
+
+        threading.Thread(target=flush, name="brvm-metrics-flush", daemon=True).start()
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(path, snapshot, pid=None, **extra):
+    """Écrit un instantané de métriques (fichier temporaire puis remplacement atomique)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = dict(extra, pid=pid or os.getpid(), written_at=time.time(), metrics=snapshot)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def read_snapshots(directory, pattern="*.metrics.json", exclude_pid=None):
+    """
+    Instantanés écrits par les autres processus ; les fichiers des processus
+    terminés sont supprimés, sauf ceux marqués `live=False` (scraper lancé
+    ponctuellement, dont le dernier bilan reste exposé)
+    """
+    snapshots = []
+    for path in sorted(Path(directory).glob(pattern)):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            continue
+        pid = document.get('pid')
+        if pid == exclude_pid:
+            continue
+        if document.get('live', True) and pid and not _process_alive(pid):
+            path.unlink(missing_ok=True)
+            continue
+        snapshots.append(document.get('metrics') or {})
+    return snapshots
+
+
+def merge_snapshots(snapshots):
+    """
+    Fusionne des instantanés de registres : les valeurs sont additionnées,
+    sauf les horodatages (`*_timestamp_seconds`) dont on garde le plus récent
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = dict(metric, samples={})
+            elif target['type'] != metric['type'] or target.get('buckets') != metric.get('buckets'):
+                logger.warning(f"Métrique {name} incompatible entre processus, instantané ignoré")
+                continue
+            samples = target['samples']
+            for labels, value in metric['samples']:
+                key = tuple(labels)
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = dict(value, counts=list(value['counts'])) if isinstance(value, dict) else value
+                elif metric['type'] == 'histogram':
+                    current['counts'] = [a + b for a, b in zip(current['counts'], value['counts'])]
+                    current['sum'] += value['sum']
+                    current['count'] += value['count']
+                elif name.endswith('_timestamp_seconds'):
+                    samples[key] = max(current, value)
+                else:
+                    samples[key] = current + value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_snapshot(merged):
+    """Format d'exposition texte de Prometheus (version 0.0.4)"""
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        help_text = metric['help'].replace('\\', r'\\').replace('\n', r'\n')
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric['labels']
+        for values, value in sorted(metric['samples'].items()):
+            if metric['type'] == 'histogram':
+                cumulative = 0
+                bounds = list(metric['buckets']) + [float('inf')]
+                for bound, count in zip(bounds, value['counts']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(names, values, ('le', _number(bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, values)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_labels(names, values)} {value['count']}")
+            else:
+                lines.append(f"{name}{_labels(names, values)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Registre du processus
+REGISTRY = MetricsRegistry()
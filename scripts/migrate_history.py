@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Migration unique des fichiers quotidiens existants vers l'historique Parquet
+Lit les fichiers data/processed/{stocks,bonds,indices}_YYYY-MM-DD.csv et, pour
+les journées sans CSV, les fichiers bruts data/raw/*_YYYY-MM-DD.json (compressés
+ou non), puis compacte chaque mois migré. L'option --compact-only permet
+aussi de lancer la compaction périodique des partitions quotidiennes.
+"""
+
+import os
+import re
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from history_store import HistoryStore, SCHEMAS
+from raw_store import read_json
+
+logger = logging.getLogger("brvm_migration")
+
+DATA_DIR = Path(os.environ.get("BRVM_DATA_DIR") or Path(__file__).resolve().parent.parent / "data")
+FILE_PATTERN = re.compile(r"^(stocks|bonds|indices)_(\d{4}-\d{2}-\d{2})\.(csv|json(?:\.gz|\.zst)?)$")
+
+
+def parse_arguments():
+    """Parse les arguments de ligne de commande"""
+    parser = argparse.ArgumentParser(description="Migration des fichiers quotidiens vers l'historique Parquet")
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR,
+                        help='Répertoire de données contenant raw/ et processed/')
+    parser.add_argument('--history-dir', type=Path, default=None,
+                        help="Répertoire de l'historique (par défaut: <data-dir>/history)")
+    parser.add_argument('--no-compact', action='store_true',
+                        help='Ne pas compacter les mois migrés')
+    parser.add_argument('--compact-only', action='store_true',
+                        help="Compacter les partitions quotidiennes de l'historique sans migration")
+    return parser.parse_args()
+
+
+def read_daily_file(path, dataset):
+    """Charge un fichier quotidien (CSV traité ou JSON brut) en liste d'enregistrements"""
+    if path.suffix == '.csv':
+        return pd.read_csv(path).to_dict(orient='records')
+
+    data = read_json(path)
+
+    # Les indices bruts sont un dictionnaire {nom: {value, change_percent}}
+    if dataset == 'indices' and isinstance(data, dict):
+        return [{'name': name, **values} for name, values in data.items()]
+    return data
+
+
+def collect_files(data_dir):
+    """Retourne {(dataset, date): chemin}, en privilégiant les CSV traités sur le JSON brut"""
+    files = {}
+    for directory in (data_dir / "raw", data_dir / "processed"):
+        if not directory.exists():
+            continue
+        for path in sorted(directory.iterdir()):
+            match = FILE_PATTERN.match(path.name)
+            if match:
+                dataset, date, _ = match.groups()
+                # processed/ est parcouru en dernier et remplace donc le JSON brut
+                files[(dataset, date)] = path
+    return files
+
+
+def migrate(data_dir, history_dir=None, compact=True):
+    """Migre tous les fichiers quotidiens et retourne le nombre de journées importées"""
+    store = HistoryStore(history_dir or data_dir / "history")
+    files = collect_files(data_dir)
+    touched = {name: set() for name in SCHEMAS}
+
+    for (dataset, date), path in sorted(files.items()):
+        try:
+            records = read_daily_file(path, dataset)
+            store.append(dataset, records, date)
+            touched[dataset].add(date[:7])
+        except Exception as e:
+            logger.error(f"Erreur lors de la migration de {path}: {e}")
+
+    if compact:
+        for dataset, months in touched.items():
+            if months:
+                store.compact(dataset, sorted(months))
+
+    logger.info(f"Migration terminée: {len(files)} fichiers quotidiens traités")
+    return len(files)
+
+
+def main():
+    """Fonction principale"""
+    args = parse_arguments()
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+    
+    if args.compact_only:
+        store = HistoryStore(args.history_dir or args.data_dir / "history")
+        months = store.compact()
+        store.rebuild_index()
+        logger.info(f"Compaction terminée: {months} mois fusionnés")
+    else:
+        migrate(args.data_dir, args.history_dir, compact=not args.no_compact)
+
+
+if __name__ == "__main__":
+    main()
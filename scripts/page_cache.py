@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache disque des pages brutes téléchargées par le scraper BRVM
+Pour chaque URL, le cache conserve le dernier corps reçu, ses en-têtes de
+validation (ETag, Last-Modified) et l'empreinte du contenu, ainsi que,
+pour chaque date de collecte, l'empreinte de la dernière version
+effectivement analysée et sauvegardée. Les collectes suivantes envoient des
+requêtes conditionnelles et sautent l'analyse lorsque la page n'a pas
+changé depuis la dernière sauvegarde de la même date : une page inchangée
+est encore sauvegardée une fois pour chaque nouvelle date.
+"""
+
+import os
+import json
+import hashlib
+import datetime
+from pathlib import Path
+
+# Dates de collecte dont le marqueur « déjà traité » est conservé
+PROCESSED_DATES = 7
+
+
+def content_hash(text):
+    """Empreinte SHA-256 d'un contenu texte"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _write_atomic(path, data):
+    """Écrit un fichier via un fichier temporaire puis un remplacement atomique"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PageCache:
+    """Cache des réponses HTTP indexé par URL"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.html"
+
+    def _meta(self, url):
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url):
+        """En-têtes If-None-Match / If-Modified-Since à envoyer pour cette URL"""
+        meta = self._meta(url)
+        _, body_path = self._paths(url)
+        if meta is None or not body_path.exists():
+            return {}
+
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def load(self, url):
+        """Retourne le dernier corps reçu pour cette URL, ou None"""
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url, body, headers):
+        """Enregistre une nouvelle réponse (corps et en-têtes de validation)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        previous = self._meta(url) or {}
+
+        digest = content_hash(body)
+        if digest != previous.get('content_hash') or not body_path.exists():
+            _write_atomic(body_path, body)
+
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_hash': digest,
+            'processed': previous.get('processed') or {},
+            'fetched_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+        _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False))
+        return digest
+
+    def is_processed(self, url, date):
+        """Indique si la dernière version reçue a déjà été analysée et sauvegardée pour cette date"""
+        meta = self._meta(url)
+        return bool(meta) and meta.get('content_hash') is not None \
+            and meta.get('content_hash') == (meta.get('processed') or {}).get(date)
+
+    def mark_processed(self, url, date):
+        """Marque la dernière version reçue comme analysée et sauvegardée pour cette date"""
+        meta = self._meta(url)
+        if meta is None:
+            return
+        processed = dict(meta.get('processed') or {}, **{date: meta.get('content_hash')})
+        # Seules les dernières dates sont utiles : le fichier ne grossit pas indéfiniment
+        meta['processed'] = {d: processed[d] for d in sorted(processed)[-PROCESSED_DATES:]}
+        meta_path, _ = self._paths(url)
+        _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False))
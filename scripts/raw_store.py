@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fichiers bruts (JSON) des instantanés collectés par le scraper BRVM
+
+    data/raw/<dataset>_YYYY-MM-DD.json[.gz|.zst]          (dernier instantané du jour)
+    data/raw/intraday/<dataset>_YYYY-MM-DD.jsonl.gz|.zst   (journal des instantanés du jour)
+
+Les instantanés sont encodés en JSON compact, éventuellement compressés
+(gzip, ou zstd si le paquet zstandard est installé), et écrits via un
+fichier temporaire puis un remplacement atomique : l'API ne lit jamais un
+fichier à moitié écrit. L'empreinte SHA-256 du JSON encodé est comparée à
+celle du fichier existant : un instantané inchangé n'est pas réécrit.
+
+En mode intraday, chaque instantané différent du précédent est en plus
+ajouté, horodaté, au journal compressé du jour (un membre gzip ou une
+trame zstd par ajout, gzip si les instantanés ne sont pas compressés), ce
+qui conserve l'évolution de la séance au lieu de la seule dernière
+version. Un ajout interrompu laisse un dernier membre tronqué : les
+lecteurs l'ignorent, et l'écrivain le retire avant l'ajout suivant.
+"""
+
+import os
+import gzip
+import json
+import zlib
+import hashlib
+import logging
+import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # zstandard est optionnel : gzip reste disponible
+    zstandard = None
+
+logger = logging.getLogger("brvm_raw_store")
+
+# Compression -> extension ajoutée au nom du fichier
+COMPRESSIONS = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+INTRADAY_DIR = "intraday"
+ZSTD_LEVEL = 3
+
+# Erreurs d'un fichier compressé illisible ou tronqué
+_DECODE_ERRORS = (EOFError, OSError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+def default_compression():
+    """Compression configurée (BRVM_RAW_COMPRESSION), gzip si zstandard est absent"""
+    compression = os.environ.get("BRVM_RAW_COMPRESSION", "none").lower()
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compression inconnue: {compression} (attendu: {', '.join(COMPRESSIONS)})")
+    if compression == 'zstd' and zstandard is None:
+        logger.warning("zstandard n'est pas installé, compression gzip utilisée")
+        return 'gzip'
+    return compression
+
+
+def encode(data):
+    """Encodage JSON compact (UTF-8) d'un instantané"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def content_hash(payload):
+    """Empreinte SHA-256 d'un instantané encodé"""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def compress(payload, compression):
+    """Compresse des octets ; gzip sans date d'écriture pour un résultat reproductible"""
+    if compression == 'gzip':
+        return gzip.compress(payload, compresslevel=6, mtime=0)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return payload
+
+
+def _compression_of(path):
+    name = Path(path).name
+    if name.endswith('.gz'):
+        return 'gzip'
+    if name.endswith('.zst'):
+        return 'zstd'
+    return 'none'
+
+
+def decompress(data, compression):
+    """Décompresse des octets (membres gzip ou trames zstd concaténés compris)"""
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Le paquet zstandard est nécessaire pour lire les fichiers .zst")
+        reader = zstandard.ZstdDecompressor().stream_reader(data, read_across_frames=True)
+        return reader.read()
+    return data
+
+
+def read_bytes(path):
+    """Contenu décompressé d'un fichier brut, selon son extension"""
+    with open(path, 'rb') as f:
+        return decompress(f.read(), _compression_of(path))
+
+
+def read_json(path):
+    """Charge un fichier JSON brut, compressé ou non"""
+    return json.loads(read_bytes(path))
+
+
+def _write_atomic(path, data):
+    """Écrit un fichier via un fichier temporaire puis un remplacement atomique"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _complete_members(data, compression):
+    """
+    Contenu des membres gzip, trames zstd ou lignes complets d'un journal
+    et longueur en octets de cette partie complète (un dernier ajout
+    interrompu laisse un membre, une trame ou une ligne tronqué)
+    """
+    if compression == 'none':
+        end = data.rfind(b'\n') + 1
+        return data[:end], end
+    if compression == 'zstd' and zstandard is None:
+        raise RuntimeError("Le paquet zstandard est nécessaire pour lire les fichiers .zst")
+
+    output = []
+    consumed = 0
+    while consumed < len(data):
+        if compression == 'gzip':
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+        try:
+            chunk = decompressor.decompress(data[consumed:])
+        except _DECODE_ERRORS:
+            break
+        if not decompressor.eof:
+            break
+        output.append(chunk)
+        consumed = len(data) - len(decompressor.unused_data)
+    return b''.join(output), consumed
+
+
+class RawStore:
+    """Écriture des instantanés bruts d'un répertoire (un écrivain : le scraper)"""
+
+    def __init__(self, root, compression=None, intraday=False):
+        self.root = Path(root)
+        self.compression = compression or default_compression()
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"Compression inconnue: {self.compression}")
+        self.intraday = intraday
+        # Le journal intraday est toujours compressé (gzip si les instantanés ne le sont pas)
+        self.journal_compression = 'gzip' if self.compression == 'none' else self.compression
+        # Empreintes connues : chemin -> (stat du fichier, empreinte du contenu)
+        self._digests = {}
+        # Dernière empreinte ajoutée à chaque journal intraday
+        self._journal_digests = {}
+        # Taille de chaque journal après notre dernier ajout complet
+        self._journal_sizes = {}
+
+    def path(self, dataset, date):
+        """Fichier du dernier instantané d'une journée"""
+        return self.root / f"{dataset}_{date}.json{COMPRESSIONS[self.compression]}"
+
+    def journal_path(self, dataset, date):
+        """Journal intraday d'une journée"""
+        return self.root / INTRADAY_DIR / f"{dataset}_{date}.jsonl{COMPRESSIONS[self.journal_compression]}"
+
+    def _variants(self, dataset, date):
+        """Fichiers de la journée dans les autres compressions (configuration modifiée)"""
+        current = self.path(dataset, date)
+        paths = [self.root / f"{dataset}_{date}.json{ext}" for ext in COMPRESSIONS.values()]
+        return [path for path in paths if path != current]
+
+    def stored_hash(self, path):
+        """Empreinte du contenu d'un fichier existant (relu seulement s'il a changé), ou None"""
+        key = _stat_key(path)
+        if key is None:
+            return None
+        cached = self._digests.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        try:
+            digest = content_hash(read_bytes(path))
+        except _DECODE_ERRORS + (RuntimeError,):
+            return None
+        self._digests[path] = (key, digest)
+        return digest
+
+    def write(self, dataset, date, data):
+        """
+        Enregistre l'instantané d'une journée ; retourne False s'il est
+        identique au fichier existant (aucune écriture)
+        """
+        payload = encode(data)
+        digest = content_hash(payload)
+        path = self.path(dataset, date)
+
+        if self.intraday:
+            self.append_journal(dataset, date, payload, digest)
+
+        if self.stored_hash(path) == digest:
+            return False
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, compress(payload, self.compression))
+        self._digests[path] = (_stat_key(path), digest)
+        for variant in self._variants(dataset, date):
+            variant.unlink(missing_ok=True)
+        return True
+
+    def _last_journal_hash(self, path):
+        cached = self._journal_digests.get(path)
+        if cached is not None:
+            return cached
+        last = None
+        for entry in self._read_journal(path):
+            last = entry.get('sha256')
+        self._journal_digests[path] = last
+        return last
+
+    def append_journal(self, dataset, date, payload, digest=None):
+        """
+        Ajoute un instantané encodé, horodaté, au journal intraday du jour
+        s'il diffère du dernier ajouté ; retourne True si le journal a été complété
+        """
+        digest = digest or content_hash(payload)
+        path = self.journal_path(dataset, date)
+        if self._last_journal_hash(path) == digest:
+            return False
+
+        timestamp = datetime.datetime.now().isoformat(timespec='seconds')
+        line = b'{"ts":"' + timestamp.encode() + b'","sha256":"' + digest.encode() + b'","data":' + payload + b'}\n'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._repair_journal(path)
+        # Un membre (gzip) ou une trame (zstd) complet par ajout, écrit en une fois
+        with open(path, 'ab') as f:
+            f.write(compress(line, self.journal_compression))
+            self._journal_sizes[path] = f.tell()
+        self._journal_digests[path] = digest
+        return True
+
+    def _repair_journal(self, path):
+        """
+        Tronque le journal à la fin de son dernier membre complet (ajout
+        interrompu) : sans cela, les ajouts suivants seraient illisibles
+        """
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return
+        if self._journal_sizes.get(path) == size:
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, complete = _complete_members(data, _compression_of(path))
+        if complete < size:
+            logger.warning(f"Journal {path} tronqué à {complete} octets (dernier ajout incomplet)")
+            with open(path, 'r+b') as f:
+                f.truncate(complete)
+        self._journal_sizes[path] = complete
+
+    def _read_journal(self, path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return []
+        # Dernier ajout interrompu : seuls les membres complets sont lus
+        text, _ = _complete_members(data, _compression_of(path))
+        entries = []
+        for line in text.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def journal(self, dataset, date):
+        """Instantanés du journal intraday d'une journée : liste de {ts, sha256, data}"""
+        return self._read_journal(self.journal_path(dataset, date))
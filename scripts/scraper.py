@@ -9,70 +9,360 @@ pour une utilisation ultérieure.
 
 import os
 import sys
+import csv
 import time
 import json
 import logging
 import datetime
+import threading
+import functools
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import pymongo
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from html_parser import extract_table_rows, extract_texts
+from page_cache import PageCache
+from raw_store import RawStore
+from metrics import REGISTRY, write_snapshot
+
 logger = logging.getLogger("brvm_scraper")
 
-# Configuration des URLs
-BASE_URL = "https://www.brvm.org"
+# Configuration des URLs (BRVM_BASE_URL pour interroger un miroir ou un serveur local)
+BASE_URL = os.environ.get("BRVM_BASE_URL", "https://www.brvm.org").rstrip('/')
 MARKET_STATUS_URL = f"{BASE_URL}/fr/marche/status"
 INDICES_URL = f"{BASE_URL}/fr/indices/historique"
 STOCK_LIST_URL = f"{BASE_URL}/fr/cours-actions/liste"
 BONDS_URL = f"{BASE_URL}/fr/cours-obligations/liste"
 
-# Création des répertoires nécessaires
-DATA_DIR = Path("../data")
-DATA_DIR.mkdir(exist_ok=True)
-(DATA_DIR / "raw").mkdir(exist_ok=True)
-(DATA_DIR / "processed").mkdir(exist_ok=True)
+# Pages collectées à chaque exécution, dans l'ordre de sauvegarde
+PAGES = {
+    'market_status': MARKET_STATUS_URL,
+    'indices': INDICES_URL,
+    'stocks': STOCK_LIST_URL,
+    'bonds': BONDS_URL,
+}
+
+# Clé unique de chaque collection MongoDB (un document par clé et par date)
+DB_KEYS = {
+    'market_status': ('date',),
+    'indices': ('name', 'date'),
+    'stocks': ('symbol', 'date'),
+    'bonds': ('symbol', 'date'),
+}
+
+# Téléchargements simultanés (total et par hôte)
+MAX_WORKERS = 4
+MAX_PER_HOST = 4
+
+# Répertoire des données, indépendant du répertoire courant pour écrire là où
+# l'API lit les données (BRVM_DATA_DIR pour un autre emplacement)
+DATA_DIR = Path(os.environ.get("BRVM_DATA_DIR") or Path(__file__).resolve().parent.parent / "data")
+
+# Bilans des collectes et métriques exposées par l'endpoint /metrics de l'API
+METRICS_DIR = Path(os.environ.get("BRVM_METRICS_DIR") or DATA_DIR / "metrics")
+
+# Seaux des durées d'étapes (secondes) : de l'analyse d'une page aux tentatives réseau
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'brvm_scraper_stage_duration_seconds',
+    "Durée des étapes d'une collecte (fetch, parse, save_file, save_db, csv, history)",
+    ('stage', 'dataset'), buckets=STAGE_BUCKETS)
+RUN_SECONDS = REGISTRY.histogram(
+    'brvm_scraper_run_duration_seconds', "Durée totale d'une collecte", buckets=STAGE_BUCKETS)
+PAGES_TOTAL = REGISTRY.counter(
+    'brvm_scraper_pages_total', 'Pages demandées par résultat (fetched, not_modified, error)',
+    ('dataset', 'result'))
+ROWS_TOTAL = REGISTRY.counter(
+    'brvm_scraper_rows_total', 'Lignes analysées par jeu de données', ('dataset',))
+LAST_RUN = REGISTRY.gauge(
+    'brvm_scraper_last_run_timestamp_seconds', 'Horodatage de la fin de la dernière collecte')
+
+# Jeu de données de chaque URL collectée (étiquette des métriques)
+PAGE_NAMES = {url: name for name, url in PAGES.items()}
+
+
+def timed_stage(stage, dataset=None):
+    """
+    Décorateur chronométrant une étape de la collecte ; sans `dataset`, le
+    jeu de données est le deuxième argument de la méthode (nom du fichier ou
+    de la collection)
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                name = dataset or (args[1] if len(args) > 1 else 'all')
+                self.record_stage(stage, name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def configure_logging(log_file="scraper.log"):
+    """Configuration du logging des exécutions en ligne de commande (fichier et console)"""
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+
+def write_csv(path, records):
+    """
+    Écrit des enregistrements dans un fichier CSV (colonnes dans l'ordre
+    d'apparition des champs, valeurs manquantes vides), sans pandas, via un
+    fichier temporaire puis un remplacement atomique
+    """
+    fieldnames = list(dict.fromkeys(field for record in records for field in record))
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(records)
+    os.replace(tmp_path, path)
+
+
+def parse_float(text):
+    """Convertit une chaîne de caractères en nombre à virgule flottante (None si invalide)"""
+    try:
+        return float(text.replace(' ', '').replace(',', '.').replace('%', ''))
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_int(text):
+    """Convertit une chaîne de caractères en nombre entier (None si invalide)"""
+    try:
+        return int(text.replace(' ', '').replace(',', ''))
+    except (ValueError, AttributeError):
+        return None
+
+
+# Analyse des pages, sans état : utilisable sans scraper (ingestion en masse) ;
+# les erreurs sont propagées, les méthodes parse_* du scraper les journalisent
+
+def index_values(html):
+    """Indices d'une page : {nom: {'value', 'change_percent'}}"""
+    indices_data = {}
+    for cells in extract_table_rows(html, 'indices-table'):
+        if len(cells) >= 3:
+            index_name = cells[0]
+            index_value = cells[1].replace(' ', '').replace(',', '.')
+            index_change = cells[2].replace(' ', '').replace(',', '.')
+            
+            # Nettoyage et conversion
+            try:
+                index_value = float(index_value)
+                index_change = float(index_change.rstrip('%'))
+            except ValueError:
+                pass
+            
+            indices_data[index_name] = {
+                'value': index_value,
+                'change_percent': index_change
+            }
+    return indices_data
+
+
+def indices_to_records(indices, date):
+    """Convertit le dictionnaire des indices en liste d'enregistrements datés"""
+    return [
+        {
+            'name': name,
+            'value': data['value'],
+            'change_percent': data['change_percent'],
+            'date': date
+        }
+        for name, data in indices.items()
+    ]
+
+
+def stock_records(html, date):
+    """Actions cotées d'une page et leurs cours, datés de `date`"""
+    stocks_data = []
+    for cells in extract_table_rows(html, 'stocks-table'):
+        if len(cells) >= 7:
+            stocks_data.append({
+                'symbol': cells[0],
+                'name': cells[1],
+                'isin': cells[2] if len(cells) > 2 else None,
+                'last_price': parse_float(cells[3]),
+                'change': parse_float(cells[4]),
+                'high': parse_float(cells[5]),
+                'low': parse_float(cells[6]),
+                'volume': parse_int(cells[7]) if len(cells) > 7 else None,
+                'date': date
+            })
+    return stocks_data
+
+
+def bond_records(html, date):
+    """Obligations d'une page et leurs cours, datées de `date`"""
+    bonds_data = []
+    for cells in extract_table_rows(html, 'bonds-table'):
+        if len(cells) >= 6:
+            bonds_data.append({
+                'symbol': cells[0],
+                'name': cells[1],
+                'isin': cells[2] if len(cells) > 2 else None,
+                'last_price': parse_float(cells[3]),
+                'change': parse_float(cells[4]),
+                'yield': parse_float(cells[5]),
+                'maturity_date': cells[6] if len(cells) > 6 else None,
+                'date': date
+            })
+    return bonds_data
+
 
 class BRVMScraper:
     """Classe principale pour la collecte des données de la BRVM"""
     
-    def __init__(self, use_db=False, db_uri=None):
+    def __init__(self, use_db=False, db_uri=None, concurrent=True,
+                 max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST, use_cache=True,
+                 compression=None, intraday=None, ticks=True):
         """Initialise le scraper"""
+        # Création des répertoires nécessaires
+        (DATA_DIR / "raw").mkdir(parents=True, exist_ok=True)
+        (DATA_DIR / "processed").mkdir(exist_ok=True)
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         })
         
+        # Pool de connexions partagé, dimensionné pour les téléchargements simultanés
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Téléchargement simultané des pages, limité par hôte
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # Cache des pages brutes : requêtes conditionnelles et pages inchangées ignorées
+        self.page_cache = PageCache(DATA_DIR / "cache" / "pages") if use_cache else None
+        
+        # Instantanés bruts : écriture atomique, compression (BRVM_RAW_COMPRESSION),
+        # instantané inchangé non réécrit, journal de la séance en mode intraday
+        if intraday is None:
+            intraday = os.environ.get("BRVM_RAW_INTRADAY") == "1"
+        self.raw_store = RawStore(DATA_DIR / "raw", compression=compression, intraday=intraday)
+        
         # Configuration de la base de données MongoDB (optionnel)
         self.use_db = use_db
         if use_db and db_uri:
+            # pymongo n'est importé que pour une collecte vers MongoDB
+            import pymongo
             self.client = pymongo.MongoClient(db_uri)
             self.db = self.client.brvm_data
             logger.info("Connexion à MongoDB établie")
+            self.ensure_indexes()
+        
+        # Dernier état persisté par collection, pour n'écrire que les lignes modifiées
+        self._persisted = {}
+        self.db_stats = {}
+        
+        # Historique colonnaire (Parquet) alimenté à chaque collecte, ouvert au premier ajout
+        self._history = None
+        
+        # Journaux intraday binaires des cotations (un par jeu de données)
+        self.use_ticks = ticks
+        self._tick_journals = {}
+        
+        # Durées des étapes et résultat des pages de la collecte en cours
+        self.timings = {}
+        self.page_results = {}
+        self._timings_lock = threading.Lock()
         
         # Date d'aujourd'hui au format YYYY-MM-DD
-        self.today = datetime.datetime.now().strftime("%Y-%m-%d")
-        logger.info(f"Initialisation du scraper pour la date: {self.today}")
+        self.set_date()
+    
+    def set_date(self, date=None):
+        """
+        Définit la date des données collectées (aujourd'hui par défaut), pour
+        réutiliser le même scraper d'une collecte à l'autre
+        """
+        self.today = date or datetime.datetime.now().strftime("%Y-%m-%d")
+        logger.info(f"Date de collecte du scraper: {self.today}")
+    
+    @property
+    def history(self):
+        """Stockage historique Parquet (pyarrow importé au premier accès)"""
+        if self._history is None:
+            from history_store import HistoryStore
+            self._history = HistoryStore(DATA_DIR / "history")
+        return self._history
+    
+    def tick_journal(self, dataset):
+        """Journal intraday d'un jeu de données (NumPy importé au premier accès)"""
+        journal = self._tick_journals.get(dataset)
+        if journal is None:
+            from tick_journal import TickJournal
+            journal = self._tick_journals[dataset] = TickJournal(DATA_DIR / "ticks" / dataset)
+        return journal
+    
+    def record_stage(self, stage, dataset, elapsed):
+        """Enregistre la durée d'une étape (histogramme et bilan de la collecte en cours)"""
+        STAGE_SECONDS.observe(elapsed, stage=stage, dataset=dataset)
+        with self._timings_lock:
+            stages = self.timings.setdefault(stage, {})
+            stages[dataset] = stages.get(dataset, 0.0) + elapsed
+    
+    def _host_slot(self, url):
+        """Sémaphore limitant le nombre de requêtes simultanées vers un même hôte"""
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._host_slots[host] = slot
+            return slot
     
     def get_page(self, url):
         """Récupère une page web avec gestion des erreurs et des tentatives"""
+        dataset = PAGE_NAMES.get(url, 'other')
+        start = time.perf_counter()
+        html, result = self._download(url)
+        self.record_stage('fetch', dataset, time.perf_counter() - start)
+        PAGES_TOTAL.inc(dataset=dataset, result=result)
+        self.page_results[dataset] = result
+        return html
+    
+    def _download(self, url):
+        """Téléchargement avec tentatives ; retourne (html ou None, résultat)"""
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 logger.info(f"Récupération de la page: {url}")
-                response = self.session.get(url, timeout=30)
+                headers = self.page_cache.conditional_headers(url) if self.page_cache else {}
+                
+                # Le créneau de l'hôte n'est tenu que pendant la requête, pas pendant l'attente
+                with self._host_slot(url):
+                    response = self.session.get(url, timeout=30, headers=headers)
+                
+                if response.status_code == 304:
+                    cached = self.page_cache.load(url)
+                    if cached is not None:
+                        logger.info(f"Page inchangée (304): {url}")
+                        return cached, 'not_modified'
+                    # Corps absent du cache : nouvelle requête sans condition
+                    response = self.session.get(url, timeout=30)
+                
                 response.raise_for_status()
-                return response.text
+                if self.page_cache:
+                    self.page_cache.store(url, response.text, response.headers)
+                return response.text, 'fetched'
             except requests.exceptions.RequestException as e:
                 logger.error(f"Erreur lors de la récupération de {url}: {e}")
                 if attempt < max_retries - 1:
@@ -81,28 +371,29 @@ class BRVMScraper:
                     time.sleep(wait_time)
                 else:
                     logger.error(f"Échec après {max_retries} tentatives")
-                    return None
+                    return None, 'error'
     
-    def parse_market_status(self):
+    @timed_stage('parse', 'market_status')
+    def parse_market_status(self, html=None):
         """Récupère le statut du marché (ouvert/fermé, dernière mise à jour)"""
-        html = self.get_page(MARKET_STATUS_URL)
+        if html is None:
+            html = self.get_page(MARKET_STATUS_URL)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
         status_data = {}
         
         try:
+            texts = extract_texts(html, ('market-status', 'market-date'))
+            
             # Statut du marché
-            status_elem = soup.select_one('.market-status')
-            if status_elem:
-                status_text = status_elem.text.strip()
+            status_text = texts['market-status']
+            if status_text is not None:
                 status_data['market_status'] = 'open' if 'ouvert' in status_text.lower() else 'closed'
             
             # Date de la dernière mise à jour
-            update_elem = soup.select_one('.market-date')
-            if update_elem:
-                status_data['last_update'] = update_elem.text.strip()
+            if texts['market-date'] is not None:
+                status_data['last_update'] = texts['market-date']
             
             logger.info(f"Statut du marché récupéré: {status_data}")
             return status_data
@@ -111,38 +402,17 @@ class BRVMScraper:
             logger.error(f"Erreur lors de l'analyse du statut du marché: {e}")
             return None
     
-    def parse_indices(self):
+    @timed_stage('parse', 'indices')
+    def parse_indices(self, html=None):
         """Récupère les indices boursiers (BRVM Composite, BRVM 10, etc.)"""
-        html = self.get_page(INDICES_URL)
+        if html is None:
+            html = self.get_page(INDICES_URL)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
-        indices_data = {}
-        
         try:
             # Tableau des indices
-            indices_table = soup.select_one('table.indices-table')
-            if indices_table:
-                rows = indices_table.select('tbody tr')
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) >= 3:
-                        index_name = cells[0].text.strip()
-                        index_value = cells[1].text.strip().replace(' ', '').replace(',', '.')
-                        index_change = cells[2].text.strip().replace(' ', '').replace(',', '.')
-                        
-                        # Nettoyage et conversion
-                        try:
-                            index_value = float(index_value)
-                            index_change = float(index_change.rstrip('%'))
-                        except ValueError:
-                            pass
-                        
-                        indices_data[index_name] = {
-                            'value': index_value,
-                            'change_percent': index_change
-                        }
+            indices_data = index_values(html)
             
             logger.info(f"Indices récupérés: {list(indices_data.keys())}")
             return indices_data
@@ -151,35 +421,17 @@ class BRVMScraper:
             logger.error(f"Erreur lors de l'analyse des indices: {e}")
             return None
     
-    def parse_stocks(self):
+    @timed_stage('parse', 'stocks')
+    def parse_stocks(self, html=None):
         """Récupère la liste des actions cotées et leurs cours"""
-        html = self.get_page(STOCK_LIST_URL)
+        if html is None:
+            html = self.get_page(STOCK_LIST_URL)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
-        stocks_data = []
-        
         try:
             # Tableau des actions
-            stocks_table = soup.select_one('table.stocks-table')
-            if stocks_table:
-                rows = stocks_table.select('tbody tr')
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) >= 7:
-                        stock = {
-                            'symbol': cells[0].text.strip(),
-                            'name': cells[1].text.strip(),
-                            'isin': cells[2].text.strip() if len(cells) > 2 else None,
-                            'last_price': self._parse_float(cells[3].text.strip()),
-                            'change': self._parse_float(cells[4].text.strip()),
-                            'high': self._parse_float(cells[5].text.strip()),
-                            'low': self._parse_float(cells[6].text.strip()),
-                            'volume': self._parse_int(cells[7].text.strip()) if len(cells) > 7 else None,
-                            'date': self.today
-                        }
-                        stocks_data.append(stock)
+            stocks_data = stock_records(html, self.today)
             
             logger.info(f"Actions récupérées: {len(stocks_data)}")
             return stocks_data
@@ -188,34 +440,17 @@ class BRVMScraper:
             logger.error(f"Erreur lors de l'analyse des actions: {e}")
             return None
     
-    def parse_bonds(self):
+    @timed_stage('parse', 'bonds')
+    def parse_bonds(self, html=None):
         """Récupère la liste des obligations et leurs cours"""
-        html = self.get_page(BONDS_URL)
+        if html is None:
+            html = self.get_page(BONDS_URL)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
-        bonds_data = []
-        
         try:
             # Tableau des obligations
-            bonds_table = soup.select_one('table.bonds-table')
-            if bonds_table:
-                rows = bonds_table.select('tbody tr')
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) >= 6:
-                        bond = {
-                            'symbol': cells[0].text.strip(),
-                            'name': cells[1].text.strip(),
-                            'isin': cells[2].text.strip() if len(cells) > 2 else None,
-                            'last_price': self._parse_float(cells[3].text.strip()),
-                            'change': self._parse_float(cells[4].text.strip()),
-                            'yield': self._parse_float(cells[5].text.strip()),
-                            'maturity_date': cells[6].text.strip() if len(cells) > 6 else None,
-                            'date': self.today
-                        }
-                        bonds_data.append(bond)
+            bonds_data = bond_records(html, self.today)
             
             logger.info(f"Obligations récupérées: {len(bonds_data)}")
             return bonds_data
@@ -226,130 +461,313 @@ class BRVMScraper:
     
     def _parse_float(self, text):
         """Convertit une chaîne de caractères en nombre à virgule flottante"""
-        try:
-            return float(text.replace(' ', '').replace(',', '.').replace('%', ''))
-        except (ValueError, AttributeError):
-            return None
+        return parse_float(text)
     
     def _parse_int(self, text):
         """Convertit une chaîne de caractères en nombre entier"""
-        try:
-            return int(text.replace(' ', '').replace(',', ''))
-        except (ValueError, AttributeError):
-            return None
+        return parse_int(text)
     
+    @timed_stage('save_file')
     def save_to_file(self, data, filename):
-        """Sauvegarde les données dans un fichier JSON"""
-        file_path = DATA_DIR / "raw" / f"{filename}_{self.today}.json"
+        """Sauvegarde les données dans un fichier JSON (aucune écriture si elles sont inchangées)"""
+        file_path = self.raw_store.path(filename, self.today)
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Données sauvegardées dans {file_path}")
+            if self.raw_store.write(filename, self.today, data):
+                logger.info(f"Données sauvegardées dans {file_path}")
+            else:
+                logger.info(f"Données inchangées, {file_path} conservé")
             return True
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde dans {file_path}: {e}")
             return False
     
+    def ensure_indexes(self):
+        """Crée les index uniques (clé, date) des collections, une fois au démarrage"""
+        import pymongo
+        
+        for collection_name, keys in DB_KEYS.items():
+            self.db[collection_name].create_index(
+                [(key, pymongo.ASCENDING) for key in keys],
+                unique=True,
+                name="_".join(keys) + "_unique"
+            )
+        logger.info("Index MongoDB vérifiés")
+    
+    def _to_documents(self, data, collection_name):
+        """Convertit les données collectées en documents (un par clé et par date)"""
+        if collection_name == 'indices' and isinstance(data, dict):
+            return self._indices_to_records(data)
+        if isinstance(data, list):
+            return [dict(doc, date=doc.get('date') or self.today) for doc in data]
+        # Ajout de la date d'aujourd'hui
+        data['date'] = self.today
+        return [dict(data)]
+    
+    def _persisted_snapshot(self, collection_name):
+        """Documents du jour déjà en base, indexés par clé (chargés une fois par date)"""
+        cached = self._persisted.get(collection_name)
+        if cached is not None and cached[0] == self.today:
+            return cached[1]
+        
+        keys = DB_KEYS[collection_name]
+        snapshot = {}
+        for doc in self.db[collection_name].find({'date': self.today}, {'_id': 0, 'updated_at': 0}):
+            snapshot[tuple(doc.get(key) for key in keys)] = doc
+        self._persisted[collection_name] = (self.today, snapshot)
+        return snapshot
+    
+    def compute_delta(self, documents, collection_name):
+        """Retourne les documents nouveaux ou modifiés par rapport au dernier état persisté"""
+        keys = DB_KEYS[collection_name]
+        persisted = self._persisted_snapshot(collection_name)
+        return [
+            doc for doc in documents
+            if persisted.get(tuple(doc.get(key) for key in keys)) != doc
+        ]
+    
+    @timed_stage('save_db')
     def save_to_database(self, data, collection_name):
-        """Sauvegarde les données dans MongoDB"""
+        """
+        Sauvegarde dans MongoDB les seules lignes nouvelles ou modifiées, par
+        upserts groupés sur la clé unique (symbole, date)
+        """
         if not self.use_db:
             logger.warning("La base de données n'est pas configurée")
             return False
         
+        from pymongo import UpdateOne
+        
         try:
             collection = self.db[collection_name]
+            keys = DB_KEYS[collection_name]
+            documents = self._to_documents(data, collection_name)
+            changed = self.compute_delta(documents, collection_name)
             
-            # Si c'est une liste, insertion multiple
-            if isinstance(data, list):
-                result = collection.insert_many(data)
-                logger.info(f"{len(result.inserted_ids)} documents insérés dans {collection_name}")
-            else:
-                # Ajout de la date d'aujourd'hui
-                data['date'] = self.today
-                result = collection.insert_one(data)
-                logger.info(f"Document inséré dans {collection_name} avec ID: {result.inserted_id}")
+            stats = {'inserted': 0, 'modified': 0, 'unchanged': len(documents) - len(changed)}
             
+            if changed:
+                now = datetime.datetime.now(datetime.timezone.utc)
+                operations = [
+                    UpdateOne(
+                        {key: doc.get(key) for key in keys},
+                        {'$set': dict(doc, updated_at=now)},
+                        upsert=True
+                    )
+                    for doc in changed
+                ]
+                result = collection.bulk_write(operations, ordered=False)
+                stats['inserted'] = result.upserted_count
+                stats['modified'] = result.modified_count
+                
+                # Nouvelle version de la collection, lue par l'API pour invalider son cache
+                self.db.meta.update_one(
+                    {'_id': collection_name},
+                    {'$inc': {'version': 1}, '$set': {'updated_at': now}},
+                    upsert=True
+                )
+                
+                persisted = self._persisted_snapshot(collection_name)
+                for doc in changed:
+                    persisted[tuple(doc.get(key) for key in keys)] = doc
+            
+            self.db_stats[collection_name] = stats
+            logger.info(f"MongoDB {collection_name}: {stats['inserted']} insérés, "
+                        f"{stats['modified']} modifiés, {stats['unchanged']} inchangés")
             return True
         
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde dans MongoDB ({collection_name}): {e}")
             return False
     
+    def fetch_pages(self, names=None):
+        """
+        Télécharge les pages demandées et les renvoie au fur et à mesure
+        sous forme de couples (nom, html)
+
+        En mode simultané, les pages sont récupérées en parallèle sur la session
+        partagée : la durée totale est bornée par la page la plus lente.
+        """
+        names = list(names or PAGES)
+        
+        if not self.concurrent or len(names) < 2:
+            for name in names:
+                yield name, self.get_page(PAGES[name])
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names)),
+                                thread_name_prefix="brvm_fetch") as executor:
+            futures = {executor.submit(self.get_page, PAGES[name]): name for name in names}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
     def run(self):
         """Exécute le processus complet de collecte"""
         logger.info("Démarrage de la collecte des données BRVM")
         
-        # 1. Récupération du statut du marché
-        market_status = self.parse_market_status()
-        if market_status:
-            self.save_to_file(market_status, "market_status")
-            if self.use_db:
-                self.save_to_database(market_status, "market_status")
-        
-        # 2. Récupération des indices
-        indices = self.parse_indices()
-        if indices:
-            self.save_to_file(indices, "indices")
-            if self.use_db:
-                self.save_to_database(indices, "indices")
-        
-        # 3. Récupération des actions
-        stocks = self.parse_stocks()
-        if stocks:
-            self.save_to_file(stocks, "stocks")
-            if self.use_db:
-                self.save_to_database(stocks, "stocks")
-        
-        # 4. Récupération des obligations
-        bonds = self.parse_bonds()
-        if bonds:
-            self.save_to_file(bonds, "bonds")
-            if self.use_db:
-                self.save_to_database(bonds, "bonds")
+        parsers = {
+            'market_status': self.parse_market_status,
+            'indices': self.parse_indices,
+            'stocks': self.parse_stocks,
+            'bonds': self.parse_bonds,
+        }
+        results = {}
+        processed = []
+        self.db_stats = {}
+        self.timings = {}
+        self.page_results = {}
+        started_at = datetime.datetime.now()
+        start = time.perf_counter()
+        
+        # Chaque page est analysée et sauvegardée dès qu'elle est reçue
+        for name, html in self.fetch_pages(parsers):
+            if not html:
+                continue
+            
+            # Contenu identique à la dernière collecte sauvegardée du jour : rien à réécrire
+            # (une page inchangée est encore sauvegardée une fois à chaque nouvelle date)
+            if self.page_cache and self.page_cache.is_processed(PAGES[name], self.today):
+                logger.info(f"Page {name} inchangée depuis la dernière collecte du {self.today}, analyse ignorée")
+                self.page_results[name] = 'unchanged'
+                continue
+            
+            data = parsers[name](html)
+            results[name] = data
+            if data:
+                ROWS_TOTAL.inc(len(data) if name != 'market_status' else 1, dataset=name)
+                saved = self.save_to_file(data, name)
+                if self.use_ticks and name in ('stocks', 'bonds'):
+                    self.save_ticks(data, name)
+                if self.use_db:
+                    saved = self.save_to_database(data, name) and saved
+                if saved:
+                    processed.append(PAGES[name])
+        
+        stocks = results.get('stocks')
+        bonds = results.get('bonds')
+        indices = results.get('indices')
         
         logger.info("Collecte des données BRVM terminée")
+        if self.use_db and self.db_stats:
+            totals = {field: sum(stats[field] for stats in self.db_stats.values())
+                      for field in ('inserted', 'modified', 'unchanged')}
+            logger.info(f"Bilan MongoDB: {totals['inserted']} insérés, "
+                        f"{totals['modified']} modifiés, {totals['unchanged']} inchangés")
         
         # Création de fichiers CSV pour une utilisation plus facile
-        self.create_csv_files(stocks, bonds, indices)
+        csv_saved = self.create_csv_files(stocks, bonds, indices)
+        
+        # Ajout de la journée à l'historique colonnaire
+        history_saved = self.save_to_history(stocks, bonds, indices)
+        
+        # Les pages sauvegardées ne seront plus analysées tant qu'elles ne changent pas
+        if self.page_cache and csv_saved and history_saved:
+            for url in processed:
+                self.page_cache.mark_processed(url, self.today)
+        
+        duration = time.perf_counter() - start
+        RUN_SECONDS.observe(duration)
+        LAST_RUN.set(time.time())
+        self.write_run_summary(started_at, duration, results)
+    
+    def write_run_summary(self, started_at, duration, results):
+        """
+        Écrit le bilan de la collecte (durée de chaque étape, résultat des
+        pages, lignes analysées) dans METRICS_DIR/scraper_run.json, l'ajoute à
+        scraper_runs.jsonl et publie les métriques cumulées pour /metrics
+        """
+        stages = {stage: {name: round(seconds, 6) for name, seconds in datasets.items()}
+                  for stage, datasets in self.timings.items()}
+        summary = {
+            'date': self.today,
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'duration_seconds': round(duration, 6),
+            'stage_totals': {stage: round(sum(datasets.values()), 6) for stage, datasets in stages.items()},
+            'stages': stages,
+            'pages': dict(self.page_results),
+            'rows': {name: len(data) for name, data in results.items() if data and name != 'market_status'},
+        }
+        if self.db_stats:
+            summary['db'] = self.db_stats
+        
+        totals = summary['stage_totals']
+        logger.info("Durées de la collecte: " + ", ".join(
+            f"{stage} {seconds:.3f}s" for stage, seconds in totals.items()) + f" (total {duration:.3f}s)")
+        
+        try:
+            METRICS_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = METRICS_DIR / ".scraper_run.json.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, METRICS_DIR / "scraper_run.json")
+            with open(METRICS_DIR / "scraper_runs.jsonl", 'a', encoding='utf-8') as f:
+                f.write(json.dumps(summary, ensure_ascii=False, separators=(",", ":")) + "\n")
+            # Le dernier état reste exposé après la fin du processus (collecte ponctuelle)
+            write_snapshot(METRICS_DIR / "scraper.metrics.json", REGISTRY.snapshot(), live=False)
+        except OSError as e:
+            logger.error(f"Erreur lors de l'écriture du bilan de collecte: {e}")
+        return summary
+    
+    def _indices_to_records(self, indices):
+        """Convertit le dictionnaire des indices en liste d'enregistrements datés"""
+        return indices_to_records(indices, self.today)
+    
+    @timed_stage('ticks')
+    def save_ticks(self, data, dataset):
+        """Ajoute les cotations modifiées au journal intraday du jour"""
+        try:
+            self.tick_journal(dataset).append(data, self.today)
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de l'ajout au journal intraday {dataset}: {e}")
+            return False
     
+    @timed_stage('history', 'all')
+    def save_to_history(self, stocks, bonds, indices):
+        """Ajoute les données de la journée à l'historique Parquet partitionné par mois"""
+        try:
+            if stocks:
+                self.history.append('stocks', stocks, self.today)
+            if bonds:
+                self.history.append('bonds', bonds, self.today)
+            if indices:
+                self.history.append('indices', self._indices_to_records(indices), self.today)
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de l'ajout à l'historique: {e}")
+            return False
+    
+    @timed_stage('csv', 'all')
     def create_csv_files(self, stocks, bonds, indices):
         """Crée des fichiers CSV à partir des données collectées"""
         try:
             # Création du fichier CSV pour les actions
             if stocks:
-                stocks_df = pd.DataFrame(stocks)
                 stocks_csv_path = DATA_DIR / "processed" / f"stocks_{self.today}.csv"
-                stocks_df.to_csv(stocks_csv_path, index=False)
+                write_csv(stocks_csv_path, stocks)
                 logger.info(f"Fichier CSV des actions créé: {stocks_csv_path}")
             
             # Création du fichier CSV pour les obligations
             if bonds:
-                bonds_df = pd.DataFrame(bonds)
                 bonds_csv_path = DATA_DIR / "processed" / f"bonds_{self.today}.csv"
-                bonds_df.to_csv(bonds_csv_path, index=False)
+                write_csv(bonds_csv_path, bonds)
                 logger.info(f"Fichier CSV des obligations créé: {bonds_csv_path}")
             
             # Création du fichier CSV pour les indices
             if indices:
-                # Conversion du dictionnaire en DataFrame
-                indices_data = []
-                for name, data in indices.items():
-                    indices_data.append({
-                        'name': name,
-                        'value': data['value'],
-                        'change_percent': data['change_percent'],
-                        'date': self.today
-                    })
-                
-                indices_df = pd.DataFrame(indices_data)
+                # Conversion du dictionnaire en enregistrements datés
                 indices_csv_path = DATA_DIR / "processed" / f"indices_{self.today}.csv"
-                indices_df.to_csv(indices_csv_path, index=False)
+                write_csv(indices_csv_path, self._indices_to_records(indices))
                 logger.info(f"Fichier CSV des indices créé: {indices_csv_path}")
+            
+            return True
         
         except Exception as e:
             logger.error(f"Erreur lors de la création des fichiers CSV: {e}")
+            return False
 
 if __name__ == "__main__":
+    configure_logging()
+    
     # Utilisation sans base de données
     scraper = BRVMScraper(use_db=False)
     scraper.run()
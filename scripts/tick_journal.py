@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Journal intraday des cotations de la BRVM (format binaire, ajout seul)
+Chaque collecte ajoute au journal du jour un enregistrement horodaté par
+titre dont la cotation a changé depuis le précédent :
+
+    data/ticks/<dataset>/YYYY-MM-DD.ticks     (en-tête puis enregistrements de taille fixe)
+    data/ticks/<dataset>/YYYY-MM-DD.symbols   (dictionnaire : un symbole par ligne, n° de ligne = identifiant)
+
+Un enregistrement (RECORD_DTYPE, 56 octets) contient l'horodatage en
+millisecondes UTC, l'identifiant du symbole, le cours, la variation, les
+plus haut et plus bas (NaN si absents) et le volume (-1 si absent). Les
+horodatages sont croissants : le lecteur projette le fichier en mémoire
+(mmap), le voit comme un tableau NumPy sans copie et localise une plage
+horaire par recherche dichotomique, sans analyser le reste du fichier.
+
+Un seul écrivain (le scraper) ; les lecteurs (l'API) ignorent un
+enregistrement partiellement écrit en fin de fichier, et le dictionnaire
+est complété avant les enregistrements qui utilisent un nouveau symbole.
+"""
+
+import os
+import mmap
+import time
+import struct
+import logging
+import datetime
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("brvm_ticks")
+
+MAGIC = b"BRVMTCK1"
+HEADER = struct.Struct("<8sII")  # signature, taille d'un enregistrement, réservé
+
+RECORD_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('symbol', '<u4'),
+    ('flags', '<u4'),  # réservé
+    ('last_price', '<f8'),
+    ('change', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('volume', '<i8'),
+])
+
+# Champs de cotation enregistrés (dans l'ordre du format)
+TICK_FIELDS = ('last_price', 'change', 'high', 'low', 'volume')
+
+TICK_DATASETS = ('stocks', 'bonds')
+
+
+def _paths(root, date):
+    return Path(root) / f"{date}.ticks", Path(root) / f"{date}.symbols"
+
+
+def _timestamp_ms(moment=None):
+    if moment is None:
+        return int(time.time() * 1000)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def _number(value, missing):
+    if value is None:
+        return missing
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return missing
+    return missing if number != number else number
+
+
+def _read_symbols(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except OSError:
+        return []
+    # Ligne non terminée : symbole en cours d'écriture, ignoré
+    return text.split('\n')[:-1]
+
+
+class TickJournal:
+    """Écriture des journaux intraday d'un jeu de données (un fichier par jour)"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._date = None
+        self._symbols = {}
+        self._last = {}
+        self._last_ts = 0
+
+    def _open_day(self, date):
+        """Charge le dictionnaire et les dernières cotations du jour (reprise après redémarrage)"""
+        if date == self._date:
+            return
+        ticks_path, symbols_path = _paths(self.root, date)
+        symbols = _read_symbols(symbols_path)
+        self._symbols = {symbol: code for code, symbol in enumerate(symbols)}
+        self._last = {}
+        self._last_ts = 0
+        records = _load_records(ticks_path)
+        if records is not None and len(records):
+            self._last_ts = int(records['ts'][-1])
+            for record in records:
+                self._last[int(record['symbol'])] = tuple(record[f].item() for f in TICK_FIELDS)
+        self._date = date
+
+    def _code(self, symbol, symbols_file):
+        code = self._symbols.get(symbol)
+        if code is None:
+            code = self._symbols[symbol] = len(self._symbols)
+            symbols_file.write(symbol.replace('\n', ' ') + '\n')
+        return code
+
+    def append(self, records, date, moment=None, key='symbol'):
+        """
+        Ajoute au journal du jour les cotations modifiées depuis le dernier
+        ajout ; retourne le nombre d'enregistrements écrits
+        """
+        self._open_day(date)
+        ticks_path, symbols_path = _paths(self.root, date)
+        # Horodatages croissants malgré un recul de l'horloge : la recherche dichotomique en dépend
+        timestamp = max(_timestamp_ms(moment), self._last_ts)
+
+        rows = []
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(symbols_path, 'a', encoding='utf-8') as symbols_file:
+            for record in records:
+                symbol = record.get(key)
+                if not symbol:
+                    continue
+                values = (
+                    _number(record.get('last_price'), float('nan')),
+                    _number(record.get('change'), float('nan')),
+                    _number(record.get('high'), float('nan')),
+                    _number(record.get('low'), float('nan')),
+                    int(_number(record.get('volume'), -1)),
+                )
+                code = self._code(str(symbol), symbols_file)
+                previous = self._last.get(code)
+                # NaN != NaN : comparaison sur la représentation
+                if previous is not None and repr(previous) == repr(values):
+                    continue
+                rows.append((timestamp, code, 0) + values)
+                self._last[code] = values
+
+        if not rows:
+            return 0
+
+        data = np.array(rows, dtype=RECORD_DTYPE).tobytes()
+        new_file = not ticks_path.exists() or ticks_path.stat().st_size < HEADER.size
+        with open(ticks_path, 'ab') as f:
+            if new_file:
+                f.truncate(0)
+                f.write(HEADER.pack(MAGIC, RECORD_DTYPE.itemsize, 0))
+            else:
+                # Enregistrement incomplet laissé par une écriture interrompue
+                excess = (f.tell() - HEADER.size) % RECORD_DTYPE.itemsize
+                if excess:
+                    f.truncate(f.tell() - excess)
+            f.write(data)
+        self._last_ts = timestamp
+        logger.info(f"{len(rows)} cotations ajoutées au journal intraday {self.root.name} ({date})")
+        return len(rows)
+
+
+def _load_records(path):
+    """Enregistrements d'un journal lus en mémoire (reprise de l'écrivain), ou None"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size or HEADER.unpack_from(data)[0] != MAGIC:
+        return None
+    count = (len(data) - HEADER.size) // RECORD_DTYPE.itemsize
+    return np.frombuffer(data, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+
+
+class _MappedDay:
+    """Journal d'une journée projeté en mémoire"""
+
+    def __init__(self, ticks_path, symbols_path, size):
+        self.size = size
+        self.symbols_size = None
+        self.symbols = []
+        self.codes = {}
+        with open(ticks_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        signature, record_size, _ = HEADER.unpack_from(self._mmap)
+        if signature != MAGIC or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Journal intraday invalide: {ticks_path}")
+        count = (size - HEADER.size) // RECORD_DTYPE.itemsize
+        # Vue sans copie sur les pages du fichier
+        self.records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+        self.refresh_symbols(symbols_path)
+
+    def refresh_symbols(self, symbols_path):
+        try:
+            size = os.stat(symbols_path).st_size
+        except OSError:
+            size = 0
+        if size != self.symbols_size:
+            self.symbols = _read_symbols(symbols_path)
+            self.codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+            self.symbols_size = size
+
+
+class TickReader:
+    """
+    Lecture des journaux intraday d'un jeu de données (API)
+
+    Chaque journée est projetée une fois en mémoire ; elle est reprojetée
+    lorsque le fichier a grandi (nouvelle collecte).
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._days = {}
+        self._lock = threading.Lock()
+
+    def dates(self):
+        """Journées disponibles, triées"""
+        if not self.root.exists():
+            return []
+        return sorted(p.stem for p in self.root.glob("*.ticks"))
+
+    def _day(self, date):
+        ticks_path, symbols_path = _paths(self.root, date)
+        try:
+            size = os.stat(ticks_path).st_size
+        except OSError:
+            return None
+        if size <= HEADER.size:
+            return None
+        with self._lock:
+            day = self._days.get(date)
+            if day is None or day.size != size:
+                day = self._days[date] = _MappedDay(ticks_path, symbols_path, size)
+            else:
+                day.refresh_symbols(symbols_path)
+            return day
+
+    def slice(self, date, symbol=None, start=None, end=None):
+        """
+        Enregistrements d'une journée (tableau structuré) entre deux instants
+        (datetime, bornes incluses), éventuellement restreints à un symbole
+        """
+        day = self._day(date)
+        if day is None:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        records = day.records
+        timestamps = records['ts']
+        low = 0 if start is None else int(np.searchsorted(timestamps, _timestamp_ms(start), side='left'))
+        high = len(records) if end is None else int(np.searchsorted(timestamps, _timestamp_ms(end), side='right'))
+        selected = records[low:high]
+        if symbol is not None:
+            code = day.codes.get(symbol)
+            if code is None:
+                return np.empty(0, dtype=RECORD_DTYPE)
+            selected = selected[selected['symbol'] == code]
+        return selected
+
+    def has_symbol(self, date, symbol):
+        day = self._day(date)
+        return day is not None and symbol in day.codes
+
+    def points(self, date, symbol, start=None, end=None, fields=None):
+        """Points intraday d'un symbole : [{'time': ISO 8601 UTC, champ: valeur}]"""
+        fields = list(fields or TICK_FIELDS)
+        unknown = [f for f in fields if f not in TICK_FIELDS]
+        if unknown:
+            raise ValueError(f"Champs inconnus: {unknown} (disponibles: {', '.join(TICK_FIELDS)})")
+
+        selected = self.slice(date, symbol, start, end)
+        columns = {name: selected[name].tolist() for name in fields}
+        times = selected['ts'].tolist()
+        points = []
+        for row, ts in enumerate(times):
+            point = {'time': datetime.datetime.fromtimestamp(ts / 1000, tz=datetime.timezone.utc)
+                     .isoformat(timespec='seconds').replace('+00:00', 'Z')}
+            for name in fields:
+                value = columns[name][row]
+                point[name] = None if (value != value or (name == 'volume' and value < 0)) else value
+            points.append(point)
+        return points
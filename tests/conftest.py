@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""
+Configuration commune des tests de la BRVM Data Platform
+Les modules de scripts/ et api/ s'importent à plat, comme dans les scripts,
+et les données écrites à l'import (répertoires data/) vont dans un
+répertoire temporaire plutôt que dans celui du dépôt.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+os.environ.setdefault("BRVM_DATA_DIR", tempfile.mkdtemp(prefix="brvm_tests_"))
+
+for directory in ("api", "scripts"):
+    path = str(BASE_DIR / directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: tests lancés dans des interpréteurs neufs (désélection: -m 'not slow')")
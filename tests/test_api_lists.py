@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la pagination des listes de l'API (/api/stocks) : curseur suivant,
+et refus (400) d'un curseur forgé hors limites
+"""
+
+import base64
+import json
+
+import pytest
+
+import app as api
+from scraper import write_csv
+
+
+def _cursor(offset, version):
+    token = json.dumps({"offset": offset, "version": version}).encode('utf-8')
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    records = [{'symbol': f"S{i:02d}", 'name': f"Société {i}", 'last_price': 1000 + i, 'date': "2024-03-01"}
+               for i in range(5)]
+    write_csv(tmp_path / "stocks_2024-03-01.csv", records)
+    cache = api.SnapshotCache(dumps=lambda obj: json.dumps(obj) + "\n", check_interval=0)
+    cache.register('stocks', api.FileSource(tmp_path, "stocks_", ".csv", api._read_csv))
+    monkeypatch.setattr(api, 'snapshot_cache', cache)
+    return api.app.test_client()
+
+
+def test_cursor_pages_through_list(client):
+    first = client.get('/api/stocks?limit=2')
+    assert first.status_code == 200
+    assert [row['symbol'] for row in first.get_json()] == ["S00", "S01"]
+
+    second = client.get(f"/api/stocks?limit=2&cursor={first.headers['X-Next-Cursor']}")
+    assert [row['symbol'] for row in second.get_json()] == ["S02", "S03"]
+
+
+@pytest.mark.parametrize("offset", [-3, 10 ** 6 + 1, 10 ** 18])
+def test_out_of_range_cursor_is_rejected(client, offset):
+    version = json.loads(base64.urlsafe_b64decode(client.get('/api/stocks?limit=2').headers['X-Next-Cursor'] + '=='))['version']
+    response = client.get(f"/api/stocks?limit=2&cursor={_cursor(offset, version)}")
+    assert response.status_code == 400
+    assert "hors limites" in response.get_json()['error']
+
+
+def test_malformed_cursor_is_rejected(client):
+    assert client.get('/api/stocks?cursor=pas-un-curseur').status_code == 400
+
+
+def test_sector_is_not_a_list_parameter(client):
+    # Les pages collectées ne donnent pas le secteur : pas de filtre qui ne pourrait qu'échouer
+    assert 'sector' not in api.LIST_PARAMS
+    response = client.get('/api/stocks?sector=Banques&limit=2')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
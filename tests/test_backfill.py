@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la reconstitution de l'historique (scripts/backfill.py) contre le
+site local de benchmarks/site_stub.py : URL datées, limite de débit,
+tentatives sur erreur HTTP, interruption puis reprise, et classement des
+pages illisibles (date en échec, retentée) ou sans tableau (« sans données »)
+"""
+
+import sys
+import time
+import datetime
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+
+import scraper as scraper_module
+import site_stub
+from backfill import Backfill, Checkpoint, backfill_dates
+from history_store import HistoryStore
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+OPEN = (FIXTURES / "market_open.html").read_text(encoding='utf-8')
+CLOSED = (FIXTURES / "market_closed.html").read_text(encoding='utf-8')
+BROKEN = OPEN.replace("<body>", "<body><!-- BROKEN -->")
+
+# Lundi au vendredi, sans jour férié
+WEEK = backfill_dates(datetime.date(2024, 3, 4), datetime.date(2024, 3, 8))
+ROWS = 5
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """
+    site_stub sur un port éphémère (pages synthétiques) ; les `failures`
+    requêtes suivantes échouent en 503 via --error-rate
+    """
+    state = {'failures': 0, 'requests': []}
+
+    class Flaky:
+        def random(self):
+            if state['failures'] > 0:
+                state['failures'] -= 1
+                return 0.0
+            return 1.0
+
+    monkeypatch.setattr(site_stub, 'random', Flaky())
+
+    class Recording(site_stub.make_handler(rows=ROWS, error_rate=0.5)):
+        def do_GET(self):
+            state['requests'].append(self.path)
+            super().do_GET()
+
+    server = _serve(Recording)
+    state['url'] = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def saved_site(tmp_path):
+    """site_stub servant des pages sauvegardées (--pages) : {date: html}"""
+    pages_dir = tmp_path / "pages"
+    server = _serve(site_stub.make_handler(pages_dir=pages_dir))
+
+    def publish(pages):
+        for date, html in pages.items():
+            (pages_dir / date).mkdir(parents=True, exist_ok=True)
+            for dataset in ('indices', 'stocks', 'bonds'):
+                (pages_dir / date / f"{dataset}.html").write_text(html, encoding='utf-8')
+
+    yield f"http://127.0.0.1:{server.server_address[1]}", publish
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_wait(monkeypatch):
+    """Attentes entre tentatives supprimées (et consignées)"""
+    waits = []
+    monkeypatch.setattr(scraper_module.time, 'sleep', waits.append)
+    return waits
+
+
+def _backfill(tmp_path, base_url, **kwargs):
+    options = dict(workers=1, rate=0, date_format="%Y-%m-%d")
+    options.update(kwargs)
+    return Backfill(HistoryStore(tmp_path / "history"), Checkpoint(tmp_path / "checkpoint.json"),
+                    base_url=base_url, **options)
+
+
+def _history_dates(tmp_path, dataset):
+    table = HistoryStore(tmp_path / "history").scan(dataset, columns=['date'])
+    dates = [d.isoformat() for d in table.column('date').to_pylist()]
+    return {date: dates.count(date) for date in sorted(set(dates))}
+
+
+def test_date_urls_and_rate_limit(tmp_path, site):
+    rate = 20.0
+    engine = _backfill(tmp_path, site['url'], workers=2, chunk_days=2, rate=rate, date_format="%d/%m/%Y")
+
+    start = time.perf_counter()
+    totals = engine.run(WEEK, compact=False)
+    elapsed = time.perf_counter() - start
+
+    assert totals['done'] == len(WEEK)
+    assert len(site['requests']) == 3 * len(WEEK)
+    assert sorted(site['requests'])[0] == "/fr/cours-actions/liste?date=04%2F03%2F2024"
+    assert {path.split('?')[0] for path in site['requests']} == {
+        "/fr/indices/historique", "/fr/cours-actions/liste", "/fr/cours-obligations/liste"}
+    # Requêtes espacées d'au moins 1/rate, tous workers confondus
+    assert elapsed >= (len(site['requests']) - 1) / rate
+    assert _history_dates(tmp_path, 'stocks') == {date: ROWS for date in WEEK}
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path, site, monkeypatch):
+    engine = _backfill(tmp_path, site['url'], chunk_days=2)
+    write_chunk = engine.write_chunk
+
+    def interrupted(results, touched):
+        write_chunk(results, touched)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(engine, 'write_chunk', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        engine.run(WEEK)
+
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    assert checkpoint.done == set(WEEK[:2])
+    assert _history_dates(tmp_path, 'stocks') == {date: ROWS for date in WEEK[:2]}
+
+    totals = _backfill(tmp_path, site['url'], chunk_days=2).run(WEEK)
+    assert (totals['skipped'], totals['done'], totals['failed']) == (2, 3, 0)
+    assert Checkpoint(tmp_path / "checkpoint.json").done == set(WEEK)
+    for dataset in ('indices', 'stocks', 'bonds'):
+        assert sorted(_history_dates(tmp_path, dataset)) == WEEK
+    assert _history_dates(tmp_path, 'stocks') == {date: ROWS for date in WEEK}
+    # Reprise compactée : plus aucun fichier quotidien
+    assert not list((tmp_path / "history" / "stocks").rglob("day-*.parquet"))
+
+
+def test_http_errors_are_retried(tmp_path, site, no_wait):
+    site['failures'] = 2
+    totals = _backfill(tmp_path, site['url']).run(WEEK[:1], compact=False)
+
+    assert totals['done'] == 1
+    assert len(site['requests']) == 3 + 2
+    assert no_wait == [1, 2]
+
+
+def test_exhausted_retries_fail_the_date_until_resumed(tmp_path, site, no_wait):
+    site['failures'] = 3
+    totals = _backfill(tmp_path, site['url']).run(WEEK[:2], compact=False)
+
+    assert (totals['done'], totals['failed']) == (1, 1)
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    assert list(checkpoint.failed) == [WEEK[0]] and "indisponible" in checkpoint.failed[WEEK[0]]
+
+    totals = _backfill(tmp_path, site['url']).run(WEEK[:2], compact=False)
+    assert (totals['done'], totals['failed'], totals['skipped']) == (1, 0, 1)
+    assert Checkpoint(tmp_path / "checkpoint.json").failed == {}
+
+
+def test_parser_failure_is_retried(tmp_path, saved_site, monkeypatch):
+    base_url, publish = saved_site
+    extract = scraper_module.extract_table_rows
+
+    def extract_table_rows(html, table_class):
+        if "BROKEN" in html:
+            raise ValueError("tableau mal formé")
+        return extract(html, table_class)
+
+    monkeypatch.setattr(scraper_module, 'extract_table_rows', extract_table_rows)
+    dates = ["2026-10-14", "2026-10-15", "2026-10-16"]
+    publish({"2026-10-14": OPEN, "2026-10-15": BROKEN, "2026-10-16": CLOSED})
+
+    totals = _backfill(tmp_path, base_url).run(dates, compact=False)
+    assert (totals['done'], totals['empty'], totals['failed']) == (1, 1, 1)
+
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    assert checkpoint.done == {"2026-10-14"}
+    assert checkpoint.empty == {"2026-10-16"}
+    assert list(checkpoint.failed) == ["2026-10-15"]
+
+    # Page de nouveau lisible : seule la date en échec est retraitée
+    publish({"2026-10-15": OPEN})
+    totals = _backfill(tmp_path, base_url).run(dates, compact=False)
+    assert (totals['done'], totals['failed'], totals['skipped']) == (1, 0, 2)
+    assert "2026-10-15" in Checkpoint(tmp_path / "checkpoint.json").done
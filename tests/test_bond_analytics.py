@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'analyse obligataire (api/bond_analytics.py) : rendement d'une
+obligation au pair, aller-retour cours -> rendement -> cours, replis sur
+les cours invalides et titres échus, ajustement Nelson-Siegel
+"""
+
+import datetime
+import math
+
+import numpy as np
+import pytest
+
+from bond_analytics import (NS_LAMBDAS, _present_value, analyze, cash_flows, fit_nelson_siegel,
+                            nelson_siegel, yield_to_maturity)
+
+
+@pytest.mark.parametrize("frequency", [1, 2, 4])
+def test_par_bond_yields_its_coupon(frequency):
+    years = np.array([1.0, 3.0, 5.0, 10.0])
+    coupons = np.array([3.0, 5.5, 6.5, 7.25])
+    times, flows = cash_flows(years, coupons, frequency)
+
+    rates = yield_to_maturity(np.full(len(years), 100.0), times, flows, frequency)
+
+    np.testing.assert_allclose(rates, coupons / 100, atol=1e-9)
+
+
+@pytest.mark.parametrize("frequency", [1, 2])
+def test_price_yield_round_trip(frequency):
+    years = np.array([0.4, 1.7, 4.25, 7.9, 14.3])
+    coupons = np.array([5.0, 6.0, 0.0, 6.5, 7.0])
+    expected = np.array([0.02, 0.055, 0.07, 0.09, 0.15])
+    times, flows = cash_flows(years, coupons, frequency)
+    prices, _ = _present_value(expected, times, flows, frequency)
+
+    rates = yield_to_maturity(prices, times, flows, frequency)
+    np.testing.assert_allclose(rates, expected, atol=1e-9)
+
+    repriced, _ = _present_value(rates, times, flows, frequency)
+    np.testing.assert_allclose(repriced, prices, rtol=1e-9)
+
+
+def _no_nan(value):
+    if isinstance(value, float):
+        return not math.isnan(value)
+    if isinstance(value, dict):
+        return all(_no_nan(v) for v in value.values())
+    if isinstance(value, list):
+        return all(_no_nan(v) for v in value)
+    return True
+
+
+def test_invalid_prices_and_matured_bonds_fall_back_to_none():
+    records = [
+        {'symbol': 'ZERO', 'name': 'TPCI 6% 2022-2029', 'last_price': 0, 'date': '2024-06-28'},
+        {'symbol': 'NEG', 'name': 'TPCI 6% 2022-2029', 'last_price': -9950, 'date': '2024-06-28'},
+        {'symbol': 'TEXT', 'name': 'TPCI 6% 2022-2029', 'last_price': 'n/a', 'date': '2024-06-28'},
+        {'symbol': 'MATURED', 'name': 'EOT 6,5% 2016-2023', 'last_price': 10000, 'date': '2024-06-28'},
+        {'symbol': 'TODAY', 'name': 'BOAD 5%', 'maturity_date': '2024-06-28', 'last_price': 10000,
+         'date': '2024-06-28'},
+    ]
+
+    result = analyze(records)
+
+    assert _no_nan(result)
+    assert result['curve'] is None
+    for bond in result['bonds']:
+        assert bond['ytm'] is None
+        assert bond['macaulay_duration'] is None
+        assert bond['spread_bp'] is None
+    matured = result['bonds'][3]
+    assert matured['maturity_date'] == '2023-12-31' and matured['years_to_maturity'] < 0
+
+
+def test_invalid_bonds_do_not_disturb_valid_ones():
+    valid = {'symbol': 'PAR', 'name': 'TPCI 6% 2024-2034', 'maturity_date': '2034-06-28',
+             'last_price': 10000, 'date': '2024-06-28'}
+    alone = analyze([valid])['bonds'][0]
+    mixed = analyze([{'symbol': 'ZERO', 'name': 'TPCI 6% 2022-2029', 'last_price': 0, 'date': '2024-06-28'},
+                     valid])['bonds'][1]
+
+    assert alone['ytm'] is not None
+    assert abs(alone['ytm'] - 6.0) < 0.01
+    assert mixed == alone
+
+
+def test_nelson_siegel_recovers_known_parameters():
+    params = {'beta0': 7.5, 'beta1': -2.0, 'beta2': 1.5, 'lambda': float(NS_LAMBDAS[7])}
+    maturities = np.array([0.5, 1, 2, 3, 4, 5, 7, 10, 12, 15])
+    rates = nelson_siegel(params, maturities)
+
+    fitted = fit_nelson_siegel(maturities, rates)
+
+    assert fitted['lambda'] == pytest.approx(params['lambda'])
+    for beta in ('beta0', 'beta1', 'beta2'):
+        assert fitted[beta] == pytest.approx(params[beta], abs=1e-6)
+    assert fitted['rmse'] < 1e-8
+
+
+def test_nelson_siegel_needs_three_points():
+    assert fit_nelson_siegel([1.0, 2.0], [5.0, 5.5]) is None
+
+
+def test_curve_through_analyze():
+    settlement = datetime.date(2024, 6, 28)
+    params = {'beta0': 8.0, 'beta1': -2.5, 'beta2': 1.0, 'lambda': 2.0}
+    records = []
+    for years in (1, 2, 3, 5, 7, 10):
+        maturity = settlement + datetime.timedelta(days=365 * years)
+        rate = float(nelson_siegel(params, [years])[0]) / 100
+        times, flows = cash_flows(np.array([float(years)]), np.array([6.0]), 1)
+        price, _ = _present_value(np.array([rate]), times, flows, 1)
+        records.append({'symbol': f"B{years}", 'coupon': 6.0, 'maturity_date': maturity.isoformat(),
+                        'last_price': round(float(price[0]) * 100, 2), 'date': settlement.isoformat()})
+
+    result = analyze(records, today=settlement)
+
+    assert result['curve']['model'] == 'nelson-siegel'
+    for bond in result['bonds']:
+        assert abs(bond['spread_bp']) < 1.0
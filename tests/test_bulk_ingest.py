@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'ingestion en masse (scripts/bulk_ingest.py) : les workers
+analysent sans construire de scraper ; une page HTML sans aucune ligne est
+consignée en échec, sauf un jour sans séance (ignorée, listée à part)
+"""
+
+import csv
+import json
+from pathlib import Path
+
+import scraper as scraper_module
+from bulk_ingest import BulkIngest, discover
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+
+def _write_pages(source, date, html, datasets=('indices', 'stocks', 'bonds')):
+    (source / date).mkdir(parents=True, exist_ok=True)
+    for dataset in datasets:
+        (source / date / f"{dataset}.html").write_text(html, encoding='utf-8')
+    return {dataset: str(source / date / f"{dataset}.html") for dataset in datasets}
+
+
+def test_bulk_ingest_classifies_empty_pages_and_leaves_data_dir_alone(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(scraper_module, 'DATA_DIR', data_dir)
+    open_page = (FIXTURES / "market_open.html").read_text(encoding='utf-8')
+    closed_page = (FIXTURES / "market_closed.html").read_text(encoding='utf-8')
+    no_tables = open_page.replace("-table", "-grid")
+    unparseable = ('<span class="market-status">Marché fermé</span>'
+                   '<table class="stocks-table"><tbody><tr><td>SNTS</td><td>—</td></tr></tbody></table>')
+
+    source = tmp_path / "archives"
+    _write_pages(source, "2024-03-01", open_page)
+    saturday = _write_pages(source, "2024-03-02", closed_page)
+    closed = _write_pages(source, "2024-03-04", closed_page)
+    missing = _write_pages(source, "2024-03-05", no_tables)
+    broken_table = _write_pages(source, "2024-03-06", unparseable, ('stocks',))
+    (source / "stocks_2024-03-07.json").write_text("{tronqué", encoding='utf-8')
+
+    output = tmp_path / "processed"
+    totals, failures, skipped = BulkIngest(output, workers=1, chunk_size=2).run(discover(source))
+
+    assert (totals['files'], totals['skipped'], totals['failed']) == (3, 6, 5)
+    assert all(skipped[path] == "jour sans séance" for path in saturday.values())
+    assert all("marché fermé" in skipped[path] for path in closed.values())
+    assert set(skipped) == set(saturday.values()) | set(closed.values())
+    assert all("aucune ligne" in failures[path] for path in missing.values())
+    assert "présent mais aucune ligne exploitable" in failures[broken_table['stocks']]
+    assert str(source / "stocks_2024-03-07.json") in failures
+
+    with open(output / "stocks_2024-03-01.csv", encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert rows and all(row['date'] == "2024-03-01" for row in rows)
+    assert not (output / "stocks_2024-03-04.csv").exists()
+    assert not data_dir.exists()
+
+
+def test_bulk_ingest_accepts_raw_json(tmp_path):
+    source = tmp_path / "archives"
+    source.mkdir()
+    indices = {"BRVM Composite": {"value": 210.5, "change_percent": 0.4}}
+    (source / "indices_2024-03-04.json").write_text(json.dumps(indices), encoding='utf-8')
+
+    output = tmp_path / "processed"
+    totals, failures, skipped = BulkIngest(output, workers=1).run(discover(source))
+
+    assert failures == {} and skipped == {}
+    assert totals['rows'] == 1
+    with open(output / "indices_2024-03-04.csv", encoding='utf-8') as f:
+        assert next(csv.DictReader(f))['date'] == "2024-03-04"
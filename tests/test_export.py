@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'export en flux de l'historique (/api/export/<dataset>) :
+nombre de lignes en NDJSON, CSV et Arrow, filtres par période et par
+symbole, format inconnu refusé
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import app as api
+from history_store import HistoryStore
+
+DAYS = ("2024-03-01", "2024-03-04", "2024-03-05")
+SYMBOLS = ('SNTS', 'ORAC', 'SGBC')
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    store = HistoryStore(tmp_path / "history")
+    for day in DAYS:
+        records = [{'symbol': symbol, 'name': f"Société {symbol}", 'last_price': 1000.0 + i,
+                    'volume': 100 * i, 'date': day} for i, symbol in enumerate(SYMBOLS)]
+        store.append('stocks', records, day)
+    monkeypatch.setattr(api, 'history_store', store)
+    return api.app.test_client()
+
+
+def _count(fmt, data):
+    if fmt == 'ndjson':
+        rows = [json.loads(line) for line in data.decode('utf-8').splitlines()]
+        return len(rows), {row['symbol'] for row in rows}
+    if fmt == 'csv':
+        rows = list(csv.DictReader(io.StringIO(data.decode('utf-8'))))
+        return len(rows), {row['symbol'] for row in rows}
+    table = pa.ipc.open_stream(data).read_all()
+    return table.num_rows, set(table.column('symbol').to_pylist())
+
+
+@pytest.mark.parametrize("fmt, mimetype", [
+    ('ndjson', 'application/x-ndjson'),
+    ('csv', 'text/csv'),
+    ('arrow', 'application/vnd.apache.arrow.stream'),
+])
+def test_export_row_counts(client, fmt, mimetype):
+    response = client.get(f'/api/export/stocks?format={fmt}')
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+    assert 'attachment; filename="brvm_stocks.' in response.headers['Content-Disposition']
+    assert _count(fmt, response.data) == (len(DAYS) * len(SYMBOLS), set(SYMBOLS))
+
+    filtered = client.get(f'/api/export/stocks?format={fmt}&start=2024-03-04&symbols=SNTS,ORAC')
+    assert _count(fmt, filtered.data) == (4, {'SNTS', 'ORAC'})
+
+
+def test_export_rejects_unknown_format_and_dataset(client):
+    assert client.get('/api/export/stocks?format=xlsx').status_code == 400
+    assert client.get('/api/export/inconnu').status_code == 404
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests du ré-échantillonnage historique (api/history_service.py) : alias de
+fin de mois adapté à la version de pandas
+"""
+
+import warnings
+
+import pandas as pd
+import pytest
+
+from history_service import INTERVALS, _month_end_rule
+
+
+@pytest.mark.parametrize("version, rule", [
+    ("2.0.3", 'M'), ("2.1.4", 'M'), ("2.2.0rc0", 'ME'), ("2.2.3", 'ME'), ("3.0.0.dev0+123", 'ME'), ("1.5.3", 'M'),
+])
+def test_month_end_rule(version, rule):
+    assert _month_end_rule(version) == rule
+
+
+def test_monthly_resample_without_deprecation_warning():
+    daily = pd.Series(range(60), index=pd.date_range("2024-01-01", periods=60, freq='D'))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        monthly = daily.resample(INTERVALS['monthly']).last()
+    assert list(monthly.index.strftime('%Y-%m-%d')) == ["2024-01-31", "2024-02-29"]
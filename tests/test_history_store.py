@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'historique Parquet (scripts/history_store.py) et de la migration
+des fichiers quotidiens (scripts/migrate_history.py) : remplacement d'une
+journée réécrite, compaction sans perte, index clé -> plage de dates tenu à
+jour, migration fidèle aux CSV
+"""
+
+import csv
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from history_store import HistoryStore
+from migrate_history import migrate
+from scraper import write_csv
+
+
+def _stocks(date, **prices):
+    prices = prices or {'SNTS': 20500.0, 'ORAC': 14890.0, 'SGBC': 17995.0}
+    return [
+        {'symbol': symbol, 'name': f"Société {symbol}", 'isin': f"CI{symbol}", 'last_price': price,
+         'change': 0.5, 'high': price + 100, 'low': price - 100, 'volume': 1000, 'date': date}
+        for symbol, price in prices.items()
+    ]
+
+
+def _rows(store, dataset='stocks', **kwargs):
+    table = store.scan(dataset, **kwargs)
+    return sorted(table.to_pylist(), key=lambda row: (row['date'], str(row.get('symbol') or row.get('name'))))
+
+
+def _rebuilt_index(store, dataset='stocks'):
+    """Index reconstruit entièrement à partir des partitions (référence)"""
+    reference = HistoryStore(store.root)
+    reference.rebuild_index(dataset)
+    return reference.index(dataset)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(tmp_path / "history")
+
+
+def test_append_same_day_replaces_it(store):
+    store.append('stocks', _stocks("2024-03-01"), "2024-03-01")
+    store.append('stocks', _stocks("2024-03-04"), "2024-03-04")
+    store.append('stocks', _stocks("2024-03-01", SNTS=21000.0, ORAC=15000.0), "2024-03-01")
+
+    day = _rows(store, start="2024-03-01", end="2024-03-01")
+    assert [(row['symbol'], row['last_price']) for row in day] == [("ORAC", 15000.0), ("SNTS", 21000.0)]
+    assert len(_rows(store)) == 5
+
+
+def test_rewritten_day_drops_keys_from_index(store):
+    store.append('stocks', _stocks("2024-02-28"), "2024-02-28")
+    store.append('stocks', _stocks("2024-03-01"), "2024-03-01")
+    store.append('stocks', _stocks("2024-03-04", SNTS=20600.0), "2024-03-04")
+    assert store.key_range('stocks', 'SGBC')[2] == ["2024-02", "2024-03"]
+
+    # SGBC disparaît de la seule journée de mars où il figurait
+    store.append('stocks', _stocks("2024-03-01", SNTS=20550.0, ORAC=14900.0), "2024-03-01")
+    first, last, months = store.key_range('stocks', 'SGBC')
+    assert (first.isoformat(), last.isoformat(), months) == ("2024-02-28", "2024-02-28", ["2024-02"])
+    first, last, _ = store.key_range('stocks', 'ORAC')
+    assert last.isoformat() == "2024-03-01"
+
+    # Réécriture du seul jour de février sans SGBC : la clé n'a plus aucune ligne
+    store.append('stocks', _stocks("2024-02-28", SNTS=20400.0), "2024-02-28")
+    assert store.key_range('stocks', 'SGBC') is None
+    assert store.index('stocks') == _rebuilt_index(store)
+
+
+def test_compact_keeps_rows_and_updates_index(store):
+    for day in ("2024-03-01", "2024-03-04", "2024-03-05"):
+        store.append('stocks', _stocks(day), day)
+    store.append('stocks', _stocks("2024-04-02", SNTS=20700.0), "2024-04-02")
+    before = _rows(store)
+
+    assert store.compact('stocks') == 2
+    assert _rows(store) == before
+    assert not list((store.root / "stocks" / "month=2024-03").glob("day-*.parquet"))
+    assert store.index('stocks') == _rebuilt_index(store)
+
+    # Journée compactée réécrite sans ORAC, puis nouvelle compaction
+    store.append('stocks', _stocks("2024-03-05", SNTS=20800.0, SGBC=18000.0), "2024-03-05")
+    store.compact('stocks', ["2024-03"])
+    assert len(_rows(store)) == len(before) - 1
+    _, last, _ = store.key_range('stocks', 'ORAC')
+    assert last.isoformat() == "2024-03-04"
+    assert store.index('stocks') == _rebuilt_index(store)
+
+
+def test_migration_matches_daily_csv(tmp_path):
+    data_dir = tmp_path / "data"
+    (data_dir / "processed").mkdir(parents=True)
+    (data_dir / "raw").mkdir()
+
+    expected = {}
+    for day, prices in (("2024-03-01", {}), ("2024-03-04", {'SNTS': 20600.0, 'ORAC': 14700.0}),
+                        ("2024-04-02", {'SNTS': 20700.0})):
+        write_csv(data_dir / "processed" / f"stocks_{day}.csv", _stocks(day, **prices))
+        with open(data_dir / "processed" / f"stocks_{day}.csv", encoding='utf-8') as f:
+            expected[day] = list(csv.DictReader(f))
+    # JSON brut remplacé par le CSV traité de la même journée, indices seulement en brut
+    (data_dir / "raw" / "stocks_2024-03-01.json").write_text(json.dumps(_stocks("2024-03-01", SNTS=1.0)))
+    with gzip.open(data_dir / "raw" / "indices_2024-03-01.json.gz", 'wt', encoding='utf-8') as f:
+        json.dump({"BRVM Composite": {"value": 210.5, "change_percent": 0.4},
+                   "BRVM 10": {"value": 160.2, "change_percent": -0.1}}, f)
+
+    assert migrate(data_dir) == 4
+
+    store = HistoryStore(data_dir / "history")
+    migrated = _rows(store)
+    csv_rows = [row for day in sorted(expected) for row in sorted(expected[day], key=lambda r: r['symbol'])]
+    assert len(migrated) == len(csv_rows)
+    for row, source in zip(migrated, csv_rows):
+        assert row['date'].isoformat() == source['date']
+        assert row['symbol'] == source['symbol']
+        assert row['last_price'] == float(source['last_price'])
+        assert row['volume'] == int(source['volume'])
+
+    indices = _rows(store, 'indices')
+    assert [(row['name'], row['value']) for row in indices] == [("BRVM 10", 160.2), ("BRVM Composite", 210.5)]
+    assert store.key_range('stocks', 'SGBC')[2] == ["2024-03"]
+    assert store.index('stocks') == _rebuilt_index(store)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests des moteurs d'extraction HTML (scripts/html_parser.py) : lxml et
+BeautifulSoup doivent donner exactement le même résultat sur les pages
+sauvegardées de tests/fixtures/html
+"""
+
+from pathlib import Path
+
+import pytest
+
+from html_parser import TABLE_CLASSES, TEXT_CLASSES, compare_backends, extract_table_rows, extract_texts
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "html").glob("*.html"))
+
+
+def _read(path):
+    return path.read_text(encoding='utf-8')
+
+
+@pytest.fixture
+def lxml_backend():
+    pytest.importorskip("lxml")
+    return 'lxml'
+
+
+def test_fixtures_present():
+    assert len(FIXTURES) >= 3
+
+
+@pytest.mark.parametrize("table_class", TABLE_CLASSES)
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.stem)
+def test_table_rows_identical(path, table_class, lxml_backend):
+    html = _read(path)
+    assert extract_table_rows(html, table_class, lxml_backend) == extract_table_rows(html, table_class, 'bs4')
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.stem)
+def test_texts_identical(path, lxml_backend):
+    html = _read(path)
+    assert extract_texts(html, TEXT_CLASSES, lxml_backend) == extract_texts(html, TEXT_CLASSES, 'bs4')
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.stem)
+def test_compare_backends_reports_no_difference(path, lxml_backend):
+    assert compare_backends(_read(path)) == []
+
+
+def test_irregular_page_content():
+    """Classes multiples, liens et entités dans les cellules, tableau voisin au nom proche"""
+    html = _read(Path(__file__).parent / "fixtures" / "html" / "irregular.html")
+    indices = extract_table_rows(html, 'indices-table', 'bs4')
+    stocks = extract_table_rows(html, 'stocks-table', 'bs4')
+
+    assert [row[0] for row in indices] == ['BRVM Composite', 'BRVM\xa030', 'BRVM Services Publics']
+    assert [row[0] for row in stocks] == ['SNTS', 'ORAC', 'SGBC']
+    assert stocks[1][1] == "Orange Côte d'Ivoire & Cie"
+    assert extract_texts(html, TEXT_CLASSES, 'bs4')['market-status'] == 'Marché ouvert'
+
+
+def test_missing_table_and_text():
+    html = _read(Path(__file__).parent / "fixtures" / "html" / "market_closed.html")
+    assert extract_table_rows(html, 'stocks-table', 'bs4') == []
+    assert extract_texts(html, ('absent',), 'bs4') == {'absent': None}
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests des réponses conditionnelles de l'API (api/http_cache.py) via le
+client de test Flask : 304 sur If-None-Match pour chaque encodage négocié
+(identité, gzip, brotli si installé), ETag commun aux variantes d'une même
+version, et If-Modified-Since
+"""
+
+import gzip
+import json
+
+import pytest
+
+import app as api
+from http_cache import ENCODERS
+from scraper import write_csv
+
+ENCODINGS = [None, 'gzip', pytest.param('br', marks=pytest.mark.skipif(
+    'br' not in ENCODERS, reason="brotli non installé"))]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Assez de lignes pour dépasser MIN_COMPRESS_SIZE
+    records = [{'symbol': f"S{i:02d}", 'name': f"Société {i}", 'last_price': 1000 + i, 'date': "2024-03-01"}
+               for i in range(40)]
+    write_csv(tmp_path / "stocks_2024-03-01.csv", records)
+    cache = api.SnapshotCache(dumps=lambda obj: json.dumps(obj) + "\n", check_interval=0)
+    cache.register('stocks', api.FileSource(tmp_path, "stocks_", ".csv", api._read_csv))
+    monkeypatch.setattr(api, 'snapshot_cache', cache)
+    return api.app.test_client()
+
+
+def _decode(response):
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        return gzip.decompress(response.data)
+    if encoding == 'br':
+        import brotli
+        return brotli.decompress(response.data)
+    return response.data
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_if_none_match_returns_304_per_encoding(client, encoding):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    first = client.get('/api/stocks', headers=headers)
+    assert first.status_code == 200
+    assert first.headers.get('Content-Encoding') == encoding
+    assert len(json.loads(_decode(first))) == 40
+
+    etag = first.headers['ETag']
+    if encoding:
+        assert etag.endswith(f'-{encoding}"')
+    assert first.headers['Vary'] == 'Accept-Encoding'
+
+    again = client.get('/api/stocks', headers=dict(headers, **{'If-None-Match': etag}))
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers['ETag'] == etag
+
+
+def test_etag_of_one_encoding_validates_the_others(client):
+    identity = client.get('/api/stocks').headers['ETag']
+    response = client.get('/api/stocks', headers={'Accept-Encoding': 'gzip', 'If-None-Match': identity})
+    assert response.status_code == 304
+    assert response.headers['ETag'] != identity
+
+
+def test_stale_etag_gets_full_body(client):
+    response = client.get('/api/stocks', headers={'If-None-Match': '"ancienne-version"'})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 40
+
+
+def test_if_modified_since(client):
+    last_modified = client.get('/api/stocks').headers['Last-Modified']
+    assert client.get('/api/stocks', headers={'If-Modified-Since': last_modified}).status_code == 304
+    stale = "Mon, 01 Jan 2001 00:00:00 GMT"
+    assert client.get('/api/stocks', headers={'If-Modified-Since': stale}).status_code == 200
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""
+Budgets de temps d'import des points d'entrée (benchmarks/import_budget.py) :
+chaque module est importé dans un interpréteur neuf et le test échoue si
+son budget est dépassé ou si une dépendance lourde est chargée au démarrage
+(lxml compris pour le scraper : il n'est importé qu'à la première analyse)
+
+BRVM_IMPORT_BUDGET_SCALE multiplie les budgets sur une machine lente (CI).
+"""
+
+import os
+import sys
+import subprocess
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.slow
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location("import_budget", BASE_DIR / "benchmarks" / "import_budget.py")
+import_budget = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(import_budget)
+
+
+def _importtime_available():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import json"],
+                            capture_output=True, text=True)
+    return result.returncode == 0 and "import time:" in result.stderr
+
+
+if not _importtime_available():
+    pytest.skip("python -X importtime indisponible", allow_module_level=True)
+
+
+@pytest.mark.parametrize("module", list(import_budget.BUDGETS))
+def test_import_budget(module):
+    scale = float(os.environ.get("BRVM_IMPORT_BUDGET_SCALE", "1"))
+    result = import_budget.check(module, scale=scale)
+    assert not result['failures'], f"{module}: {'; '.join(result['failures'])}"
+
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests du calendrier de cotation (scripts/market_calendar.py) : prochaine
+collecte pendant la séance, après la clôture, sur un week-end et sur le
+lundi de Pâques (et les jours fériés ajoutés par BRVM_HOLIDAYS)
+"""
+
+import datetime
+
+import pytest
+
+from market_calendar import BRVM_TZ, is_trading_day, next_run_time
+
+ACTIVE = datetime.timedelta(minutes=5)
+IDLE = datetime.timedelta(hours=1)
+WEEK = datetime.timedelta(days=7)
+
+
+def _at(day, hour, minute=0):
+    return datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time(hour, minute), BRVM_TZ)
+
+
+@pytest.mark.parametrize("moment, expected", [
+    # Pendant la séance : toutes les `active_interval`, sans dépasser la collecte de clôture
+    (_at("2024-03-06", 10), _at("2024-03-06", 10, 5)),
+    (_at("2024-03-06", 15, 28), _at("2024-03-06", 15, 33)),
+    # Entre la clôture et la collecte de clôture
+    (_at("2024-03-06", 15, 30), _at("2024-03-06", 15, 45)),
+    # Avant l'ouverture
+    (_at("2024-03-06", 8, 30), _at("2024-03-06", 9)),
+])
+def test_trading_day(moment, expected):
+    assert next_run_time(moment, ACTIVE, IDLE) == expected
+
+
+def test_active_interval_capped_by_post_close_run():
+    assert next_run_time(_at("2024-03-06", 15, 20), datetime.timedelta(minutes=30), IDLE) == _at("2024-03-06", 15, 45)
+
+
+def test_weekend():
+    friday_evening = _at("2024-03-08", 16)
+    assert next_run_time(friday_evening, ACTIVE, WEEK) == _at("2024-03-11", 9)
+    # Attente plafonnée par `idle_interval` pendant le week-end
+    assert next_run_time(friday_evening, ACTIVE, IDLE) == _at("2024-03-08", 17)
+    assert next_run_time(_at("2024-03-09", 12), ACTIVE, IDLE) == _at("2024-03-09", 13)
+    assert next_run_time(_at("2024-03-10", 23, 30), ACTIVE, IDLE) == _at("2024-03-11", 0, 30)
+
+
+def test_easter_monday():
+    # Pâques 2024 : dimanche 31 mars, lundi 1er avril férié
+    assert not is_trading_day(datetime.date(2024, 4, 1))
+    assert is_trading_day(datetime.date(2024, 3, 29))
+    assert next_run_time(_at("2024-03-29", 16), ACTIVE, WEEK) == _at("2024-04-02", 9)
+    # Heure de séance d'un jour férié : aucune collecte rapprochée
+    assert next_run_time(_at("2024-04-01", 10), ACTIVE, IDLE) == _at("2024-04-01", 11)
+    assert next_run_time(_at("2024-04-01", 10), ACTIVE, WEEK) == _at("2024-04-02", 9)
+
+
+def test_extra_holidays(monkeypatch):
+    monkeypatch.setenv("BRVM_HOLIDAYS", "2024-04-10, 2024-04-11")
+    assert next_run_time(_at("2024-04-09", 16), ACTIVE, WEEK) == _at("2024-04-12", 9)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'endpoint /metrics : type MIME et format d'exposition texte de
+Prometheus (HELP puis TYPE par famille, échantillons bien formés, seaux
+d'histogramme cumulés jusqu'à +Inf)
+"""
+
+import re
+
+import app as api
+from metrics import CONTENT_TYPE
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*"'
+                    r'(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*")*\})? (\S+)$')
+
+
+def _families(text):
+    """Familles de métriques : nom -> (type, [(nom, labels, valeur)])"""
+    families = {}
+    family = None
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        if line.startswith("# HELP "):
+            name = line.split(" ")[2]
+            kind = lines[i + 1].split(" ")
+            assert kind[:3] == ["#", "TYPE", name]
+            assert kind[3] in ("counter", "gauge", "histogram")
+            family = name
+            families[name] = (kind[3], [])
+        elif not line.startswith("# TYPE "):
+            match = SAMPLE.match(line)
+            assert match, line
+            name, labels, value = match.groups()
+            assert name == family or name.startswith(family + "_")
+            float(value)
+            families[family][1].append((name, labels or "", value))
+    return families
+
+
+def test_metrics_exposition_format():
+    client = api.app.test_client()
+    client.get('/api/stocks')
+    client.get('/api/export/inconnu')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    assert text.endswith("\n")
+
+    families = _families(text)
+    kind, samples = families['brvm_http_requests_total']
+    assert kind == 'counter'
+    assert any('endpoint="/api/export/<dataset>"' in labels and 'status="404"' in labels
+               for _, labels, _ in samples)
+
+    kind, samples = families['brvm_http_request_duration_seconds']
+    assert kind == 'histogram'
+    buckets = [(labels, float(value)) for name, labels, value in samples
+               if name == 'brvm_http_request_duration_seconds_bucket' and 'endpoint="/api/stocks"' in labels]
+    counts = [value for _, value in buckets]
+    assert buckets[-1][0].endswith('le="+Inf"}')
+    assert counts == sorted(counts)
+    count = next(float(value) for name, labels, value in samples
+                 if name == 'brvm_http_request_duration_seconds_count' and 'endpoint="/api/stocks"' in labels)
+    assert counts[-1] == count >= 1
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests du chemin MongoDB avec mongomock : upserts différentiels du scraper
+(scripts/scraper.py) et lecture par l'API (api/storage.py)
+"""
+
+import datetime
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("pymongo")
+
+from scraper import BRVMScraper
+from storage import MongoSource, MongoHistoryStore
+
+DAY1 = "2026-10-16"
+DAY2 = "2026-10-17"
+
+
+def _stocks(date=None, **prices):
+    prices = prices or {'SNTS': 20500.0, 'ORAC': 14890.0, 'SGBC': 17995.0}
+    return [
+        {'symbol': symbol, 'name': f"Société {symbol}", 'isin': f"CI{symbol}", 'last_price': price,
+         'change': 0.5, 'high': price + 100, 'low': price - 100, 'volume': 1000, 'date': date}
+        for symbol, price in prices.items()
+    ]
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().brvm_data
+
+
+def _scraper(db, date=DAY1):
+    scraper = BRVMScraper(use_db=False, concurrent=False, use_cache=False, ticks=False)
+    scraper.use_db = True
+    scraper.db = db
+    scraper.ensure_indexes()
+    scraper.set_date(date)
+    return scraper
+
+
+@pytest.fixture
+def scraper(db):
+    return _scraper(db)
+
+
+def _version(db, collection):
+    meta = db.meta.find_one({'_id': collection})
+    return meta and meta['version']
+
+
+def test_delta_upserts(db, scraper):
+    assert scraper.save_to_database(_stocks(), 'stocks')
+    assert scraper.db_stats['stocks'] == {'inserted': 3, 'modified': 0, 'unchanged': 0}
+    assert _version(db, 'stocks') == 1
+
+    # Deuxième collecte identique : aucune écriture, version inchangée
+    assert scraper.save_to_database(_stocks(), 'stocks')
+    assert scraper.db_stats['stocks'] == {'inserted': 0, 'modified': 0, 'unchanged': 3}
+    assert _version(db, 'stocks') == 1
+
+    # Troisième collecte : un cours modifié et un nouveau titre
+    changed = _stocks(SNTS=20500.0, ORAC=15000.0, SGBC=17995.0, BOAB=6500.0)
+    assert scraper.save_to_database(changed, 'stocks')
+    assert scraper.db_stats['stocks'] == {'inserted': 1, 'modified': 1, 'unchanged': 2}
+    assert _version(db, 'stocks') == 2
+
+    assert db.stocks.count_documents({'date': DAY1}) == 4
+    assert db.stocks.find_one({'symbol': 'ORAC'})['last_price'] == 15000.0
+    assert all('updated_at' in doc for doc in db.stocks.find())
+
+
+def test_delta_after_restart_uses_persisted_state(db, scraper):
+    scraper.save_to_database(_stocks(), 'stocks')
+
+    restarted = _scraper(db)
+    assert restarted.save_to_database(_stocks(), 'stocks')
+    assert restarted.db_stats['stocks'] == {'inserted': 0, 'modified': 0, 'unchanged': 3}
+    assert _version(db, 'stocks') == 1
+
+
+def test_new_day_is_inserted(db, scraper):
+    scraper.save_to_database(_stocks(), 'stocks')
+    scraper.set_date(DAY2)
+    scraper.save_to_database(_stocks(), 'stocks')
+    assert scraper.db_stats['stocks'] == {'inserted': 3, 'modified': 0, 'unchanged': 0}
+    assert db.stocks.count_documents({}) == 6
+    assert _version(db, 'stocks') == 2
+
+
+def test_meta_version_per_collection(db, scraper):
+    scraper.save_to_database(_stocks(), 'stocks')
+    scraper.save_to_database({'BRVM Composite': {'value': 285.4, 'change_percent': 0.5}}, 'indices')
+    scraper.save_to_database({'BRVM Composite': {'value': 286.0, 'change_percent': 0.7}}, 'indices')
+    assert _version(db, 'stocks') == 1
+    assert _version(db, 'indices') == 2
+    assert _version(db, 'bonds') is None
+
+
+def test_source_empty_collection(db):
+    source = MongoSource('stocks', db_getter=lambda: db)
+    assert source.version() is None
+    assert source.load() == ([], None, None)
+
+
+def test_source_version_and_load(db, scraper):
+    scraper.save_to_database(_stocks(), 'stocks')
+    scraper.set_date(DAY2)
+    scraper.save_to_database(_stocks(SNTS=21000.0, ORAC=15000.0), 'stocks')
+
+    source = MongoSource('stocks', db_getter=lambda: db)
+    assert source.version() == 2
+
+    records, path, mtime = source.load()
+    assert path is None and mtime is not None
+    # Date la plus récente uniquement, triée par symbole, sans champs internes
+    assert [r['symbol'] for r in records] == ['ORAC', 'SNTS']
+    assert {r['date'] for r in records} == {DAY2}
+    assert all('_id' not in r and 'updated_at' not in r for r in records)
+
+
+def test_source_version_without_meta(db, scraper):
+    scraper.save_to_database(_stocks(), 'stocks')
+    db.meta.delete_many({})
+    assert MongoSource('stocks', db_getter=lambda: db).version() == DAY1
+
+
+def test_source_mtime_follows_meta_update(db, scraper):
+    scraper.save_to_database(_stocks(), 'stocks')
+    source = MongoSource('stocks', db_getter=lambda: db)
+    _, _, mtime = source.load()
+    updated_at = db.meta.find_one({'_id': 'stocks'})['updated_at']
+    assert mtime == updated_at.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+    # Collecte identique : aucune écriture, Last-Modified inchangé
+    scraper.save_to_database(_stocks(), 'stocks')
+    assert source.load()[2] == mtime
+
+    db.meta.update_one({'_id': 'stocks'}, {'$set': {'updated_at': updated_at + datetime.timedelta(minutes=5)}})
+    assert source.load()[2] == mtime + 300
+
+    # Base sans documents meta : plus récent `updated_at` des documents
+    db.meta.delete_many({})
+    newest = max(doc['updated_at'] for doc in db.stocks.find())
+    assert source.load()[2] == newest.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def test_source_market_status(db, scraper):
+    scraper.save_to_database({'status': 'ouvert', 'date_info': '17/10/2026'}, 'market_status')
+    record, _, _ = MongoSource('market_status', db_getter=lambda: db).load()
+    assert record == {'status': 'ouvert', 'date_info': '17/10/2026', 'date': DAY1}
+
+
+@pytest.fixture
+def history(db, scraper):
+    scraper.save_to_database(_stocks(), 'stocks')
+    scraper.set_date(DAY2)
+    scraper.save_to_database(_stocks(SNTS=21000.0, ORAC=15000.0), 'stocks')
+    return MongoHistoryStore(db_getter=lambda: db, batch_size=2)
+
+
+def test_key_range(history):
+    assert history.key_range('stocks', 'SNTS') == (datetime.date(2026, 10, 16), datetime.date(2026, 10, 17), None)
+    assert history.key_range('stocks', 'SGBC') == (datetime.date(2026, 10, 16), datetime.date(2026, 10, 16), None)
+    assert history.key_range('stocks', 'INCONNU') is None
+    with pytest.raises(ValueError):
+        history.key_range('market_status', 'x')
+
+
+def test_read_projection(history):
+    frame = history.read('stocks', columns=['date', 'symbol', 'last_price'], keys=['SNTS'])
+    assert list(frame.columns) == ['date', 'symbol', 'last_price']
+    assert frame['last_price'].tolist() == [20500.0, 21000.0]
+    assert str(frame['date'].dtype).startswith('datetime64')
+
+    documents = list(history.iter_documents('stocks', start=DAY2))
+    assert len(documents) == 2
+    assert all('_id' not in d and 'updated_at' not in d for d in documents)
+
+
+def test_iter_batches(history):
+    batches = list(history.iter_batches('stocks', columns=['date', 'symbol', 'last_price']))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    assert batches[0].schema.names == ['date', 'symbol', 'last_price']
+    assert batches[0].column('date').to_pylist()[0] == datetime.date(2026, 10, 16)
+
+
+def test_export_arrow_from_mongo(history, monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    import app as api
+
+    monkeypatch.setattr(api, 'history_store', history)
+    response = api.app.test_client().get('/api/export/stocks?format=arrow&symbols=SNTS,ORAC&fields=date,symbol,last_price')
+    assert response.status_code == 200
+
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert table.column_names == ['date', 'symbol', 'last_price']
+    rows = list(zip(table.column('symbol').to_pylist(), table.column('last_price').to_pylist()))
+    assert rows == [('ORAC', 14890.0), ('ORAC', 15000.0), ('SNTS', 20500.0), ('SNTS', 21000.0)]
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests du cache des pages brutes (scripts/page_cache.py) et de son usage
+par la collecte : une page inchangée est sautée dans la journée, mais
+encore sauvegardée une fois pour chaque nouvelle date
+"""
+
+from pathlib import Path
+
+import pytest
+
+import scraper as scraper_module
+from page_cache import PageCache, PROCESSED_DATES
+
+URL = "https://www.brvm.org/fr/cours-actions/0"
+FIXTURE = Path(__file__).parent / "fixtures" / "html" / "market_open.html"
+
+
+def test_processed_marker_is_per_date(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.store(URL, "<html>v1</html>", {'ETag': '"v1"'})
+    assert not cache.is_processed(URL, "2026-10-16")
+
+    cache.mark_processed(URL, "2026-10-16")
+    assert cache.is_processed(URL, "2026-10-16")
+    assert not cache.is_processed(URL, "2026-10-17")
+
+    # Nouvelle version : à traiter de nouveau, y compris pour la même date
+    cache.store(URL, "<html>v2</html>", {'ETag': '"v2"'})
+    assert not cache.is_processed(URL, "2026-10-16")
+
+
+def test_processed_dates_are_bounded(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.store(URL, "<html></html>", {})
+    for day in range(1, PROCESSED_DATES + 4):
+        cache.mark_processed(URL, f"2026-10-{day:02d}")
+    assert cache.is_processed(URL, f"2026-10-{PROCESSED_DATES + 3:02d}")
+    assert not cache.is_processed(URL, "2026-10-01")
+
+
+def test_unchanged_page_is_saved_for_each_new_date(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(scraper_module, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(scraper_module, 'METRICS_DIR', tmp_path / "metrics")
+    html = FIXTURE.read_text(encoding='utf-8')
+
+    scraper = scraper_module.BRVMScraper(use_db=False, concurrent=False, use_cache=True, ticks=False)
+
+    def fetch_pages(names=None):
+        # Page servie par le site, identique d'une collecte à l'autre
+        for name in ('stocks', 'bonds', 'indices'):
+            scraper.page_cache.store(scraper_module.PAGES[name], html, {})
+            yield name, html
+
+    monkeypatch.setattr(scraper, 'fetch_pages', fetch_pages)
+
+    scraper.set_date("2026-10-16")
+    scraper.run()
+    assert scraper.page_results == {}
+    scraper.run()
+    assert set(scraper.page_results.values()) == {'unchanged'}
+
+    scraper.set_date("2026-10-17")
+    scraper.run()
+    for dataset in ('stocks', 'bonds', 'indices'):
+        assert (tmp_path / "processed" / f"{dataset}_2026-10-17.csv").exists()
+    assert scraper.history.read('stocks', start="2026-10-17")['symbol'].nunique() == 8
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""Tests des fichiers bruts et du journal intraday (scripts/raw_store.py)"""
+
+import pytest
+
+import raw_store
+from raw_store import RawStore
+
+DATE = "2026-10-17"
+
+
+def _truncate(path, count):
+    with open(path, 'r+b') as f:
+        f.truncate(path.stat().st_size - count)
+
+
+def _journal(root, compression):
+    return [entry['data'] for entry in RawStore(root, compression=compression).journal('stocks', DATE)]
+
+
+@pytest.fixture(params=['none', 'gzip', 'zstd'])
+def compression(request):
+    if request.param == 'zstd' and raw_store.zstandard is None:
+        pytest.skip("zstandard n'est pas installé")
+    return request.param
+
+
+def test_journal_is_compressed_by_default(tmp_path):
+    store = RawStore(tmp_path, compression='none', intraday=True)
+    store.write('stocks', DATE, [{'a': 1}])
+    assert store.journal_path('stocks', DATE).name == f"stocks_{DATE}.jsonl.gz"
+    assert _journal(tmp_path, 'none') == [[{'a': 1}]]
+
+
+def test_unchanged_snapshot_is_not_appended(tmp_path, compression):
+    store = RawStore(tmp_path, compression=compression, intraday=True)
+    assert store.write('stocks', DATE, [{'a': 1}])
+    assert not store.write('stocks', DATE, [{'a': 1}])
+    assert _journal(tmp_path, compression) == [[{'a': 1}]]
+
+
+def test_torn_tail_is_skipped_by_readers(tmp_path, compression):
+    store = RawStore(tmp_path, compression=compression, intraday=True)
+    store.write('stocks', DATE, [{'a': 1}])
+    store.write('stocks', DATE, [{'a': 2}])
+    _truncate(store.journal_path('stocks', DATE), 5)
+    assert _journal(tmp_path, compression) == [[{'a': 1}]]
+
+
+def test_append_after_torn_tail_stays_readable(tmp_path, compression):
+    store = RawStore(tmp_path, compression=compression, intraday=True)
+    store.write('stocks', DATE, [{'a': 1}])
+    store.write('stocks', DATE, [{'a': 2}])
+    _truncate(store.journal_path('stocks', DATE), 5)
+
+    # Reprise par un nouveau processus, puis interruption dans le même processus
+    restarted = RawStore(tmp_path, compression=compression, intraday=True)
+    restarted.write('stocks', DATE, [{'a': 3}])
+    restarted.write('stocks', DATE, [{'a': 4}])
+    _truncate(restarted.journal_path('stocks', DATE), 3)
+    restarted.write('stocks', DATE, [{'a': 5}])
+
+    assert _journal(tmp_path, compression) == [[{'a': 1}], [{'a': 3}], [{'a': 5}]]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la configuration gunicorn (api/server.py) : gevent choisi par
+défaut s'il est installé, workers gevent sans préchargement ni patch par le
+serveur, plafond des abonnés /api/stream sous des workers à threads
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("gunicorn")
+
+from gunicorn.app.base import BaseApplication
+
+import server
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Configuration de l'application gunicorn au démarrage, sans lancer l'arbitre"""
+    configs = []
+    monkeypatch.setattr(BaseApplication, 'run', lambda self: configs.append(self.cfg))
+    monkeypatch.setenv("BRVM_METRICS_SHARED", "0")
+    monkeypatch.setattr(os, 'environ', {k: v for k, v in os.environ.items() if k != "BRVM_STREAM_MAX_SUBSCRIBERS"})
+    return configs
+
+
+@pytest.mark.parametrize("worker_class, preload", [('gthread', True), ('sync', True), ('gevent', False)])
+def test_preload_depends_on_worker_class(started, worker_class, preload):
+    server.serve_gunicorn('127.0.0.1', 0, 2, 2, worker_class)
+    assert started[0].preload_app is preload
+
+
+def test_gevent_is_not_patched_by_server(started, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'gevent', None)
+    server.serve_gunicorn('127.0.0.1', 0, 1, 1, 'gevent')
+    assert started
+
+
+@pytest.mark.parametrize("installed, threads, expected", [
+    (True, 2, 'gevent'), (False, 2, 'gthread'), (False, 1, 'sync'),
+])
+def test_default_worker_class(monkeypatch, installed, threads, expected):
+    monkeypatch.setattr(server.importlib.util, 'find_spec', lambda name: object() if installed else None)
+    assert server.default_worker_class(threads) == expected
+
+
+def test_thread_workers_cap_stream_subscribers(started):
+    server.serve_gunicorn('127.0.0.1', 0, 2, 8, 'gthread')
+    assert os.environ["BRVM_STREAM_MAX_SUBSCRIBERS"] == "4"
+
+
+def test_gevent_workers_do_not_cap_stream_subscribers(started):
+    server.serve_gunicorn('127.0.0.1', 0, 2, 1, 'gevent')
+    assert "BRVM_STREAM_MAX_SUBSCRIBERS" not in os.environ
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests du hub de diffusion SSE (api/stream_hub.py) : reprise sur
+Last-Event-ID dans le même processus, `reset` pour un identifiant d'une
+autre époque (autre worker, redémarrage), plafond d'abonnés hors gevent
+"""
+
+import pytest
+
+import stream_hub
+from stream_hub import StreamHub
+
+
+class EmptyCache:
+    """Cache sans jeu de données : seul `publish` alimente le hub"""
+
+    def datasets(self):
+        return []
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    monkeypatch.setattr(stream_hub, 'HEARTBEAT_INTERVAL', 0.01)
+    monkeypatch.setattr(StreamHub, '_watch', lambda self: None)
+    hub = StreamHub(EmptyCache())
+    hub.publish('delta', {'stocks': {'changed': [{'symbol': 'SNTS'}]}})
+    hub.publish('delta', {'stocks': {'changed': [{'symbol': 'ORAC'}]}})
+    return hub
+
+
+def _next_frame(subscription):
+    assert next(subscription) == b"retry: 5000\n\n"
+    return next(subscription).decode('utf-8')
+
+
+def _ids(frames):
+    return [line[4:] for line in frames.splitlines() if line.startswith("id: ")]
+
+
+def test_event_ids_carry_process_epoch(hub):
+    subscription = hub.subscribe(hub._event_id(0))
+    frames = _next_frame(subscription)
+    assert _ids(frames) == [f"{hub._epoch}:1", f"{hub._epoch}:2"]
+    assert "event: reset" not in frames
+
+
+def test_resume_skips_frames_already_received(hub):
+    frames = _next_frame(hub.subscribe(f"{hub._epoch}:1"))
+    assert _ids(frames) == [f"{hub._epoch}:2"]
+    assert "ORAC" in frames and "SNTS" not in frames
+
+
+@pytest.mark.parametrize("last_event_id", ["12345-abc:1", "1", "2", "pas-un-id"])
+def test_foreign_event_id_gets_reset(hub, last_event_id):
+    frames = _next_frame(hub.subscribe(last_event_id))
+    assert "event: reset" in frames
+    assert _ids(frames) == [f"{hub._epoch}:2"]
+
+
+def test_unknown_sequence_in_same_epoch_gets_reset(hub):
+    assert "event: reset" in _next_frame(hub.subscribe(f"{hub._epoch}:99"))
+
+
+def test_subscriber_cap(hub, monkeypatch):
+    hub.max_subscribers = 1
+    assert hub.accepting()
+    subscription = hub.subscribe()
+    next(subscription)
+    assert not hub.accepting()
+
+    monkeypatch.setattr(stream_hub, 'cooperative', lambda: True)
+    assert hub.accepting()
+    subscription.close()
+    assert hub.subscriber_count() == 0
+
+
+def test_stream_route_refuses_above_cap(hub, monkeypatch):
+    import app as api
+
+    hub.max_subscribers = 1
+    monkeypatch.setattr(api, 'stream_hub', hub)
+    subscription = hub.subscribe()
+    next(subscription)
+
+    response = api.app.test_client().get('/api/stream')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '60'
+    subscription.close()
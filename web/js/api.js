@@ -13,6 +13,29 @@ class BRVMApi {
         this.dataPath = '../data/processed';
     }
 
+    /**
+     * Récupère en une seule requête plusieurs jeux de données (/api/snapshot)
+     * @param {Array} include Ressources voulues (status, indices, stocks, bonds, news)
+     * @returns {Promise} Promesse contenant {version, market_status, indices, ...}, ou null
+     */
+    async getSnapshot(include = ['status', 'indices', 'stocks', 'bonds', 'news']) {
+        if (this.devMode) {
+            // En mode dev, les fichiers statiques sont lus un par un
+            return null;
+        }
+
+        try {
+            const response = await fetch(`${this.apiBaseUrl}/snapshot?include=${include.join(',')}`);
+            if (!response.ok) {
+                throw new Error(`Erreur HTTP: ${response.status}`);
+            }
+            return await response.json();
+        } catch (error) {
+            console.error('Erreur lors de la récupération de l\'instantané groupé:', error);
+            return null;
+        }
+    }
+
     /**
      * Récupère le statut actuel du marché
      * @returns {Promise} Promesse contenant les données du statut du marché
@@ -87,9 +110,11 @@ class BRVMApi {
 
     /**
      * Récupère les données des actions
+     * @param {Object} params Filtres optionnels traités par le serveur
+     *        (symbols, sort, order, limit, offset, cursor, fields)
      * @returns {Promise} Promesse contenant les données des actions
      */
-    async getStocks() {
+    async getStocks(params = {}) {
         if (this.devMode) {
             try {
                 const date = new Date().toISOString().split('T')[0];
@@ -108,7 +133,8 @@ class BRVMApi {
             }
         } else {
             try {
-                const response = await fetch(`${this.apiBaseUrl}/stocks`);
+                const query = new URLSearchParams(params).toString();
+                const response = await fetch(`${this.apiBaseUrl}/stocks${query ? `?${query}` : ''}`);
                 if (!response.ok) {
                     throw new Error(`Erreur HTTP: ${response.status}`);
                 }
@@ -122,9 +148,11 @@ class BRVMApi {
 
     /**
      * Récupère les données des obligations
+     * @param {Object} params Filtres optionnels traités par le serveur
+     *        (symbols, sort, order, limit, offset, cursor, fields)
      * @returns {Promise} Promesse contenant les données des obligations
      */
-    async getBonds() {
+    async getBonds(params = {}) {
         if (this.devMode) {
             try {
                 const date = new Date().toISOString().split('T')[0];
@@ -143,7 +171,8 @@ class BRVMApi {
             }
         } else {
             try {
-                const response = await fetch(`${this.apiBaseUrl}/bonds`);
+                const query = new URLSearchParams(params).toString();
+                const response = await fetch(`${this.apiBaseUrl}/bonds${query ? `?${query}` : ''}`);
                 if (!response.ok) {
                     throw new Error(`Erreur HTTP: ${response.status}`);
                 }
@@ -177,6 +206,97 @@ class BRVMApi {
         }
     }
 
+    /**
+     * Récupère l'historique d'un indice (cours de clôture)
+     * @param {string} name Nom de l'indice (ex: 'BRVM Composite')
+     * @param {Object} params Paramètres optionnels (start, end, interval)
+     * @returns {Promise} Promesse contenant les points {date, value}, ou null
+     */
+    async getIndexHistory(name, params = {}) {
+        if (this.devMode) {
+            // En mode dev, pas d'historique : les graphiques utilisent un exemple
+            return null;
+        }
+
+        try {
+            const query = new URLSearchParams({ interval: 'daily', fields: 'close', ...params });
+            const response = await fetch(`${this.apiBaseUrl}/indices/${encodeURIComponent(name)}/history?${query}`);
+            if (!response.ok) {
+                throw new Error(`Erreur HTTP: ${response.status}`);
+            }
+            const history = await response.json();
+            return history.data.map(point => ({ date: point.date, value: point.close }));
+        } catch (error) {
+            console.error(`Erreur lors de la récupération de l'historique de ${name}:`, error);
+            return null;
+        }
+    }
+
+    /**
+     * Récupère les cotations intraday d'une action (journal de la séance)
+     * @param {string} symbol Symbole de l'action
+     * @param {Object} params Paramètres optionnels (date, start, end)
+     * @returns {Promise} Promesse contenant les points {time, value}, ou null
+     */
+    async getStockIntraday(symbol, params = {}) {
+        if (this.devMode) {
+            return null;
+        }
+
+        try {
+            const query = new URLSearchParams({ fields: 'last_price', ...params });
+            const response = await fetch(`${this.apiBaseUrl}/stocks/${encodeURIComponent(symbol)}/intraday?${query}`);
+            if (!response.ok) {
+                throw new Error(`Erreur HTTP: ${response.status}`);
+            }
+            const intraday = await response.json();
+            return intraday.data.map(point => ({ time: point.time, value: point.last_price }));
+        } catch (error) {
+            console.error(`Erreur lors de la récupération des cotations intraday de ${symbol}:`, error);
+            return null;
+        }
+    }
+
+    /**
+     * Récupère les indicateurs obligataires (rendement actuariel, durations, convexité, courbe des taux)
+     * @param {number} frequency Nombre de coupons par an (1 par défaut)
+     * @returns {Promise} Promesse contenant {date, frequency, bonds, curve}, ou null
+     */
+    async getBondAnalytics(frequency = 1) {
+        if (this.devMode) {
+            return null;
+        }
+
+        try {
+            const response = await fetch(`${this.apiBaseUrl}/bonds/analytics?frequency=${frequency}`);
+            if (!response.ok) {
+                throw new Error(`Erreur HTTP: ${response.status}`);
+            }
+            return await response.json();
+        } catch (error) {
+            console.error('Erreur lors de la récupération des indicateurs obligataires:', error);
+            return null;
+        }
+    }
+
+    /**
+     * S'abonne au flux des changements (/api/stream)
+     * @param {Function} onDelta Appelée avec {stocks, indices, bonds, market_status} modifiés
+     * @param {Function} onReset Appelée lorsque les données complètes doivent être rechargées
+     * @returns {EventSource|null} Flux ouvert (à fermer avec close()), ou null en mode dev
+     */
+    subscribe(onDelta, onReset) {
+        if (this.devMode || typeof EventSource === 'undefined') {
+            return null;
+        }
+
+        // Le navigateur se reconnecte seul et renvoie Last-Event-ID
+        const source = new EventSource(`${this.apiBaseUrl}/stream`);
+        source.addEventListener('delta', event => onDelta(JSON.parse(event.data)));
+        source.addEventListener('reset', () => onReset && onReset());
+        return source;
+    }
+
     /**
      * Parse les données CSV
      * @param {string} csvText Texte CSV à parser
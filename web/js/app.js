@@ -3,6 +3,17 @@
  * Gère l'initialisation et les interactions de l'interface utilisateur
  */
 
+// Dernières données affichées, mises à jour par le flux des changements
+const liveData = {
+    market_status: null,
+    indices: [],
+    stocks: [],
+    bonds: []
+};
+
+// Flux /api/stream ouvert (un seul par onglet)
+let liveStream = null;
+
 // Attendre que le DOM soit chargé
 document.addEventListener('DOMContentLoaded', () => {
     // Initialiser l'application
@@ -30,24 +41,27 @@ function initApp() {
  */
 async function loadInitialData() {
     try {
+        // Toutes les données en une seule requête, ou une requête par ressource en mode dev
+        const snapshot = await brvm_api.getSnapshot();
+        const marketStatus = snapshot ? snapshot.market_status : await brvm_api.getMarketStatus();
+        const indices = snapshot ? snapshot.indices : await brvm_api.getIndices();
+        const stocks = snapshot ? snapshot.stocks : await brvm_api.getStocks();
+        const bonds = snapshot ? snapshot.bonds : await brvm_api.getBonds();
+        const news = snapshot ? snapshot.news : await brvm_api.getMarketNews();
+        
         // Afficher le statut du marché
-        const marketStatus = await brvm_api.getMarketStatus();
         updateMarketStatus(marketStatus);
         
-        // Charger et afficher les indices
-        const indices = await brvm_api.getIndices();
+        // Afficher les indices
         updateIndicesDisplay(indices);
         
-        // Charger et afficher les actions
-        const stocks = await brvm_api.getStocks();
+        // Afficher les actions
         updateStocksTable(stocks);
         
-        // Charger et afficher les obligations
-        const bonds = await brvm_api.getBonds();
+        // Afficher les obligations
         updateBondsTable(bonds);
         
-        // Charger et afficher les actualités
-        const news = await brvm_api.getMarketNews();
+        // Afficher les actualités
         updateMarketNews(news);
         
         // Initialiser les graphiques
@@ -56,12 +70,56 @@ async function loadInitialData() {
             stocks: stocks
         });
         
+        Object.assign(liveData, { market_status: marketStatus, indices, stocks, bonds });
+        
+        // Recevoir ensuite uniquement les changements plutôt que de recharger les données
+        if (!liveStream) {
+            liveStream = brvm_api.subscribe(applyLiveDelta, loadInitialData);
+        }
+        
     } catch (error) {
         console.error('Erreur lors du chargement des données initiales:', error);
         displayErrorMessage('Une erreur est survenue lors du chargement des données. Veuillez réessayer plus tard.');
     }
 }
 
+/**
+ * Fusionne des lignes modifiées dans une liste d'enregistrements
+ * @param {Array} records Enregistrements actuels
+ * @param {Object} delta Changements {changed, removed}
+ * @param {string} key Champ identifiant une ligne
+ * @returns {Array} Nouvelle liste d'enregistrements
+ */
+function mergeRecords(records, delta, key) {
+    const merged = new Map((records || []).map(record => [record[key], record]));
+    (delta.removed || []).forEach(id => merged.delete(id));
+    (delta.changed || []).forEach(record => merged.set(record[key], record));
+    return Array.from(merged.values());
+}
+
+/**
+ * Applique un événement du flux des changements et rafraîchit les vues concernées
+ * @param {Object} delta Changements par jeu de données
+ */
+function applyLiveDelta(delta) {
+    if (delta.market_status) {
+        liveData.market_status = { ...liveData.market_status, ...delta.market_status };
+        updateMarketStatus(liveData.market_status);
+    }
+    if (delta.indices) {
+        liveData.indices = mergeRecords(liveData.indices, delta.indices, 'name');
+        updateIndicesDisplay(liveData.indices);
+    }
+    if (delta.stocks) {
+        liveData.stocks = mergeRecords(liveData.stocks, delta.stocks, 'symbol');
+        updateStocksTable(liveData.stocks);
+    }
+    if (delta.bonds) {
+        liveData.bonds = mergeRecords(liveData.bonds, delta.bonds, 'symbol');
+        updateBondsTable(liveData.bonds);
+    }
+}
+
 /**
  * Met à jour l'affichage du statut du marché
  * @param {Object} status Statut du marché
@@ -41,14 +41,32 @@ class BRVMCharts {
         }
         
         if (document.getElementById('composite-chart')) {
-            this.createHistoricalChart('composite-chart', 'BRVM Composite', this.getExampleHistoricalData());
+            this.loadHistoricalChart('composite-chart', 'BRVM Composite');
         }
         
         if (document.getElementById('brvm10-chart')) {
-            this.createHistoricalChart('brvm10-chart', 'BRVM 10', this.getExampleHistoricalData());
+            this.loadHistoricalChart('brvm10-chart', 'BRVM 10');
         }
     }
 
+    /**
+     * Charge l'historique d'un indice depuis l'API puis crée son graphique
+     * (données d'exemple si l'historique n'est pas disponible)
+     * @param {string} chartId ID de l'élément canvas
+     * @param {string} indexName Nom de l'indice
+     */
+    async loadHistoricalChart(chartId, indexName) {
+        const start = new Date();
+        start.setDate(start.getDate() - 30);
+        
+        const history = await brvm_api.getIndexHistory(indexName, {
+            start: start.toISOString().split('T')[0]
+        });
+        
+        const data = history && history.length > 0 ? history : this.getExampleHistoricalData();
+        this.createHistoricalChart(chartId, indexName, data);
+    }
+
     /**
      * Crée un graphique pour les indices boursiers
      * @param {Array} indices Données des indices